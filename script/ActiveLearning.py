@@ -0,0 +1,186 @@
+import numpy as np
+from . import ModelingToolKit as mtk
+
+class ActiveResolve1D:
+    """
+    ネットワークのデータ誤差に基づく能動学習によるデータセット生成
+
+    1. Resolve1D.proceed で初期データセット (resolve.size 行) を生成して学習
+    2. 評価データの応答からネットワークで比抵抗構造を推定し、推定構造の応答を
+       emulatte_RESOLVE で再計算してデータ誤差 (misfit) を求める
+    3. データ誤差の大きい評価データの比抵抗構造・曳航高度の近傍に新しいサンプルを
+       生成し (explore の割合は Resolve1D と同じランダム生成)、
+       データセットに追加して学習を続ける
+    2, 3 を rounds 回繰り返す。
+
+    e.g.)
+        resolve = gd.Resolve1D(**config)
+        al = ActiveResolve1D(resolve, fit_kwargs={'epochs' : 20, 'batch_size' : 128})
+        data, history = al.run(rounds=5, round_size=10000)
+        y = al.predict(x)
+    """
+    def __init__(
+            self, resolve, network_factory=None, fit_kwargs=None,
+            eval_size=2000, explore=0.2, res_perturb=0.2, height_perturb=5.0,
+            ppm_floor=1.0,
+            ):
+        """
+        resolve : Resolve1D
+            データセットの設定 (初期データセットの大きさは resolve.size)
+        network_factory : function, optional
+            network_factory(input_dim, output_dim) -> Keras model
+            None の場合 networks.get_dnn
+        fit_kwargs : dict, optional
+            network.fit のキーワード引数 (epochs, batch_size, verbose など)
+            各ラウンドで同じネットワークの学習を続ける
+        eval_size : int
+            各ラウンドでデータ誤差を評価するサンプル数
+            (推定構造の再計算に eval_size 回のフォワード計算を使う)
+        explore : float
+            新しいサンプルのうち、誤差によらずランダムに生成する割合
+        res_perturb : float
+            近傍の比抵抗構造の摂動の標準偏差 (log10(Ohm-m), 移動平均で平滑化)
+        height_perturb : float
+            近傍の曳航高度の摂動の標準偏差 (m)
+        ppm_floor : float
+            noise_std がない場合の誤差の規格化 max(|d|, ppm_floor) の下限 (ppm)
+        """
+        self.resolve = resolve
+        if network_factory is None:
+            from . import networks
+            network_factory = networks.get_dnn
+        self.network_factory = network_factory
+        self.fit_kwargs = {} if fit_kwargs is None else dict(fit_kwargs)
+        self.eval_size = eval_size
+        self.explore = explore
+        self.res_perturb = res_perturb
+        self.height_perturb = height_perturb
+        self.ppm_floor = ppm_floor
+        self.network = None
+        self.x_mean = None
+        self.x_std = None
+
+    @property
+    def nresp(self):
+        return 2 * self.resolve.nfreq
+
+    def split_xy(self, data):
+        """
+        x : [resp, height], y : log10(resistivity)
+        """
+        nx = self.nresp + 1
+        return data[:, :nx], np.log10(data[:, nx:])
+
+    def scale(self, x):
+        # 初期データセットの平均・標準偏差で標準化 (StandardScaler と同じ)
+        return (x - self.x_mean) / self.x_std
+
+    def train(self, data):
+        x, y = self.split_xy(data)
+        if self.network is None:
+            self.x_mean = x.mean(axis=0)
+            self.x_std = x.std(axis=0)
+            self.x_std[self.x_std == 0] = 1
+            self.network = self.network_factory(x.shape[1], y.shape[1])
+        return self.network.fit(self.scale(x), y, **self.fit_kwargs)
+
+    def predict(self, x):
+        """
+        x : ndarray (n, 2 * nfreq + 1) [resp, height]
+        return : ndarray (n, nlayer) 比抵抗 (Ohm-m)
+        """
+        return 10 ** np.asarray(self.network.predict(self.scale(x)))
+
+    def misfit(self, data):
+        """
+        data の応答に対するネットワークの推定構造のデータ誤差
+        (推定構造の応答はノイズなしで再計算する)
+
+        return : ndarray (n,)
+            規格化した誤差の RMS
+            noise_std がある場合は (d_pred - d) / noise_std,
+            ない場合は (d_pred - d) / max(|d|, ppm_floor)
+        """
+        x, _ = self.split_xy(data)
+        heights = x[:, self.nresp]
+        res = self.predict(x)
+        res = np.clip(res, *self.resolve.bgrlim)
+        pred = self.resolve.proceed_models(res, heights, add_noise=False)
+        resp = data[:, :self.nresp]
+        if self.resolve.noise_std is not None:
+            scale = np.tile(self.resolve.noise_std, 2)
+        else:
+            scale = np.maximum(np.abs(resp), self.ppm_floor)
+        return np.sqrt(np.mean(((pred[:, :self.nresp] - resp) / scale) ** 2, axis=1))
+
+    def propose(self, data, misfit, size):
+        """
+        新しいサンプルの比抵抗構造と曳航高度
+        (1 - explore) * size 個は misfit に比例する確率で選んだ data の近傍,
+        残りは Resolve1D と同じランダム生成
+
+        return : resistivity (size, nlayer), heights (size,)
+        """
+        resolve = self.resolve
+        nexplore = int(round(self.explore * size))
+        nexploit = size - nexplore
+        x, y = self.split_xy(data)
+
+        logres_lim = np.log10(resolve.bgrlim)
+        p = misfit / misfit.sum() if misfit.sum() > 0 else None
+        parents = np.random.choice(len(data), nexploit, p=p)
+        perturb = np.random.normal(0, self.res_perturb, (nexploit, y.shape[1]))
+        perturb = np.array([mtk.movearg(row) for row in perturb])
+        logres = np.clip(y[parents] + perturb, *logres_lim)
+        heights = x[parents, self.nresp] \
+            + np.random.normal(0, self.height_perturb, nexploit)
+        heights = np.clip(heights, *resolve.bhlim)
+
+        rand_res = [mtk.resistivity1D(resolve.thicks, resolve.bgrlim, resolve.generate_mode)
+                    for i in range(nexplore)]
+        rand_heights = (resolve.bhlim[1]-resolve.bhlim[0]) * np.random.rand(nexplore) + resolve.bhlim[0]
+
+        resistivity = np.vstack([10 ** logres, np.reshape(rand_res, (nexplore, -1))])
+        heights = np.append(heights, rand_heights)
+        return resistivity, heights
+
+    def run(self, rounds, round_size, seed_data=None, eval_data=None):
+        """
+        seed_data : ndarray, optional
+            初期データセット (None の場合 resolve.proceed() で生成)
+        eval_data : ndarray, optional
+            データ誤差を評価する固定のデータ
+            None の場合、各ラウンドで現在のデータセットから eval_size 行を選ぶ
+        return : data, history
+            data : ndarray (resolve.size + rounds * round_size, ncol)
+            history : list of dict (ラウンド毎のデータ誤差)
+        """
+        if seed_data is None:
+            data = self.resolve.proceed()
+        else:
+            data = np.array(seed_data)
+        self.train(data)
+
+        history = []
+        for i in range(rounds + 1):
+            if eval_data is None:
+                rows = np.random.choice(
+                    len(data), min(self.eval_size, len(data)), replace=False)
+                evaluated = data[rows]
+            else:
+                evaluated = np.asarray(eval_data)
+            misfit = self.misfit(evaluated)
+            history.append({
+                'round' : i,
+                'size' : len(data),
+                'misfit_mean' : float(np.mean(misfit)),
+                'misfit_median' : float(np.median(misfit)),
+                'misfit_max' : float(np.max(misfit)),
+            })
+            if i == rounds:
+                break
+            resistivity, heights = self.propose(evaluated, misfit, round_size)
+            new = self.resolve.proceed_models(resistivity, heights)
+            data = np.vstack([data, new])
+            self.train(data)
+        return data, history
@@ -0,0 +1,226 @@
+import copy
+import queue
+import threading
+from concurrent import futures
+from multiprocessing import cpu_count
+import numpy as np
+from . import NoiseModel as nm
+
+def _produce(resolve, size, seed):
+    # 各ワーカーは fork 時の乱数状態を共有するので、ジョブ毎にシードを与える
+    np.random.seed(seed)
+    return resolve.task(np.arange(size))
+
+class ResolveStream:
+    """
+    Resolve1D のワーカープロセスを生産者とする学習データのストリーム
+
+    ワーカーはノイズなしの応答を chunk_size 行ずつ計算し、上限のあるキューに送る。
+    バッチはキューから取り込んだ直近 pool_size 行のサンプルから無作為に選び、
+    その都度ノイズを付加する (NoiseModel.add_noise) ので、同じ構造でもエポック毎に
+    異なるノイズになる。フォワード計算は学習と並行して進み、学習が計算より
+    速い場合も pool のサンプルを使い回して待たずにバッチを返す。
+
+    e.g.)
+        stream = ResolveStream(resolve, batch_size=128)
+        stream.start()
+        x_val, y_val = stream.sample(10000)
+        sc = preprocessing.StandardScaler().fit(x_val)
+        stream.scaler = sc
+        network.fit(stream.dataset(), steps_per_epoch=1000, epochs=epochs,
+                    validation_data=(sc.transform(x_val), y_val))
+        stream.close()
+    """
+    def __init__(
+            self, resolve, batch_size=128, chunk_size=None, pool_size=100000,
+            queue_size=32, workers=None, noisy_fraction=0.7, scaler=None,
+            seed=None, min_pool=None, noise_kwargs=None,
+            ):
+        """
+        resolve : Resolve1D
+            データセットの設定 (size, sampling は使わない)
+            noise_ave, noise_std があり add_noise=True の場合にノイズを付加する
+        batch_size : int
+        chunk_size : int, optional
+            ワーカーの1ジョブのサンプル数 (None の場合 batch_size)
+        pool_size : int
+            バッチを選ぶノイズなしサンプルの上限 (古いものから置き換える)
+        queue_size : int
+            ワーカーからのキューの上限 (chunk 数)
+            キューが満杯の間、ワーカーへの新しいジョブの投入を止める
+        workers : int, optional
+            ワーカープロセス数 (None の場合 CPU のコア数)
+        noisy_fraction : float
+            ノイズを付加するサンプルの割合 (emulatte_RESOLVE と同じ 0.7)
+        scaler : optional
+            x を変換する scaler.transform (sklearn の StandardScaler など)
+        seed : int, optional
+            ワーカーの乱数シードの元
+        min_pool : int, optional
+            最初のバッチを返す前に pool にためる行数
+            (None の場合 min(10 * batch_size, pool_size))
+        noise_kwargs : dict, optional
+            NoiseModel.add_noise のキーワード引数
+            (height_ref, height_exponent, relative_std; 高度は x の height の列)
+            p, heights は noisy_fraction と x の height の列で与えるので指定できない
+        """
+        # ワーカーにはノイズなしの応答を計算させる
+        self.resolve = copy.copy(resolve)
+        self.resolve.add_noise = False
+        self.resolve.sampling = 'random'
+        self.add_noise = resolve.add_noise and (resolve.noise_std is not None)
+        self.noise_ave = resolve.noise_ave
+        self.noise_std = resolve.noise_std
+        self.noisy_fraction = noisy_fraction
+        self.noise_kwargs = {} if noise_kwargs is None else dict(noise_kwargs)
+        for key in ['p', 'heights']:
+            if key in self.noise_kwargs:
+                raise Exception(
+                    'noise_kwargs must not contain {!r} '
+                    '(use noisy_fraction for p; heights are the height column of x)'.format(key))
+        self.batch_size = batch_size
+        self.chunk_size = batch_size if chunk_size is None else chunk_size
+        self.pool_size = pool_size
+        if min_pool is None:
+            min_pool = 10 * batch_size
+        self.min_pool = min(max(min_pool, batch_size), pool_size)
+        self.workers = cpu_count() if workers is None else workers
+        self.scaler = scaler
+        self.seeds = np.random.SeedSequence(seed)
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.pool = np.zeros((pool_size, self.resolve.ncol))
+        self.filled = 0
+        self.cursor = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+        # ワーカーで発生した例外 (バッチを要求した側で送出する)
+        self.error = None
+
+    @property
+    def nresp(self):
+        return 2 * self.resolve.nfreq
+
+    def start(self):
+        """
+        ワーカーの計算を開始する
+        """
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        return self
+
+    def close(self):
+        """
+        ワーカーを停止する (計算中のジョブの終了を待つ)
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _run(self):
+        try:
+            self._produce_loop()
+        except Exception as e:
+            self.error = e
+
+    def _produce_loop(self):
+        with futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
+            jobs = set()
+            while not self.stop_event.is_set():
+                while len(jobs) < self.workers:
+                    seed = int(self.seeds.spawn(1)[0].generate_state(1)[0])
+                    jobs.add(executor.submit(
+                        _produce, self.resolve, self.chunk_size, seed))
+                done, jobs = futures.wait(
+                    jobs, timeout=0.5, return_when=futures.FIRST_COMPLETED)
+                for job in done:
+                    chunk = job.result()
+                    while not self.stop_event.is_set():
+                        try:
+                            self.queue.put(chunk, timeout=0.5)
+                            break
+                        except queue.Full:
+                            continue
+            for job in jobs:
+                job.cancel()
+
+    def _collect(self, minimum):
+        """
+        キューの chunk を pool に取り込む (pool が minimum 行になるまで待つ)
+        """
+        while True:
+            try:
+                block = self.filled < minimum
+                chunk = self.queue.get(block=block, timeout=1 if block else None)
+            except queue.Empty:
+                if self.filled >= minimum:
+                    return
+                if self.error is not None:
+                    raise self.error
+                if self.thread is None or not self.thread.is_alive():
+                    raise Exception('the stream is not started')
+                continue
+            chunk = chunk[-self.pool_size:]
+            index = (self.cursor + np.arange(len(chunk))) % self.pool_size
+            self.pool[index] = chunk
+            self.cursor = (self.cursor + len(chunk)) % self.pool_size
+            self.filled = min(self.filled + len(chunk), self.pool_size)
+
+    def transform(self, data):
+        """
+        ノイズなしのサンプル [resp, height, resistivity] から
+        ノイズを付加した x = [resp, height] と y = log10(resistivity)
+        """
+        x = data[:, :self.nresp + 1].copy()
+        if self.add_noise:
+            x[:, :self.nresp] = nm.add_noise(
+                x[:, :self.nresp], self.noise_ave, self.noise_std,
+                p=self.noisy_fraction, heights=x[:, self.nresp],
+                **self.noise_kwargs)
+        y = np.log10(data[:, self.nresp + 1:self.nresp + 1 + self.resolve.nlayer])
+        if self.scaler is not None:
+            x = self.scaler.transform(x)
+        return x, y
+
+    def sample(self, size):
+        """
+        pool から size 行 (x, y) を選ぶ (検証用データ・scaler の学習用)
+        pool に size 行たまるまで待つ (size <= pool_size)
+        """
+        self._collect(min(size, self.pool_size))
+        rows = np.random.choice(self.filled, size, replace=size > self.filled)
+        return self.transform(self.pool[rows])
+
+    def batches(self):
+        """
+        (x, y) のバッチを返し続けるジェネレータ
+        """
+        while True:
+            self._collect(self.min_pool)
+            rows = np.random.randint(0, self.filled, self.batch_size)
+            yield self.transform(self.pool[rows])
+
+    def dataset(self, prefetch=2):
+        """
+        Keras の fit に渡す tf.data.Dataset
+        (無限に続くので steps_per_epoch を指定する)
+        """
+        import tensorflow as tf
+        nx = self.nresp + 1
+        ny = len(self.resolve.thicks) + 1
+        signature = (
+            tf.TensorSpec(shape=(None, nx), dtype=tf.float64),
+            tf.TensorSpec(shape=(None, ny), dtype=tf.float64),
+        )
+        self.start()
+        ds = tf.data.Dataset.from_generator(self.batches, output_signature=signature)
+        return ds.prefetch(prefetch)
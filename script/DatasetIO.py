@@ -0,0 +1,144 @@
+import os
+import json
+import warnings
+import numpy as np
+from . import NoiseModel as nm
+
+# データセットファイルの形式
+# <name>.npy  : (size, ncol) float64 の行列 [resp, height, resistivity]
+#               (Resolve1D(ip=...) の場合は [resp, height, resistivity, m, tau, c])
+# <name>.json : 列の配置と Resolve1D の設定
+FORMAT_VERSION = 1
+
+def metadata_path(path):
+    return os.path.splitext(path)[0] + '.json'
+
+def column_ranges(nfreq, nlayer, ip=False):
+    """
+    列名 -> (開始列, 終了列)
+    resp は [Inphase * nfreq, Quadrature * nfreq] の順
+    ip : True の場合 Cole-Cole パラメータ 'm', 'tau', 'c' の列を含む
+    """
+    nresp = 2 * nfreq
+    ranges = {
+        'inphase' : (0, nfreq),
+        'quadrature' : (nfreq, nresp),
+        'resp' : (0, nresp),
+        'height' : (nresp, nresp + 1),
+        'x' : (0, nresp + 1),
+        'resistivity' : (nresp + 1, nresp + 1 + nlayer),
+    }
+    ranges['y'] = ranges['resistivity']
+    if ip:
+        stop = nresp + 1 + nlayer
+        for name in ['m', 'tau', 'c']:
+            ranges[name] = (stop, stop + nlayer)
+            stop += nlayer
+    return ranges
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    elif isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    elif isinstance(value, np.generic):
+        return value.item()
+    else:
+        return value
+
+def save_metadata(path, config, shape):
+    """
+    データセット path (.npy) に対応する JSON サイドカーを書き出す。
+
+    config : dict
+        Resolve1D.get_config() の返り値
+    shape : tuple
+        データセットの行列形状
+    """
+    nfreq = len(config['freqs'])
+    nlayer = len(config['thicks']) + 1
+    ranges = column_ranges(nfreq, nlayer, config.get('ip') is not None)
+    if shape[1] != max(stop for _, stop in ranges.values()):
+        raise Exception('dataset shape does not match the configuration')
+    meta = {
+        'format_version' : FORMAT_VERSION,
+        'shape' : list(shape),
+        'dtype' : 'float64',
+        'columns' : {key : list(val) for key, val in ranges.items()},
+        'config' : {key : _to_json(val) for key, val in config.items()},
+    }
+    with open(metadata_path(path), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+def save_dataset(path, data, config):
+    """
+    データセットを .npy 形式で保存し、設定を JSON に書き出す。
+    (Resolve1D.proceed(mmap_path=path) で生成済みの場合は
+    save_metadata のみでよい)
+    """
+    data = np.asarray(data, dtype=np.float64)
+    np.save(path, data)
+    return save_metadata(path, config, data.shape)
+
+def load_metadata(path):
+    with open(metadata_path(path)) as f:
+        meta = json.load(f)
+    if meta.get('format_version') != FORMAT_VERSION:
+        raise Exception('unsupported dataset format version')
+    return meta
+
+def load_dataset(path, columns=None, mmap=True, noise=None):
+    """
+    データセットを読み込む。
+
+    columns : str or list of str, optional
+        'x', 'y', 'resp', 'inphase', 'quadrature', 'height',
+        'resistivity' ('m', 'tau', 'c') のいずれか (リストの場合は dict で返す)
+        None の場合は全列
+    mmap : bool
+        True の場合メモリマップで開き、列の切り出しもビューとして返す
+        (ノイズを付加する場合はメモリ上のコピーになる)
+    noise : bool or dict, optional
+        読み込み時に応答の列にノイズを付加する (NoiseModel.add_noise_dataset)
+        None  -> Resolve1D(store_clean=True, add_noise=True) で保存した
+                 ノイズなしのデータセットの場合のみ付加する
+        False -> 付加しない
+        True  -> config の noise_ave, noise_std で付加する
+        dict  -> NoiseModel.add_noise のキーワード引数 (noise_ave, noise_std,
+                 p, height_ref, height_exponent, relative_std, seed)
+                 noise_ave, noise_std を省略した場合は config の値
+
+    return : (data, meta)
+    """
+    meta = load_metadata(path)
+    data = np.load(path, mmap_mode='r' if mmap else None)
+    if tuple(data.shape) != tuple(meta['shape']):
+        raise Exception('dataset shape does not match the metadata')
+
+    config = meta['config']
+    clean = config.get('store_clean', False) or not config.get('add_noise', False)
+    if noise is None:
+        noise = config.get('store_clean', False) and config.get('add_noise', False)
+    if noise is not False:
+        kwargs = {} if noise is True else dict(noise)
+        kwargs.setdefault('noise_ave', config.get('noise_ave'))
+        kwargs.setdefault('noise_std', config.get('noise_std'))
+        if kwargs['noise_ave'] is None or kwargs['noise_std'] is None:
+            raise Exception('noise_ave and noise_std are required to add noise')
+        if not clean:
+            warnings.warn('the dataset already contains noise')
+        data = nm.add_noise_dataset(data, len(config['freqs']), **kwargs)
+
+    if columns is None:
+        return data, meta
+    elif isinstance(columns, str):
+        return _take(data, meta, columns), meta
+    else:
+        return {col : _take(data, meta, col) for col in columns}, meta
+
+def _take(data, meta, column):
+    if not column in meta['columns']:
+        raise NameError('invalid column name : ' + column)
+    start, stop = meta['columns'][column]
+    return data[:, start:stop]
@@ -1,14 +1,41 @@
+import weakref
 import numpy as np
-from multiprocessing import cpu_count
+from multiprocessing import cpu_count, shared_memory
 from concurrent import futures
 from . import ModelingToolKit as mtk
 from . import emforward as emf
+from . import NoiseModel as nm
+
+class SharedArray(np.ndarray):
+    """
+    共有メモリ (SharedMemory) 上の配列 (Resolve1D.proceed の返り値)
+    コピーせずに共有メモリを直接参照し、この配列 (とそのビュー) への
+    参照がなくなった時点で共有メモリを解放 (unlink) する。
+    """
+    def __new__(cls, shm, shape):
+        obj = np.ndarray.__new__(cls, shape, dtype=np.float64, buffer=shm.buf)
+        obj.shm = shm
+        # close は配列がバッファを手放した後に SharedMemory.__del__ で行う
+        weakref.finalize(obj, shm.unlink)
+        return obj
+
+    def __array_finalize__(self, obj):
+        # ビューは元の配列 (base) を参照して共有メモリを保持する
+        self.shm = None
+
+    def __reduce__(self):
+        # pickle (プロセス間の受け渡し, np.save 等) は通常の配列として
+        return np.asarray(self).copy().__reduce__()
+
 
 class Resolve1D:
     def __init__(
             self, 
             size, thicks, bgrlim, bhlim, freqs, spans, vca_index=3,
             add_noise=False, noise_ave=None, noise_std=None, generate_mode='default',
+            precision='double', backend='numpy', heights_per_model=1,
+            hankel_filter='werthmuller201', sampling='random', seed=None,
+            store_clean=False, workers=None, ip=None,
             ):
         self.size               = size
         # Geophysical subsurface model
@@ -25,40 +52,378 @@ class Resolve1D:
         self.add_noise = add_noise
         self.noise_ave = noise_ave
         self.noise_std = noise_std
-        
+        # True : add_noise でもノイズなしの応答を保存する
+        # (DatasetIO.load_dataset で読み込み時に NoiseModel でノイズを付加する)
+        self.store_clean = store_clean
+        # 'single' : complex64 で層の漸化計算 (emulate の precision)
+        self.precision = precision
+        # 'numba' : 層の漸化計算を numba でコンパイル (emulate の backend)
+        self.backend = backend
+        # 1つの比抵抗構造あたりの曳航高度の数 (高度のデータ拡張)
+        # 反射係数を共有するため、高度を増やしても漸化計算は増えない
+        self.heights_per_model = heights_per_model
+        # 'auto' : 精度表から最短のフィルタを選択 (emulate の hankel_filter)
+        self.hankel_filter = hankel_filter
+        # Cole-Cole (Pelton) の IP パラメータ m, tau, c を各層に生成する場合の
+        # 範囲 (mtk.ip_parameters の mlim, taulim, clim, {} で既定の範囲)
+        # 各行の比抵抗 (res_0) の後に m, tau, c の列を追加する
+        self.ip = None if ip is None else dict(ip)
+        # 比抵抗構造・曳航高度のサンプリング (mtk.unit_sample の method)
+        # 'sobol', 'halton', 'lhs' : データセット全体で1つの点列を使う
+        if sampling not in mtk.SAMPLING_METHODS:
+            raise NameError('invalid sampling name')
+        self.sampling = sampling
+        # 各プロセスが同じ点列を再生成できるよう seed を固定する
+        if (sampling != 'random') and (seed is None):
+            seed = int(np.random.SeedSequence().generate_state(1)[0])
+        self.seed = seed
+        self._design = None
+        # proceed(), proceed_models() のプロセス数 (None : CPUのコア数)
+        # 計算機に依存するため get_config には含めない
+        self.workers = cpu_count() if workers is None else workers
+        # proceed() で確保する共有メモリ
+        self.shm = None
+
+    def get_config(self):
+        """
+        Resolve1D(**config) で同じ設定を再現できる dict
+        (DatasetIO でデータセットと共に保存する)
+        """
+        config = {
+            'size' : self.size,
+            'thicks' : self.thicks,
+            'bgrlim' : self.bgrlim,
+            'bhlim' : self.bhlim,
+            'freqs' : self.freqs,
+            'spans' : self.spans,
+            'vca_index' : self.vca_index,
+            'add_noise' : self.add_noise,
+            'store_clean' : self.store_clean,
+            'noise_ave' : self.noise_ave,
+            'noise_std' : self.noise_std,
+            'generate_mode' : self.generate_mode,
+            'precision' : self.precision,
+            'backend' : self.backend,
+            'heights_per_model' : self.heights_per_model,
+            'hankel_filter' : self.hankel_filter,
+            'sampling' : self.sampling,
+            'seed' : self.seed,
+            'ip' : self.ip,
+        }
+        return config
+
+    def proceed(self, mmap_path=None):
+        """
+        データセットを並列に生成する。
+        各プロセスは共有メモリ (mmap_path を指定した場合は .npy の
+        メモリマップ) 上の割り当て行に直接書き込む。
+        共有メモリの場合は共有メモリ上の配列 (SharedArray) をコピーせずに
+        返し、共有メモリは返り値が不要になった時点で解放される
+        (インスタンスの寿命に依存しない)。
+
+        mmap_path : str, optional
+            指定した場合、結果を .npy ファイルとして書き出しメモリマップで返す
+
+        各プロセスはノイズなしの応答を計算し、add_noise の場合は
+        最後に全行まとめてノイズを付加する (store_clean の場合は付加しない)
 
-    def proceed(self):
-        # タスクはコア数の倍に設定?
-        ncpu = 20
-        # CPUのコア数を最大プロセス数とする
-        nsplit = cpu_count()
-        iters = np.split(np.arange(self.size), nsplit)
-        func = self.task
+        return : ndarray (size, 2 * nfreq + 1 + len(thicks) + 1)
+        """
+        # workers を最大プロセス数とし、タスクも同じ数に分割する
+        ncpu = nsplit = self.workers
+        # 同じ比抵抗構造の行 (model_batches) が分かれないように分割する
+        step = self.model_step
+        nmodel = -(-self.size // step)
+        iters = [
+            np.arange(group[0] * step, min((group[-1] + 1) * step, self.size))
+            for group in np.array_split(np.arange(nmodel), nsplit) if len(group) > 0]
+        shape = (self.size, self.ncol)
+
+        self.release()
+        if mmap_path is None:
+            nbytes = int(np.prod(shape)) * np.dtype(np.float64).itemsize
+            self.shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+            target = ('shm', self.shm.name, shape)
+        else:
+            result = np.lib.format.open_memmap(
+                mmap_path, mode='w+', dtype=np.float64, shape=shape)
+            result.flush()
+            target = ('mmap', mmap_path, shape)
+
+        # 点列は親プロセスで1回だけ生成し、各タスクには担当する行だけを渡す
+        blocks = [self.design_block(rows) for rows in iters]
+        func = self.task_to_buffer
+        try:
+            with futures.ProcessPoolExecutor(max_workers=ncpu) as executor:
+                jobs = [executor.submit(func, target, rows, design)
+                        for rows, design in zip(iters, blocks)]
+                for job in jobs:
+                    job.result()
+            if mmap_path is None:
+                # 共有メモリの管理は返り値の SharedArray に移す
+                result = SharedArray(self.shm, shape)
+                self.shm = None
+        finally:
+            self.release()
+        if self.add_noise and not self.store_clean:
+            self.apply_noise(result)
+            if mmap_path is not None:
+                result.flush()
+        return result
+
+    def proceed_models(self, resistivity, heights, add_noise=None, ip=None):
+        """
+        与えた比抵抗構造と曳航高度のサンプルを並列に計算する。
+
+        resistivity : ndarray (n, len(thicks) + 1)
+        heights : ndarray (n,)
+        add_noise : bool, optional
+            None の場合 self.add_noise
+        ip : dict, optional
+            'm', 'tau', 'c' : ndarray (n, len(thicks) + 1)
+            (Resolve1D(ip=...) の場合は必須)
+
+        return : ndarray (n, ncol)
+        """
+        resistivity = np.asarray(resistivity, dtype=float)
+        heights = np.asarray(heights, dtype=float)
+        ncpu = nsplit = self.workers
+        iters = [rows for rows in np.array_split(np.arange(len(heights)), nsplit)
+                 if len(rows) > 0]
+        func = self.task_models
         with futures.ProcessPoolExecutor(max_workers=ncpu) as executor:
-            result_maker = executor.map(func, iters)
-        result = np.vstack([ans for ans in result_maker])
+            jobs = [executor.submit(
+                        func, resistivity[rows], heights[rows], False,
+                        None if ip is None else {k: np.asarray(v)[rows] for k, v in ip.items()})
+                    for rows in iters]
+            result = [job.result() for job in jobs]
+        if not result:
+            return np.zeros((0, self.ncol))
+        result = np.vstack(result)
+        if self.add_noise if add_noise is None else add_noise:
+            self.apply_noise(result)
         return result
 
+    def task_models(self, resistivity, heights, add_noise=None, ip=None):
+        return np.vstack([
+            self.simulate_model(
+                res, [height], add_noise,
+                None if ip is None else {k: v[i] for k, v in ip.items()})
+            for i, (res, height) in enumerate(zip(resistivity, heights))])
+
+    def apply_noise(self, data):
+        """
+        data [resp, height, resistivity] の応答の列に NoiseModel でノイズを付加する
+        (書き換え, emulatte_RESOLVE(add_noise=True) と同じ分布)
+        """
+        nresp = 2 * self.nfreq
+        data[:, :nresp] = nm.add_noise(
+            data[:, :nresp], self.noise_ave, self.noise_std)
+        return data
+
+    def release(self):
+        """
+        proceed() で確保した共有メモリを解放する。
+        (proceed() の終了後は返り値の SharedArray が管理するので、
+        通常は呼ぶ必要はない)
+        """
+        shm = getattr(self, 'shm', None)
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+            self.shm = None
+
+    def __getstate__(self):
+        # 共有メモリのハンドルと点列はワーカーに渡さない
+        # (点列はタスク毎に design_block で必要な行だけを渡す)
+        state = self.__dict__.copy()
+        state.pop('shm', None)
+        state['_design'] = None
+        return state
+
+    @property
+    def nlayer(self):
+        return len(self.thicks) + 1
+
+    @property
+    def ncol(self):
+        # [Re, Im] * nfreq + 曳航高度 + 比抵抗 (len(thicks) + 1)
+        # (+ m, tau, c (各 len(thicks) + 1), ip を指定した場合)
+        ncol = 2 * self.nfreq + 1 + self.nlayer
+        if self.ip is not None:
+            ncol += mtk.colecole_dims(self.nlayer)
+        return ncol
+
+    def task_to_buffer(self, target, rows, design=None):
+        """
+        rows の各行を生成し、共有メモリ (またはメモリマップ) に書き込む。
+        design : (start, ndarray), optional
+            rows の比抵抗構造の点列 (design_block)
+        """
+        kind, name, shape = target
+        if kind == 'shm':
+            shm = shared_memory.SharedMemory(name=name)
+            out = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        else:
+            out = np.load(name, mmap_mode='r+')
+        for index in self.model_batches(rows):
+            out[index] = self.simulate_heights(
+                len(index), self.design_units(index, design), add_noise=False)
+        if kind == 'shm':
+            del out
+            shm.close()
+        else:
+            out.flush()
+            del out
+
     def task(self, iters):
         # 説明変数Xと目的変数YのDataset
         xy_list = []
 
-        for i in iters:
-            # 層厚固定で比抵抗構造をランダム生成
-            resistivity = mtk.resistivity1D(self.thicks, self.bgrlim, self.generate_mode)
+        for index in self.model_batches(iters):
+            xy_list.extend(self.simulate_heights(
+                len(index), self.design_units(index), add_noise=False))
+        
+        xy_list = np.array(xy_list)
+        if self.add_noise and not self.store_clean:
+            self.apply_noise(xy_list)
+        return xy_list
 
-            #曳航高度をランダム生成
-            height = (self.bhlim[1]-self.bhlim[0]) * np.random.rand() + self.bhlim[0]
+    @property
+    def model_step(self):
+        # 1つの比抵抗構造の行数
+        return max(int(self.heights_per_model), 1)
 
-            #RESOLVEのノイズ付応答を計算
-            resp = emf.emulatte_RESOLVE(
-                self.thicks, resistivity, self.freqs, self.nfreq, self.spans, height,
-                vca_index=self.vca_index, add_noise=self.add_noise, noise_ave=self.noise_ave, noise_std=self.noise_std
-                )
+    def model_batches(self, rows):
+        """
+        rows を heights_per_model 行ずつ (同じ比抵抗構造の行) に分ける
+        (sampling != 'random' の場合 rows[0] は heights_per_model の倍数)
+        """
+        rows = np.asarray(rows)
+        step = self.model_step
+        return [rows[i:i + step] for i in range(0, len(rows), step)]
 
-            #説明変数x, 目的変数yを格納
-            xy = np.r_[resp, height, resistivity]
-            xy_list.append(xy)
-        
-        xy_list = np.array(xy_list)
-        return xy_list
\ No newline at end of file
+    def design(self):
+        """
+        データセット全体の点列 (sampling != 'random')
+        比抵抗構造毎に1点 [高度 (heights_per_model), 比抵抗 (mtk.resistivity_dims),
+        IP (mtk.colecole_dims, ip を指定した場合)]
+        return : ndarray (比抵抗構造の数, heights_per_model + resistivity_dims)
+        """
+        if self._design is None:
+            step = self.model_step
+            nmodel = -(-self.size // step)
+            dim = step + mtk.resistivity_dims(self.generate_mode)
+            if self.ip is not None:
+                dim += mtk.colecole_dims(self.nlayer)
+            self._design = mtk.unit_sample(nmodel, dim, self.sampling, self.seed)
+        return self._design
+
+    def design_block(self, rows):
+        """
+        rows (model_batches で分けた連続する行) の比抵抗構造の点列
+        return : (start, ndarray) or None (sampling == 'random')
+            start : 最初の比抵抗構造の番号
+        """
+        if self.sampling == 'random':
+            return None
+        step = self.model_step
+        start = rows[0] // step
+        stop = (rows[-1] // step) + 1
+        return start, self.design()[start:stop]
+
+    def design_units(self, index, design=None):
+        """
+        index の行 (同じ比抵抗構造) に使う点列の値
+        design : (start, ndarray), optional
+            index を含む点列の一部 (design_block)
+            None の場合 design() (点列全体を生成する)
+        return : (height_u, model_u) or None (sampling == 'random')
+        """
+        if self.sampling == 'random':
+            return None
+        step = self.model_step
+        start, block = (0, self.design()) if design is None else design
+        point = block[index[0] // step - start]
+        return point[:len(index)], point[step:]
+
+    def simulate(self):
+        """
+        ランダムな比抵抗構造・曳航高度に対する1サンプル
+        return : ndarray [resp, height, resistivity]
+        """
+        return self.simulate_heights(1)[0]
+
+    def simulate_heights(self, nheight, units=None, add_noise=None):
+        """
+        ランダムな比抵抗構造1つに対し、ランダムな曳航高度 nheight 個のサンプル
+        units : (height_u, model_u), optional
+            擬似乱数の代わりに使う [0, 1) の値 (design_units)
+            'normal' モードの比抵抗構造は常に擬似乱数
+        add_noise : bool, optional
+            None の場合 self.add_noise
+        return : ndarray (nheight, ncol) 各行 [resp, height, resistivity]
+        """
+        height_u, model_u = (None, None) if units is None else units
+        res_u = ip_u = None
+        if model_u is not None:
+            dims = mtk.resistivity_dims(self.generate_mode)
+            res_u = model_u[:dims] if dims > 0 else None
+            ip_u = model_u[dims:] if self.ip is not None else None
+        # 層厚固定で比抵抗構造をランダム生成
+        resistivity = mtk.resistivity1D(
+            self.thicks, self.bgrlim, self.generate_mode, u=res_u)
+        ip = self.sample_ip(ip_u)
+
+        #曳航高度をランダム生成
+        if height_u is None:
+            height_u = np.random.rand(nheight)
+        heights = (self.bhlim[1]-self.bhlim[0]) * height_u + self.bhlim[0]
+        return self.simulate_model(resistivity, heights, add_noise, ip)
+
+    def sample_ip(self, u=None):
+        """
+        比抵抗構造1つの IP パラメータ (ip を指定しない場合は None)
+        u : array-like (mtk.colecole_dims), optional
+            擬似乱数の代わりに使う [0, 1) の値
+        return : dict 'm', 'tau', 'c' : ndarray (len(thicks) + 1,)
+        """
+        if self.ip is None:
+            return None
+        if u is None:
+            u = np.random.rand(mtk.colecole_dims(self.nlayer))
+        params = mtk.ip_parameters(np.asarray(u)[None, :], **self.ip)
+        return {key: val[0] for key, val in params.items()}
+
+    def simulate_model(self, resistivity, heights, add_noise=None, ip=None):
+        """
+        与えた比抵抗構造と曳航高度のサンプル
+        add_noise : bool, optional
+            None の場合 self.add_noise
+        ip : dict, optional
+            'm', 'tau', 'c' : 各層の Cole-Cole パラメータ
+            (Resolve1D(ip=...) の場合は必須)
+        return : ndarray (len(heights), ncol)
+            各行 [resp, height, resistivity (, m, tau, c)]
+        """
+        if (self.ip is None) != (ip is None):
+            raise Exception('ip must be given if and only if Resolve1D(ip=...)')
+        if add_noise is None:
+            add_noise = self.add_noise
+        heights = np.atleast_1d(heights)
+        nheight = len(heights)
+
+        #RESOLVEのノイズ付応答を計算
+        resp = emf.emulatte_RESOLVE_heights(
+            self.thicks, resistivity, self.freqs, self.nfreq, self.spans, heights,
+            vca_index=self.vca_index, add_noise=add_noise, noise_ave=self.noise_ave, noise_std=self.noise_std,
+            precision=self.precision, backend=self.backend,
+            hankel_filter=self.hankel_filter, ip=ip
+            )
+
+        #説明変数x, 目的変数yを格納
+        y = resistivity
+        if ip is not None:
+            y = np.r_[resistivity, ip['m'], ip['tau'], ip['c']]
+        xy = np.c_[resp, heights, np.tile(y, (nheight, 1))]
+        return xy
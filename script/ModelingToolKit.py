@@ -1,8 +1,13 @@
 # Subsurface Modeling Kits
 import random
+import warnings
 import numpy as np
 import matplotlib.pyplot as plt
 from ipywidgets import IntSlider, interact, Layout
+from scipy.stats import qmc
+
+# unit_sample の method
+SAMPLING_METHODS = ['random', 'sobol', 'halton', 'lhs']
 
 def tmake(init_thick, last_depth, nlayer, scale):
     if scale == 'log':
@@ -42,13 +47,59 @@ def show_structure(thickness, depth):
         print(char ,end=eol)
     print('infinity|')
 
-def resistivity1D(thicks, brlim, generate_mode):
+def unit_sample(size, dim, method='random', seed=None):
+    """
+    [0, 1)^dim の点を size 個生成する
+
+    method : str
+        'random' : np.random.rand (擬似乱数)
+        'sobol', 'halton' : scrambled 準乱数列 (scipy.stats.qmc)
+        'lhs' : Latin hypercube (scipy.stats.qmc)
+    seed : int, optional
+        qmc の乱数シード (同じ seed なら同じ点列)
+
+    return : ndarray (size, dim)
+    """
+    if method == 'random':
+        return np.random.rand(size, dim)
+    if method == 'sobol':
+        sampler = qmc.Sobol(dim, scramble=True, seed=seed)
+    elif method == 'halton':
+        sampler = qmc.Halton(dim, scramble=True, seed=seed)
+    elif method == 'lhs':
+        sampler = qmc.LatinHypercube(dim, seed=seed)
+    else:
+        raise NameError('invalid sampling method name')
+    with warnings.catch_warnings():
+        # Sobol 列は size が 2 のべき乗でないと警告が出る
+        warnings.simplefilter('ignore', UserWarning)
+        return sampler.random(size)
+
+def resistivity_dims(generate_mode):
+    """
+    resistivity1D の u の次元 (比抵抗構造1つに使う一様乱数の数)
+    'normal' は乱数の数が一定でないため 0 (u は使えない)
+    """
+    if generate_mode == 'default':
+        # 分割数, 各区間の比抵抗 (最大 7), 境界 (最大 6), 平滑化の重み
+        return 15
+    elif generate_mode == 'ymtmt':
+        # 構造の数, 各構造の比抵抗 (3), 境界 (3)
+        return 7
+    return 0
+
+def resistivity1D(thicks, brlim, generate_mode, u=None):
     """
     thicks : list, array-like
         list of thickness in each layer
     brlim : list [min, max]
         limits of resistivity range (Ohm-m)
+    u : array-like, optional
+        'default', 'ymtmt' で擬似乱数の代わりに使う [0, 1) の値
+        (長さ resistivity_dims(generate_mode), unit_sample の1行)
     """
+    if (u is not None) and (len(u) < resistivity_dims(generate_mode)):
+        raise Exception('u must have resistivity_dims(generate_mode) elements')
     if generate_mode == "normal":
         size = len(thicks) + 1
         lower = np.log10(brlim[0])
@@ -103,7 +154,11 @@ def resistivity1D(thicks, brlim, generate_mode):
             対数間隔でランダムに乱数を生成する
             :return:
             """
-            res_index = np.log10(brlim[1] / brlim[0]) * np.random.rand(num) + np.log10(brlim[0])
+            if u is None:
+                rand = np.random.rand(num)
+            else:
+                rand = np.array([next(res_u) for i in range(num)])
+            res_index = np.log10(brlim[1] / brlim[0]) * rand + np.log10(brlim[0])
             res = 10 ** res_index
             return list(res)
         
@@ -113,6 +168,14 @@ def resistivity1D(thicks, brlim, generate_mode):
             :param num:
             :return:
             """
+            if u is not None:
+                # 1 ~ layer_num から非復元抽出
+                pool = list(range(1, layer_num + 1))
+                random_list = [
+                    pool.pop(min(int(ui * len(pool)), len(pool) - 1))
+                    for ui in u[4:4 + divider_num]]
+                random_list.sort()
+                return random_list
             random_list = []
             list_num = 0
             while list_num < divider_num:
@@ -123,11 +186,18 @@ def resistivity1D(thicks, brlim, generate_mode):
             random_list.sort()
             return random_list
         
-        thickness_num = np.random.randint(1, 4)
+        if u is None:
+            thickness_num = np.random.randint(1, 4)
+        else:
+            res_u = iter(u[1:4])
+            thickness_num = 1 + min(int(u[0] * 3), 2)
         if thickness_num == 1:
             res = random_resistivity_logscale(1) * layer_num
         elif thickness_num == 2:
-            divider = np.random.randint(1, layer_num, 1)
+            if u is None:
+                divider = np.random.randint(1, layer_num, 1)
+            else:
+                divider = [1 + min(int(u[4] * (layer_num - 1)), layer_num - 2)]
             res = random_resistivity_logscale(1) * divider[0] + random_resistivity_logscale(1) * (layer_num - divider[0])
         elif thickness_num == 3:
             divider = random_int_nolap(thickness_num, layer_num)
@@ -148,11 +218,17 @@ def resistivity1D(thicks, brlim, generate_mode):
         resmin = np.log10(brlim[0])
         resmax = np.log10(brlim[1])
 
-        cut = np.random.randint(1,7)
-        brval = (resmax-resmin)*np.random.rand(cut+1) + resmin
-
         Lnum = [i+1 for i in range(len(res))]
-        bound = np.random.choice(Lnum, cut)
+        if u is None:
+            cut = np.random.randint(1,7)
+            brval = (resmax-resmin)*np.random.rand(cut+1) + resmin
+            bound = np.random.choice(Lnum, cut)
+        else:
+            # u[0] : 分割数, u[1:8] : 比抵抗, u[8:14] : 境界, u[14] : 平滑化
+            u = np.asarray(u)
+            cut = 1 + min(int(u[0] * 6), 5)
+            brval = (resmax-resmin)*u[1:cut+2] + resmin
+            bound = np.array(Lnum)[np.minimum((u[8:8+cut] * layer_num).astype(int), layer_num - 1)]
         bound.sort()
 
         bi = 0
@@ -165,12 +241,139 @@ def resistivity1D(thicks, brlim, generate_mode):
         for i in range(layer_num):
             res = movearg(res)
 
-        smooth = np.random.rand()
+        if u is None:
+            smooth = np.random.rand()
+        else:
+            smooth = u[14]
         resexp = smooth*res+(1-smooth)*res0
         res_arr = 10 ** resexp
         return res_arr
 
     
+def resistivity1D_batch(size, thicks, brlim, generate_mode, u=None):
+    """
+    resistivity1D の比抵抗構造を size 個まとめて生成する
+    'default', 'ymtmt' は全構造をまとめて配列演算で生成し、
+    u を与えた場合は各行 u[i] について resistivity1D(u=u[i]) と一致する。
+    'normal' は構造毎に乱数の数が異なるため resistivity1D を繰り返す。
+
+    u : ndarray (size, resistivity_dims(generate_mode)), optional
+        擬似乱数の代わりに使う [0, 1) の値
+
+    return : ndarray (size, len(thicks) + 1)
+    """
+    nlayer = len(thicks) + 1
+    dims = resistivity_dims(generate_mode)
+    if generate_mode not in ('default', 'ymtmt'):
+        return np.array([resistivity1D(thicks, brlim, generate_mode)
+                         for i in range(size)]).reshape(size, nlayer)
+    if u is None:
+        u = np.random.rand(size, dims)
+    u = np.asarray(u, dtype=float)
+    if u.shape != (size, dims):
+        raise Exception('u must have shape (size, resistivity_dims(generate_mode))')
+    resmin = np.log10(brlim[0])
+    resmax = np.log10(brlim[1])
+    layers = np.arange(nlayer)
+
+    if generate_mode == 'ymtmt':
+        # 構造の数 (1 ~ 3), 各構造の比抵抗, 境界 (1 ~ nlayer の非復元抽出)
+        nstruct = 1 + np.minimum((u[:, 0] * 3).astype(int), 2)
+        value = 10 ** ((resmax - resmin) * u[:, 1:4] + resmin)
+        # 2構造 : 境界は 1 ~ nlayer - 1
+        divider2 = 1 + np.minimum((u[:, 4] * (nlayer - 1)).astype(int), nlayer - 2)
+        # 3構造 : 残りの候補から順に抽出した3点のうち小さい2点
+        chosen = np.zeros((size, 0), dtype=int)
+        for k in range(3):
+            count = nlayer - k
+            index = np.minimum((u[:, 4 + k] * count).astype(int), count - 1)
+            # index 番目の未抽出の値 (1始まり)
+            pick = index + 1
+            for prev in np.sort(chosen, axis=1).T:
+                pick = pick + (pick >= prev)
+            chosen = np.c_[chosen, pick]
+        # 各構造の最初の層 (2, 3番目の構造)
+        bounds = np.sort(chosen, axis=1)[:, :2]
+        bounds[nstruct == 2] = np.c_[divider2, np.full(size, nlayer)][nstruct == 2]
+        bounds[nstruct == 1] = nlayer
+        region = (layers[None, :] >= bounds[:, :1]).astype(int) \
+            + (layers[None, :] >= bounds[:, 1:2])
+        return np.take_along_axis(value, region, axis=1)
+
+    # 'default'
+    # u[:, 0] : 分割数, u[:, 1:8] : 比抵抗, u[:, 8:14] : 境界, u[:, 14] : 平滑化
+    cut = 1 + np.minimum((u[:, 0] * 6).astype(int), 5)
+    brval = (resmax - resmin) * u[:, 1:8] + resmin
+    bound = 1 + np.minimum((u[:, 8:14] * nlayer).astype(int), nlayer - 1)
+    # 各層の区間番号 = 層番号より小さい (重複しない) 境界の数
+    valid = np.arange(6)[None, :] < cut[:, None]
+    bound = np.sort(np.where(valid, bound, nlayer + 1), axis=1)
+    first = np.c_[np.ones((size, 1), dtype=bool), bound[:, 1:] != bound[:, :-1]]
+    bound = np.where(first, bound, nlayer + 1)
+    region = np.sum(bound[:, None, :] < layers[None, :, None], axis=2)
+    res0 = np.take_along_axis(brval, region, axis=1)
+    res = res0.copy()
+    for i in range(nlayer):
+        res = movearg_batch(res)
+    smooth = u[:, 14:15]
+    return 10 ** (smooth * res + (1 - smooth) * res0)
+
+
+def colecole_dims(nlayer):
+    """
+    ip_parameters の u の次元 (m, tau, c の各層)
+    """
+    return 3 * nlayer
+
+
+def ip_parameters(u, mlim=(0, 0.8), taulim=(1e-5, 1e-1), clim=(0.1, 1.0)):
+    """
+    [0, 1) の値 u (size, colecole_dims(nlayer)) から Cole-Cole (Pelton) の
+    m, tau, c を各層独立に生成する (tau は対数一様)
+
+    return : dict
+        'm', 'tau', 'c' : ndarray (size, nlayer)
+    """
+    u = np.asarray(u, dtype=float)
+    um, utau, uc = np.split(u, 3, axis=-1)
+    logtau = np.log10(taulim)
+    return {
+        'm' : (mlim[1] - mlim[0]) * um + mlim[0],
+        'tau' : 10 ** ((logtau[1] - logtau[0]) * utau + logtau[0]),
+        'c' : (clim[1] - clim[0]) * uc + clim[0],
+    }
+
+
+def colecole1D(size, thicks, brlim, generate_mode, mlim=(0, 0.8), taulim=(1e-5, 1e-1), clim=(0.1, 1.0), u=None):
+    """
+    Cole-Cole (Pelton) モデルの IP 構造を size 個まとめて生成する
+    res_0 は resistivity1D と同じ構造生成 (resistivity1D_batch)、
+    m, tau, c は各層独立の一様乱数 (tau は対数一様) でまとめて生成する
+
+    size : int
+        number of models
+    thicks : list, array-like
+        list of thickness in each layer
+    brlim : list [min, max]
+        limits of DC resistivity range (Ohm-m)
+    mlim, taulim, clim : tuple (min, max)
+        limits of chargeability, time constant (s) and frequency exponent
+    u : ndarray (size, resistivity_dims + colecole_dims), optional
+        擬似乱数の代わりに使う [0, 1) の値 (unit_sample)
+
+    return : dict
+        'res_0', 'm', 'tau', 'c' : ndarray (size, len(thicks) + 1)
+    """
+    nlayer = len(thicks) + 1
+    dims = resistivity_dims(generate_mode)
+    if u is None:
+        u = np.random.rand(size, dims + colecole_dims(nlayer))
+    u = np.asarray(u, dtype=float)
+    res_u = u[:, :dims] if generate_mode in ('default', 'ymtmt') else None
+    model = {'res_0' : resistivity1D_batch(size, thicks, brlim, generate_mode, u=res_u)}
+    model.update(ip_parameters(u[:, dims:], mlim, taulim, clim))
+    return model
+
 def movearg(x):
     span = 3
     length = len(x)
@@ -188,3 +391,14 @@ def movearg(x):
         for i in range(edge, length-edge):
             y[i] = sum(x[i-edge:i+edge+1])/span
     return y
+
+def movearg_batch(x):
+    """
+    movearg (span = 3) を各行 x[i] にまとめて適用する
+    """
+    y = x.copy()
+    y[:, 0] = (x[:, 0]*3 + x[:, 1]*2 + x[:, 2]) / 6
+    # movearg と同じく y から計算する (3層では y[:, -3] は更新済みの y[:, 0])
+    y[:, -1] = (y[:, -1]*3 + y[:, -2]*2 + y[:, -3]) / 6
+    y[:, 1:-1] = (x[:, :-2] + x[:, 1:-1] + x[:, 2:]) / 3
+    return y
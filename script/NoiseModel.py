@@ -0,0 +1,58 @@
+import numpy as np
+
+def add_noise(
+        resp, noise_ave, noise_std, p=0.7, heights=None, height_ref=30.0,
+        height_exponent=0.0, relative_std=0.0, seed=None,
+        ):
+    """
+    ノイズなしの応答 (ppm) にノイズを付加する (全サンプルをまとめて計算)
+    既定値では emulatte_RESOLVE(add_noise=True) と同じ分布:
+    確率 p のサンプルに、周波数毎に Inphase, Quadrature 独立な
+    正規乱数 N(noise_ave, noise_std) を加える
+
+    resp : ndarray (n, 2 * nfreq)
+        [Inphase * nfreq, Quadrature * nfreq] (ppm)
+    noise_ave, noise_std : array-like (nfreq,)
+        周波数毎のノイズの平均・標準偏差 (ppm)
+        e.g.) bookpurnong の各周波数のノイズレベル Christensen (2009)
+    p : float
+        ノイズを付加するサンプルの割合
+    heights : array-like (n,), optional
+        曳航高度 (m) (height_exponent を使う場合)
+    height_ref, height_exponent : float
+        高度依存のノイズ: 標準偏差を noise_std * (heights / height_ref) ** height_exponent
+        とする (height_exponent = 0 で高度によらない)
+    relative_std : float
+        乗法的ノイズ: さらに resp * N(0, relative_std) を加える
+    seed : int, optional
+        乱数シード (None の場合 np.random)
+
+    return : ndarray (n, 2 * nfreq)
+    """
+    rng = np.random if seed is None else np.random.RandomState(seed)
+    resp = np.asarray(resp, dtype=float)
+    ave = np.tile(noise_ave, 2)
+    std = np.tile(noise_std, 2) * np.ones(resp.shape)
+    if height_exponent != 0:
+        if heights is None:
+            raise Exception('heights are required for height dependent noise')
+        std *= (np.asarray(heights, dtype=float)[:, None] / height_ref) ** height_exponent
+    noisy = rng.rand(len(resp)) < p
+    noise = ave + std * rng.standard_normal(resp.shape)
+    if relative_std != 0:
+        noise += resp * relative_std * rng.standard_normal(resp.shape)
+    return resp + noise * noisy[:, None]
+
+def add_noise_dataset(data, nfreq, noise_ave, noise_std, **kwargs):
+    """
+    データセット [resp, height, resistivity] の応答の列にノイズを付加した
+    コピーを返す (高度依存のノイズには height の列を使う)
+
+    kwargs : add_noise のキーワード引数 (heights 以外)
+    """
+    nresp = 2 * nfreq
+    noisy = np.array(data, dtype=np.float64)
+    noisy[:, :nresp] = add_noise(
+        noisy[:, :nresp], noise_ave, noise_std,
+        heights=noisy[:, nresp], **kwargs)
+    return noisy
@@ -1,72 +1,118 @@
 import numpy as np
 from .emulatte import forward as fwd
+from . import NoiseModel as nm
 
 def emulatte_RESOLVE(
         thicks, resistivity, freqs, nfreq, spans, height, 
-        vca_index=None, add_noise=False, noise_ave=None, noise_std=None
+        vca_index=None, add_noise=False, noise_ave=None, noise_std=None,
+        precision='double', backend='numpy', ip=None,
+        hankel_filter='werthmuller201'
         ):
         """
+        ip : dict, optional
+            Cole-Cole parameters of the subsurface layers
+            {'m' : array, 'tau' : array, 'c' : array}
+            (resistivity is used as res_0, see ModelingToolKit.colecole1D)
+        precision : str
+            'double' or 'single' (see Subsurface1D.emulate)
+        backend : str
+            'numpy' or 'numba' (see Subsurface1D.emulate)
+        hankel_filter : str
+            Hankel変換フィルタ ('auto' で精度表から選択, see Subsurface1D.emulate)
+
         return : ndarray 
             [
                 Re(HCP1), Re(HCP2), Re(HCP3), (Re(VCX)), Re(HCP4), Re(HCP5),
                 Im(HCP1), Im(HCP2), Im(HCP3), (Im(VCX)), Im(HCP4), Im(HCP5),
             ]
         """
+        resp = emulatte_RESOLVE_heights(
+            thicks, resistivity, freqs, nfreq, spans, [height],
+            vca_index=vca_index, add_noise=add_noise,
+            noise_ave=noise_ave, noise_std=noise_std,
+            precision=precision, backend=backend, ip=ip,
+            hankel_filter=hankel_filter
+            )
+        return resp[0]
+
+def emulatte_RESOLVE_heights(
+        thicks, resistivity, freqs, nfreq, spans, heights,
+        vca_index=None, add_noise=False, noise_ave=None, noise_std=None,
+        precision='double', backend='numpy', ip=None,
+        hankel_filter='werthmuller201'
+        ):
+        """
+        1つの比抵抗構造に対する複数の曳航高度の応答
+        同じ model を使い回すため、地表の反射係数は周波数毎に1度だけ計算され
+        (Subsurface1D.compute_airborne_coefficients)、高度毎の計算は
+        直達項・反射項の指数関数とフィルタの積和のみとなる。
+
+        heights : array-like
+            曳航高度 (m)
+
+        return : ndarray (len(heights), 2 * nfreq)
+            各行は emulatte_RESOLVE の返り値と同じ並び
+        """
         #フォワード計算
-        tc = [0, 0, -height]
-        hankel_filter = 'werthmuller201'
         moment = 1
         displacement_current = False
         res = np.append(2e14, resistivity)
 
         model = fwd.model(thicks)
-        model.set_properties(res=res)
-    
-        fields = []
-        primary_fields = []
+        if ip is None:
+            model.set_properties(res=res)
+        else:
+            # 空気層は分極しない (m = 0)
+            model.set_properties(
+                res_0=res, m=np.append(0, ip['m']),
+                tau=np.append(1, ip['tau']), c=np.append(1, ip['c']))
 
-        
-        # HCP, VCA応答の計算
-        for i in range(nfreq):
-            f = np.array([freqs[i]])
-            rc = [-spans[i], 0, -height]
-            # VCAあり
-            if (nfreq == 6) and (i ==  vca_index):
-                hmdx = fwd.transmitter("HMDx", f, moment=moment)
-                model.locate(hmdx, tc, rc)
-                resp = model.emulate(hankel_filter=hankel_filter)
-                resp = resp['h_x'][0]
-                primary_field = moment / (2 * np.pi * spans[i] ** 3)
-            # VCAなし
-            else:
-                vmd = fwd.transmitter("VMD", f, moment=moment)
-                model.locate(vmd, tc, rc)
-                resp = model.emulate(hankel_filter=hankel_filter)
-                resp = resp['h_z'][0]
-                primary_field = - moment / (4 * np.pi * spans[i] ** 3)
-            fields.append(resp)
-            primary_fields.append(primary_field)
+        resps = []
+        for height in heights:
+            tc = [0, 0, -height]
+            fields = []
+            primary_fields = []
 
-        fields = np.array(fields)
-        primary_fields = np.array(primary_fields)
+            # HCP, VCA応答の計算
+            for i in range(nfreq):
+                f = np.array([freqs[i]])
+                rc = [-spans[i], 0, -height]
+                # VCAあり
+                if (nfreq == 6) and (i ==  vca_index):
+                    hmdx = fwd.transmitter("HMDx", f, moment=moment)
+                    model.locate(hmdx, tc, rc)
+                    resp = model.emulate(
+                        hankel_filter=hankel_filter, precision=precision, backend=backend,
+                        components=['h_x'])
+                    resp = resp['h_x'][0]
+                    primary_field = moment / (2 * np.pi * spans[i] ** 3)
+                # VCAなし
+                else:
+                    vmd = fwd.transmitter("VMD", f, moment=moment)
+                    model.locate(vmd, tc, rc)
+                    resp = model.emulate(
+                        hankel_filter=hankel_filter, precision=precision, backend=backend,
+                        components=['h_z'])
+                    resp = resp['h_z'][0]
+                    primary_field = - moment / (4 * np.pi * spans[i] ** 3)
+                fields.append(resp)
+                primary_fields.append(primary_field)
 
-        #１次磁場、2次磁場をppmに変換
-        inph_total_field = np.real(fields)
-        quad_secondary_field = np.imag(fields)
-        inph_secondary_field = inph_total_field - primary_fields
-        real_ppm = abs(inph_secondary_field / primary_fields) * 1e6
-        imag_ppm = abs(quad_secondary_field / primary_fields) * 1e6
-        # bookpurnongのそれぞれの周波数のノイズレベル Christensen(2009)
+            fields = np.array(fields)
+            primary_fields = np.array(primary_fields)
 
-        # ノイズ付加
-        add = np.random.choice([True, False], p=[0.7, 0.3])
-        if (add_noise & add):
-            noise = [nlv for nlv in zip(noise_ave, noise_std)]
-            for index, nlv in enumerate(noise):
-                inphnoise = np.random.normal(nlv[0], nlv[1])
-                quadnoise = np.random.normal(nlv[0], nlv[1])
-                real_ppm[index] = real_ppm[index] + inphnoise
-                imag_ppm[index] = imag_ppm[index] + quadnoise
+            #１次磁場、2次磁場をppmに変換
+            inph_total_field = np.real(fields)
+            quad_secondary_field = np.imag(fields)
+            inph_secondary_field = inph_total_field - primary_fields
+            real_ppm = abs(inph_secondary_field / primary_fields) * 1e6
+            imag_ppm = abs(quad_secondary_field / primary_fields) * 1e6
 
-        resp = np.hstack([real_ppm, imag_ppm])
-        return resp
+            resps.append(np.hstack([real_ppm, imag_ppm]))
+        resps = np.array(resps)
+
+        # ノイズ付加 (確率 0.7 の高度の応答に、周波数毎の正規乱数)
+        # bookpurnongのそれぞれの周波数のノイズレベル Christensen(2009)
+        if add_noise:
+            resps = nm.add_noise(resps, noise_ave, noise_std)
+        return resps
@@ -0,0 +1,200 @@
+# Copyright 2021 Waseda Geophysics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# -*- coding: utf-8 -*-
+"""
+均質半無限媒質の解析解 (フィルタ精度の検証用)
+
+Ward & Hohmann (1988), Electromagnetic theory for geophysical applications
+準静的近似 (変位電流を無視), 時間依存 exp(iωt)
+時間領域はステップオフ応答 (t > 0)
+"""
+import numpy as np
+import scipy.constants as const
+from scipy.special import erf, iv, ive, j0, j1, kv, roots_legendre
+
+
+def halfspace_vmd(r, omega, sigma, moment=1):
+    """
+    地表の鉛直磁気双極子による地表の磁場 (W&H eq. 4.69, 4.72)
+
+    Parameters
+    ----------
+    r : float
+        送受信点間距離 (m)
+    omega : array-like
+        角周波数 (rad/s)
+    sigma : float
+        半無限媒質の導電率 (S/m)
+
+    Returns
+    -------
+    h_z, h_r : ndarray (complex)
+    """
+    omega = np.atleast_1d(omega)
+    k = np.sqrt(-1j * omega * const.mu_0 * sigma)
+    ikr = 1j * k * r
+    h_z = moment / (2 * np.pi * k ** 2 * r ** 5) \
+            * (9 - (9 + 9 * ikr - 4 * (k * r) ** 2 - ikr * (k * r) ** 2) \
+                * np.exp(-ikr))
+    x = ikr / 2
+    h_r = - moment * k ** 2 / (4 * np.pi * r) \
+            * (iv(1, x) * kv(1, x) - iv(2, x) * kv(2, x))
+    return h_z, h_r
+
+
+def halfspace_vmd_airborne(r, height, omega, sigma, moment=1, nquad=32):
+    """
+    空中の鉛直磁気双極子による同じ高度の磁場 (W&H eq. 4.45, 4.46)
+    (解析解がないので反射項のハンケル変換を Gauss-Legendre 求積で計算する)
+
+    h_z = m / 4π * (-1 / r^3 + ∫ r_TE exp(-λ (h_s + h_r)) λ^2 J0(λ r) dλ)
+    r_TE = (λ - u) / (λ + u),  u = (λ^2 + i ω μ0 σ)^0.5
+    積分は exp(-λ (h_s + h_r)) < 4e-18 まで、J0 の半周期 (π / r) と
+    |k| の前後 (r_TE の変化する範囲) で区切った区間毎に nquad 点で計算する。
+    h_r の符号は emulatte (h_x, 受信点が x 軸上) に合わせる。
+
+    Parameters
+    ----------
+    r : float
+        送受信点間距離 (m)
+    height : float
+        送受信点の高度の和 h_s + h_r (m) (> 0)
+    omega : array-like
+        角周波数 (rad/s)
+    sigma : float
+        半無限媒質の導電率 (S/m)
+
+    Returns
+    -------
+    h_z, h_r : ndarray (complex)
+    """
+    omega = np.atleast_1d(omega)
+    x, w = roots_legendre(nquad)
+    lambda_max = 40 / height
+    h_z = np.zeros(len(omega), dtype=complex)
+    h_r = np.zeros(len(omega), dtype=complex)
+    for i, om in enumerate(omega):
+        k2 = 1j * om * const.mu_0 * sigma
+        log_k = np.log10(np.sqrt(np.abs(k2)))
+        edges = np.union1d(
+            np.linspace(0, lambda_max, int(np.ceil(lambda_max * r / np.pi)) + 1),
+            np.logspace(log_k - 4, log_k + 2, 121))
+        edges = edges[edges <= lambda_max]
+        a, b = edges[:-1, None], edges[1:, None]
+        lambda_ = ((b - a) / 2 * x + (a + b) / 2).ravel()
+        weight = ((b - a) / 2 * w).ravel()
+        u = np.sqrt(lambda_ ** 2 + k2)
+        f = (lambda_ - u) / (lambda_ + u) * np.exp(-lambda_ * height) \
+                * lambda_ ** 2 * weight
+        h_z[i] = np.sum(f * j0(lambda_ * r))
+        h_r[i] = np.sum(f * j1(lambda_ * r))
+    h_z = moment / (4 * np.pi) * (h_z - 1 / r ** 3)
+    h_r = - moment / (4 * np.pi) * h_r
+    return h_z, h_r
+
+
+def halfspace_hmd(x, y, omega, sigma, moment=1):
+    """
+    地表の x 方向水平磁気双極子による地表の h_z
+    (相反定理により VMD の h_r から求める: h_z = - x / r * h_r)
+
+    x, y : float
+        受信点の座標 (m) (送信点は原点)
+    """
+    r = np.sqrt(x ** 2 + y ** 2)
+    _, h_r = halfspace_vmd(r, omega, sigma, moment)
+    return - x / r * h_r
+
+
+def halfspace_loop(a, omega, sigma, current=1):
+    """
+    地表の円形ループ中心の h_z (W&H eq. 4.94)
+
+    a : float
+        ループ半径 (m)
+    """
+    omega = np.atleast_1d(omega)
+    k = np.sqrt(-1j * omega * const.mu_0 * sigma)
+    ika = 1j * k * a
+    return - current / (k ** 2 * a ** 3) \
+            * (3 - (3 + 3 * ika - (k * a) ** 2) * np.exp(-ika))
+
+
+def halfspace_vmd_step(r, time, sigma, moment=1):
+    """
+    地表の VMD のステップオフ応答 (W&H eq. 4.69a, 4.70, 4.72, 4.73)
+
+    time : array-like
+        時間 (s)
+
+    Returns
+    -------
+    h_z, dh_z, h_r, dh_r : ndarray
+        h_z, dh_z/dt, h_r, dh_r/dt
+    """
+    time = np.atleast_1d(time)
+    tr = np.sqrt(const.mu_0 * sigma / (4 * time)) * r
+    e = np.exp(-tr ** 2)
+    h_z = moment / (4 * np.pi * r ** 3) \
+            * ((9 / (2 * tr ** 2) - 1) * erf(tr) \
+                - (9 / tr + 4 * tr) * e / np.sqrt(np.pi))
+    dh_z = moment / (2 * np.pi * const.mu_0 * sigma * r ** 5) \
+            * (9 * erf(tr) \
+                - 2 * tr / np.sqrt(np.pi) * (9 + 6 * tr ** 2 + 4 * tr ** 4) * e)
+    # ive(n, x) = iv(n, x) * exp(-x)
+    x = tr ** 2 / 2
+    h_r = - moment * tr ** 2 / (2 * np.pi * r ** 3) * (ive(1, x) - ive(2, x))
+    dh_r = moment * tr ** 2 / (2 * np.pi * r ** 3 * time) \
+            * ((1 + tr ** 2) * ive(0, x) \
+                - (2 + tr ** 2 + 4 / tr ** 2) * ive(1, x))
+    return h_z, dh_z, h_r, dh_r
+
+
+def halfspace_hmd_step(x, y, time, sigma, moment=1):
+    """
+    地表の x 方向 HMD による地表の h_z のステップオフ応答 (相反定理)
+
+    Returns
+    -------
+    h_z, dh_z : ndarray
+    """
+    r = np.sqrt(x ** 2 + y ** 2)
+    _, _, h_r, dh_r = halfspace_vmd_step(r, time, sigma, moment)
+    return - x / r * h_r, - x / r * dh_r
+
+
+def halfspace_loop_step(a, time, sigma, current=1):
+    """
+    地表の円形ループ中心の h_z のステップオフ応答 (W&H eq. 4.98, 4.99)
+
+    Returns
+    -------
+    h_z, dh_z : ndarray
+    """
+    time = np.atleast_1d(time)
+    ta = np.sqrt(const.mu_0 * sigma / (4 * time)) * a
+    e = np.exp(-ta ** 2)
+    h_z = current / (2 * a) \
+            * (3 / (np.sqrt(np.pi) * ta) * e + (1 - 3 / (2 * ta ** 2)) * erf(ta))
+    dh_z = - current / (const.mu_0 * sigma * a ** 3) \
+            * (3 * erf(ta) - 2 / np.sqrt(np.pi) * ta * (3 + 2 * ta ** 2) * e)
+    return h_z, dh_z
+
+
+def induction_number(r, omega, sigma):
+    """
+    誘導数 B = r (ω μ0 σ)^0.5
+    """
+    return r * np.sqrt(omega * const.mu_0 * sigma)
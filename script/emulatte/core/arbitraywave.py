@@ -1,53 +1,153 @@
 import matplotlib.pyplot as plt
 import numpy as np
 from scipy.special import roots_legendre
-from scipy.interpolate import InterpolatedUnivariateSpline as iuSpline  # スプライン補間
+from scipy.interpolate import make_interp_spline  # スプライン補間
 from scipy.interpolate import pchip  # 区分的3次エルミート補間
 
-# for ver.0
-import empymod
 import emulatte.forward as fwd
+from emulatte.core import transform, waveforms
+
+# Gauss-Legendre の分点・重み (nquad 毎)
+_roots_legendre = {}
+# waveform_operator のキャッシュ
+_waveform_operators = {}
 
 
 class ArbitraryWave:
     @classmethod
-    def walktem(cls, off_time, waveform_time, waveform_current, model):
-        # get_time
-        time = cls.get_time(off_time, waveform_time)
-        # get_freq
-        time, freq, ft, ftarg = empymod.utils.check_time(
-            time=time,
-            signal=1,
-            ft='dlf',
-            ftarg={'dlf': 'key_601_CosSin_2009'},
-            verb=2
-        )
+    def walktem(cls, off_time, waveform_time, waveform_current, model,
+                ignore_displacement_current=False):
+        walktem_em = cls.walktem_batch(
+            off_time, waveform_time, waveform_current, [model],
+            ignore_displacement_current)
+        return walktem_em[0]
+
+    @classmethod
+    def walktem_batch(cls, off_time, waveform_time, waveform_current, models,
+                      ignore_displacement_current=False):
+        """WalkTEM response of many models with one waveform.
+
+        The time and frequency grids, the DLF setup, the Butterworth filter
+        response and the FD->TD transform are shared by all models; only the
+        frequency domain response is computed per model.
+
+        Parameters
+        ----------
+        off_time : ndarray
+            Gate times.
+
+        waveform_time, waveform_current : ndarray
+            Waveform of the transmitter current.
+
+        models : list of Subsurface1D
+            Models whose properties are already set.
+
+        ignore_displacement_current : bool
+            See `walktem_multi`.
+
+        Returns
+        -------
+        walktem_em : ndarray (n_models, n_gates)
+            dB/dt at `off_time`.
+        """
+        waves = [(off_time, waveform_time, waveform_current)]
+        return cls.walktem_multi(
+            waves, models,
+            ignore_displacement_current=ignore_displacement_current)[0]
+
+    @classmethod
+    def walktem_moments(cls, models, moment_types=('hm', 'lm'),
+                        ignore_displacement_current=False):
+        """WalkTEM response of several moments (e.g. HM and LM) at once.
+
+        Returns
+        -------
+        walktem_em : dict
+            {moment_type : ndarray (n_models, n_gates)}
+        """
+        waves = [waveforms.load_waveform('walktem', mt) for mt in moment_types]
+        walktem_em = cls.walktem_multi(
+            waves, models,
+            ignore_displacement_current=ignore_displacement_current)
+        return dict(zip(moment_types, walktem_em))
+
+    @classmethod
+    def walktem_multi(cls, waves, models, fft_filter='key_time_201',
+                      ignore_displacement_current=False):
+        """WalkTEM response of many models with several waveforms.
+
+        The frequency domain response is computed once per model and the step
+        response once over the union of the times required by all
+        waveforms; each waveform and gate set is then applied separately.
+
+        Parameters
+        ----------
+        waves : list of tuple
+            [(off_time, waveform_time, waveform_current), ...]
+
+        models : list of Subsurface1D
+            Models whose properties are already set.
+
+        fft_filter : str
+            Log-spaced Fourier sine/cosine filter for the lagged convolution
+            ("key_time_201" (default) or "werthmuller_time_201").
+
+        ignore_displacement_current : bool
+            False (default) -> the frequency domain response includes
+            displacement current (Subsurface1D.emulate).
+            True -> quasi-static response. Over resistive ground the
+            displacement current gives a MHz-band contribution which the
+            first-order 450 kHz Butterworth filter barely damps, and the
+            earliest HM gates differ by up to ~4 % (1000 ohm-m) between
+            the two.
+
+        Returns
+        -------
+        walktem_em : list of ndarray (n_models, n_gates)
+            dB/dt at `off_time` of each waveform.
+        """
+        # get_time (全波形が必要とする時間の範囲)
+        times = [cls.get_time(np.asarray(w[0]), np.asarray(w[1])) for w in waves]
+        tmin = min(t.min() for t in times)
+        tmax = max(t.max() for t in times)
+        # get_freq (遅延畳み込み DLF の時間・周波数; 時間範囲毎にキャッシュ)
+        # 応答はフィルタ間隔の時間 time で求まり、任意波形の補間にそのまま使う
+        omega, time = transform.FourierTransform.dlf_lagged_sampling(
+            fft_filter, tmin, tmax)
+        freq = omega / (2 * np.pi)
         # emulatte
         tc = [0, 0, 0]  # Transmitter Coordinate (x, y, z)
         rc = [0, 0, 0]  # Receiver Coordinate (x, y, z)
         cl = fwd.transmitter('CircularLoop', freq, current=1, radius=40 / np.sqrt(np.pi), turns=1)
-        model.locate(cl, tc, rc)  # 送受信機の設置
-
-        # ===周波数領域===
-        # TODO: ハンケルフィルターの考察
-        em, _ = model.emulate(hankel_filter='werthmuller201')  # 実行
-        hz = em['h_z']
-
-        # ===計算結果をH->B, B->dB/dtに===
-        dbdt = np.array(2j * np.pi * freq * hz * 4e-7 * np.pi)
 
         # ===Butterworth Filter===
         # TODO: ローパスフィルタの考察
         cutoff_freq = 4.5e5  # As stated in the WalkTEM manual
         h = cls.butterworth_type_filter(freq, cutoff_freq, order=1)
-        dbdt_filter = dbdt * h
 
-        # ===時間領域へ変換===
-        dbdt_filter_td = empymod.model.tem(dbdt_filter[:, None], np.array([1]),
-                                           freq, time, signal=1, ft=ft, ftarg=ftarg)
+        # ===周波数領域===
+        dbdt_filter = np.zeros((len(freq), len(models)), dtype=complex)
+        for i, model in enumerate(models):
+            model.locate(cl, tc, rc)  # 送受信機の設置
+            # TODO: ハンケルフィルターの考察
+            em = model.emulate(
+                hankel_filter='werthmuller201',
+                ignore_displacement_current=ignore_displacement_current)  # 実行
+            hz = em['h_z']
+            # ===計算結果をH->B, B->dB/dtに===
+            dbdt_filter[:, i] = 2j * np.pi * freq * hz * 4e-7 * np.pi * h
+
+        # ===時間領域へ変換=== (全モデルをまとめて変換)
+        # スイッチオン応答 = 直流成分 - 遮断応答 (dB/dt の直流成分は 0)
+        dbdt_filter_td = -transform.FourierTransform.dlf_lagged_transform(
+            fft_filter, dbdt_filter, omega, time)
 
         # ===任意波形へ===
-        walktem_em = cls.apply_waveform(time, dbdt_filter_td[0], off_time, waveform_time, waveform_current)
+        walktem_em = []
+        for off_time, waveform_time, waveform_current in waves:
+            resp = cls.apply_waveform(
+                time, dbdt_filter_td, off_time, waveform_time, waveform_current)
+            walktem_em.append(resp.T)
         return walktem_em
 
     @classmethod
@@ -57,21 +157,12 @@ class ArbitraryWave:
             Because of the arbitrary waveform, we need to compute some times before and
             after the actually wanted times for interpolation of the waveform.
 
-            Some implementation details: The actual times here don't really matter. We
-            create a vector of time.size+2, so it is similar to the input times and
-            accounts that it will require a bit earlier and a bit later times. Really
-            important are only the minimum and maximum times. The Fourier DLF, with
-            `pts_per_dec=-1`, computes times from minimum to at least the maximum,
-            where the actual spacing is defined by the filter spacing. It subsequently
-            interpolates to the wanted times. Afterwards, we interpolate those again to
-            compute the actual waveform response.
-
-            Note: We could first call `waveform`, and get the actually required times
-                  from there. This would make this function obsolete. It would also
-                  avoid the double interpolation, first in `empymod.model.time` for the
-                  Fourier DLF with `pts_per_dec=-1`, and second in `waveform`. Doable.
-                  Probably not or marginally faster. And the code would become much
-                  less readable.
+            Some implementation details: The actual times here don't really matter.
+            Really important are only the minimum and maximum times. The lagged
+            convolution DLF (`transform.FourierTransform.dlf_lagged_sampling`)
+            computes times from minimum to at least the maximum, where the actual
+            spacing is defined by the filter spacing, and the waveform is applied
+            directly on those times (no intermediate interpolation).
 
             Parameters
             ----------
@@ -101,7 +192,9 @@ class ArbitraryWave:
             `times_wanted`.
 
         resp : ndarray
-            EM-response corresponding to `times`.
+            EM-response corresponding to `times`. With method='spline' it may
+            be 2D (len(times), n_models) to apply the waveform to many
+            responses at once.
 
         times_wanted : ndarray
             Wanted times.
@@ -125,12 +218,74 @@ class ArbitraryWave:
             EM field for `times_wanted`.
 
         """
+        if method == 'spline':
+            operator = cls.waveform_operator(
+                times, times_wanted, wave_time, wave_amp, nquad)
+            return np.dot(operator, resp)
 
         # Interpolate on log.
-        if method == 'spline':
-            PP = iuSpline(np.log10(times), resp)
-        elif method == 'pchip':
+        if method == 'pchip':
             PP = pchip(np.log10(times), resp.reshape(-1))
+        else:
+            raise NameError('invalid method name')
+
+        index, logt, weight = cls.waveform_points(
+            times_wanted, wave_time, wave_amp, nquad)
+        resp_wanted = np.bincount(
+            index, weights=weight * PP(logt), minlength=len(times_wanted))
+        return resp_wanted
+
+    @classmethod
+    def waveform_operator(cls, times, times_wanted, wave_time, wave_amp, nquad=3):
+        """Linear map of `apply_waveform` with method='spline'.
+
+        The cubic spline in log10(times) is linear in the response, so the
+        spline basis at the quadrature points times the quadrature weights
+        gives a matrix that maps any response at `times` to `times_wanted`.
+        The matrix is cached for the same times and waveform.
+
+        Returns
+        -------
+        operator : ndarray (len(times_wanted), len(times))
+            resp_wanted = operator @ resp
+        """
+        times = np.asarray(times, dtype=float)
+        times_wanted = np.asarray(times_wanted, dtype=float)
+        key = (times.tobytes(), times_wanted.tobytes(),
+               np.asarray(wave_time, dtype=float).tobytes(),
+               np.asarray(wave_amp, dtype=float).tobytes(), nquad)
+        if key in _waveform_operators:
+            return _waveform_operators[key]
+
+        index, logt, weight = cls.waveform_points(
+            times_wanted, wave_time, wave_amp, nquad)
+        # 単位行列の spline 補間 = 各時刻の応答に対する基底関数
+        # (InterpolatedUnivariateSpline (k=3) と同じ not-a-knot 条件)
+        spline = make_interp_spline(np.log10(times), np.eye(len(times)), k=3)
+        operator = np.zeros((len(times_wanted), len(times)))
+        np.add.at(operator, index, weight[:, None] * spline(logt))
+
+        if len(_waveform_operators) >= 32:
+            _waveform_operators.clear()
+        _waveform_operators[key] = operator
+        return operator
+
+    @classmethod
+    def waveform_points(cls, times_wanted, wave_time, wave_amp, nquad=3):
+        """Quadrature points of the waveform convolution.
+
+        Returns
+        -------
+        index : ndarray
+            Index of `times_wanted` each point contributes to.
+
+        logt : ndarray
+            log10 of the times at which the step response is needed.
+
+        weight : ndarray
+            Gauss-Legendre weight times dI/dt of the segment.
+        """
+        times_wanted = np.asarray(times_wanted, dtype=float)
 
         # Wave time steps.
         dt = np.diff(wave_time)
@@ -138,11 +293,9 @@ class ArbitraryWave:
         dIdt = dI / dt
 
         # Gauss-Legendre Quadrature; 3 is generally good enough.
-        # (Roots/weights could be cached.)
-        g_x, g_w = roots_legendre(nquad)
+        g_x, g_w = cls.gauss_legendre(nquad)
 
-        # Pre-allocate output.
-        resp_wanted = np.zeros_like(times_wanted)
+        index_list, logt_list, weight_list = [], [], []
 
         # Loop over wave segments.
         for i, cdIdt in enumerate(dIdt):
@@ -169,9 +322,21 @@ class ArbitraryWave:
             # for the change of interval, which makes this a bit more complex.
             logt = np.log10(np.outer((tb - ta) / 2, g_x) + (ta + tb)[:, None] / 2)
             fact = (tb - ta) / 2 * cdIdt
-            resp_wanted[ind_a] += fact * np.sum(np.array(PP(logt) * g_w), axis=1)
+            index_list.append(np.repeat(np.nonzero(ind_a)[0], nquad))
+            logt_list.append(logt.ravel())
+            weight_list.append((fact[:, None] * g_w[None, :]).ravel())
 
-        return resp_wanted
+        if not index_list:
+            return np.zeros(0, dtype=int), np.zeros(0), np.zeros(0)
+        return np.concatenate(index_list), np.concatenate(logt_list), \
+            np.concatenate(weight_list)
+
+    @classmethod
+    def gauss_legendre(cls, nquad):
+        """Cached Gauss-Legendre roots and weights."""
+        if nquad not in _roots_legendre:
+            _roots_legendre[nquad] = roots_legendre(nquad)
+        return _roots_legendre[nquad]
 
     # 引用元
     # https://github.com/simpeg/simpegEM1D/blob/master/simpegEM1D/Waveforms.py
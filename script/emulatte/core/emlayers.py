@@ -13,10 +13,48 @@
 # limitations under the License.
 # -*- coding: utf-8 -*-
 
+import threading
+import warnings
 import numpy as np
 import scipy.constants as const
+from scipy.special import j0, j1
+from . import recursion, filters, analytic
+from .transform import FIELDS
 from ..utils.function import ndarray_converter
 
+# 計算精度 : (実数型, 複素数型)
+PRECISION = {
+    'double' : (np.float64, np.complex128),
+    'single' : (np.float32, np.complex64),
+}
+
+# td_transform='FFT' で使用できる正弦・余弦変換フィルタ
+FFT_FILTERS = [
+    'anderson_sin_cos_filter_787', 'key_time_201', 'werthmuller_time_201'
+]
+
+# reflection_cache に保存する漸化計算の状態の数 (周波数 x λ)
+REFLECTION_CACHE_SIZE = 128
+
+# reflection_cache, bessel_cache の読み書きに使うロック
+# (同じ model の emulate() を複数スレッドから呼ぶ場合)
+_CACHE_LOCK = threading.Lock()
+
+def limit_cache(cache, size=REFLECTION_CACHE_SIZE):
+    """
+    古いものから削除して cache を size 件以下にする
+    """
+    for key in list(cache)[:max(len(cache) - size, 0)]:
+        del cache[key]
+
+def copy_state(state):
+    """
+    surface_recursion の状態 (dict) の複製 \\
+    キャッシュ済みの状態は書き換えず、複製を計算し直して置き換える
+    """
+    return {name : (val.copy() if isinstance(val, (np.ndarray, set)) else val)
+            for name, val in state.items()}
+
 class Subsurface1D:
     #== CONSTRUCTOR ======================================#
     def __init__(self, thicks):
@@ -73,6 +111,8 @@ class Subsurface1D:
         """
         kwds = set(props.keys())
         self.cxres = False
+        # 物性に依存するキャッシュ (compute_airborne_coefficients)
+        self.reflection_cache = {}
 
         ### ELECTRIC PERMITTIVITY ###
         if 'eps' in kwds:
@@ -108,6 +148,33 @@ class Subsurface1D:
             raise Exception('Could not find the input for resistivity values.')
 
 
+    def update_layer(self, i, res):
+        """
+        Parameters
+        ----------
+        i : int \\
+            index of the layer in the order of set_properties() \\
+            (0 : air, 1 : L1, ...)
+
+        res : float \\
+            new resistivity (Ohm-m) of the layer
+            (res_0 for the Cole-Cole model)
+
+        Only the resistivity of layer i is changed. The incremental
+        recompute applies only to sources and receivers both in the air
+        (the geometry that uses reflection_cache): the saved recursion
+        state is kept and the next emulate() recomputes only layers
+        i, i-1, ..., 1 (the layers below i are unchanged). For any other
+        geometry the next emulate() recomputes all layers, as after
+        set_properties().
+        """
+        if self.cxres:
+            self.res_0[i] = res
+        else:
+            self.sigma[i] = 1 / res
+        for state in getattr(self, 'reflection_cache', {}).values():
+            state['changed'].add(i)
+
     #== SET UP ===========================================#
     def locate(self, emsrc, sc, rc, **kwargs):
         """
@@ -130,6 +197,8 @@ class Subsurface1D:
 
         """
         self.src = emsrc
+        # 幾何のみに依存する Bessel 関数値のキャッシュ (bessel_factors)
+        self.bessel_cache = {}
         sc = ndarray_converter(sc, 'sc')
         rc = ndarray_converter(rc, 'rc')
         DIPOLE = [
@@ -234,7 +303,11 @@ class Subsurface1D:
     #== MAIN EXECUTOR ====================================#
     def emulate(self, hankel_filter, 
             ignore_displacement_current = False, 
-            time_diff=False, td_transform=None):
+            time_diff=False, td_transform=None, precision='double',
+            backend='numpy', workers=None,
+            fft_filter='anderson_sin_cos_filter_787',
+            fft_freqs_per_decade=10, fft_log_magnitude=False, out=None,
+            components=None, hankel_accuracy=1e-6):
         """
         # emulate()
         Parameters
@@ -245,19 +318,57 @@ class Subsurface1D:
             options :
             - "anderson801"
             - "kong241"
-            - "mizunaga90"
+            - "mizunaga90"  frequency domain only (with td_transform,
+              "werthmuller201" is used instead)
             - "werthmuller201"
             - "key201"
+            - "auto"  the shortest filter whose error against the half-space
+              VMD response (filter_files/hankel_accuracy.py) is below
+              hankel_accuracy over the height, offset, frequency and layer
+              conductivity range of this call. Only for a VMD with the
+              source and receiver in the air (or on the surface);
+              "werthmuller201" is used otherwise.
+
+        hankel_accuracy : float \\
+            Relative accuracy required by hankel_filter='auto' (default 1e-6) \\
+            The table is computed for a VMD source and receiver at the same
+            height (h_s + h_r) / r = 0 ~ 10.
 
         td_transform : str \\
             td_transform == None (default) \\
             return Frequency Domain EM Fields \\
 
-            td_transform == 'FFT', 'DLAG'  \\
+            td_transform == 'FFT', 'DLAG', 'EULER'  \\
             return Time Domain EM Fields\\
             options :
             - FFT   Fast Fourier Transform
             - DLAG  Lagged Convolution
+            - EULER Euler filter (raito_time_250), 250 frequencies per gate
+
+        fft_filter : str \\
+            Fourier sine/cosine digital filter used by td_transform='FFT' \\
+            options :
+            - "anderson_sin_cos_filter_787" (default)
+            - "key_time_201"
+            - "werthmuller_time_201"
+
+        fft_freqs_per_decade : int \\
+            Number of frequencies per decade at which the frequency domain
+            response is computed for td_transform='FFT'. The response is
+            interpolated by cubic spline in log-frequency over the band
+            required by fft_filter and the time gates (clipped to the band
+            of hankel_filter).
+
+        fft_log_magnitude : bool \\
+            False -> (default) interpolate Im(F) itself \\
+            True  -> interpolate log|Im(F)| for components whose
+            imaginary part keeps its sign over the band (others are
+            interpolated linearly) \\
+            Against the analytic central loop step response (100 ohm-m
+            half-space, key_time_201) the error is 6e-3 (10 frequencies per
+            decade) and 2.5e-4 (20) with Im(F), and 1.4e-4 (5) and 1.5e-5 (10)
+            with log|Im(F)|. Dipole responses change sign over the band and
+            are interpolated linearly either way.
 
         ignore_displacement_current : bool \\
             True  -> wave number k includes only conduction current \\
@@ -267,6 +378,58 @@ class Subsurface1D:
             True  -> return time derivative EM field dE/dt & dH/dt \\
             False -> return raw EM field E & H
 
+        precision : str \\
+            'double' -> (default) all computation in complex128 \\
+            'single' -> layer recursion (admittance/impedance and surface
+            reflection coefficients) in complex64 \\
+            Only for sources and receivers both in the air with
+            h_s + h_r >= r / 10 (r : offset, or loop radius). For other
+            geometries a warning is issued and 'double' is used. \\
+            The direct wave term and the filter summation are kept in
+            complex128, because the free-space term of the kernel is cancelled
+            out by the filter weights and cannot be summed in complex64.
+            Measured against 'double' (werthmuller201, 30 layers,
+            1 Hz ~ 100 kHz, error relative to the peak of each component):
+            - airborne VMD/HMDx, h_s + h_r >= r / 10 : < 2e-6,
+              < 0.02 ppm for RESOLVE HCP/VCA responses (h = 30 m, r = 7.9 m)
+            - airborne, h_s + h_r < r / 10 : up to 7e-4
+            - surface VMD (r = 50 m) : 8e-5 (up to 6e-2 pointwise in h_x)
+            - buried VMD/HMDx (z = 12 m / 40 m) : 1e-5 / 3e-6
+
+        backend : str \\
+            Both backends run the same recursion (recursion._layer_column,
+            _surface_column) and differ only in how it is executed. \\
+            'numpy' -> (default) each layer step on all filter abscissae
+            at once by numpy array operations \\
+            'numba' -> compiled by numba into one loop over filter
+            abscissae and layers (no temporary arrays).
+            Falls back to 'numpy' with a warning if numba is not installed.
+            Results agree with 'numpy' up to the round-off of complex
+            arithmetic: TE coefficients within 1e-13, TM coefficients
+            within 1e-10 and fields within 1e-10 (relative to the peak),
+            except for electric fields between the air layer and the
+            ground, where round-off is amplified to ~1e-8.
+
+        workers : int, optional \\
+            Number of threads to split the frequency loop
+            (FD frequencies and FFT sampling frequencies) in-process.
+            None (default) or 1 -> serial loop. Most effective with
+            backend='numba', whose recursion runs without the GIL.
+
+        out : numpy.ndarray (len(freqtime), 6) complex, optional \\
+            Frequency domain only. The fields are written into out
+            (columns e_x, e_y, e_z, h_x, h_y, h_z) and the returned
+            dictionary holds column views of out (no copy). \\
+            out.view(emulatte.forward.FIELD_DTYPE)[:, 0] gives a structured array
+            with the named fields.
+
+        components : list of str, optional \\
+            Field components to compute, e.g. ['h_z'] \\
+            None (default) -> all of 'e_x', 'e_y', 'e_z', 'h_x', 'h_y', 'h_z' \\
+            Kernels and filter summations not needed by the requested
+            components are skipped (VMD, HMDx, HMDy), and only the
+            requested components are returned.
+
         Returns
         -------
         ans : dictionary \\
@@ -280,308 +443,350 @@ class Subsurface1D:
             }
         time : numpy.ndarray, optional \\
             DLAG time
+
+        Notes
+        -----
+        The options of the call (hankel_filter, precision, components, ...)
+        and the scratch variables of the transform (lambda_, ztilde, ytilde,
+        k, u, kernel, ...) are written to a Workspace created for the call;
+        the model itself is only read. Only the caches (reflection_cache,
+        bessel_cache) are updated, under a lock and without modifying a
+        cached state in place, so emulate() of one located model can be
+        called from several threads at the same time. locate(),
+        set_properties() and update_layer() change the model and must not
+        run concurrently with emulate().
         """
         if not bool(td_transform):
-            self.domain = 'Freq'
+            domain = 'Freq'
         else:
-            self.domain = 'Time'
-
-        self.hankel_filter = hankel_filter
-        self.ignore_displacement_current = ignore_displacement_current
-        self.time_diff = time_diff
+            domain = 'Time'
+
+        if precision not in PRECISION:
+            raise NameError('invalid precision name')
+        if backend not in recursion.BACKENDS:
+            raise NameError('invalid backend name')
+        if backend == 'numba' and not recursion.HAS_NUMBA:
+            warnings.warn('numba is not installed. backend="numpy" is used instead.')
+            backend = 'numpy'
+
+        if fft_filter not in FFT_FILTERS:
+            raise NameError('invalid fft filter name')
+        if components is not None:
+            components = tuple(components)
+            for component in components:
+                if component not in FIELDS:
+                    raise NameError('invalid component name')
+        if (out is not None) and (domain != 'Freq'):
+            raise Exception('out is available only in frequency domain.')
+
+        if hankel_filter == 'auto':
+            hankel_filter = self.auto_hankel_filter(hankel_accuracy, domain)
+
+        if (domain == 'Time') and (hankel_filter in filters.FREQUENCY_DOMAIN_ONLY):
+            warnings.warn(
+                'hankel_filter="{}" is not accurate for time domain responses. '
+                'hankel_filter="werthmuller201" is used instead.'.format(
+                    hankel_filter))
+            hankel_filter = 'werthmuller201'
+
+        if (precision == 'single') and not self.single_precision_safe():
+            warnings.warn(
+                'precision="single" is available only for sources and receivers '
+                'in the air with h_s + h_r >= r / 10. '
+                'precision="double" is used instead.')
+            precision = 'double'
+
+        # 呼び出しの設定と作業変数は Workspace に書き込む (model は書き換えない)
+        ws = Workspace(
+            self, domain=domain, hankel_filter=hankel_filter,
+            fft_filter=fft_filter, fft_freqs_per_decade=fft_freqs_per_decade,
+            fft_log_magnitude=fft_log_magnitude, backend=backend,
+            workers=workers,
+            ignore_displacement_current=ignore_displacement_current,
+            time_diff=time_diff, components=components, precision=precision)
 
         # WHY?
         if hankel_filter == 'anderson801':
             delta_z = 1e-4 - 1e-8
-            if self.sz in self.depth:
-                self.sz -= delta_z
-            if self.sz == self.rz:
-                self.sz -= delta_z
+            if ws.sz in self.depth:
+                ws.sz = ws.sz - delta_z
+            if ws.sz == ws.rz:
+                ws.sz = ws.sz - delta_z
 
         ans, freqtime = self.src.get_result(
-                        self, time_diff=time_diff, td_transform=td_transform)
+                        ws, time_diff=time_diff, td_transform=td_transform,
+                        out=out)
         
+        if components is not None:
+            ans = {component: ans[component] for component in components}
+
         if td_transform == 'DLAG':
             return ans, freqtime
         else:
             return ans
 
+    def single_precision_safe(self):
+        """
+        precision='single' を使える幾何か \\
+        送受信点がともに空気層にあり、高度の和が水平距離 (ループは半径) の
+        1/10 以上の場合のみ。高度が低いと大きな λ の反射係数が減衰せずに
+        フィルタの積和に残り、complex64 の丸め誤差 (1e-5 ~ 1e-4) が現れる。
+        (地中の送受信点では 1e-5 ~ 1e-2)
+        """
+        if not (self.slayer == 1 and self.rlayer == 1):
+            return False
+        name = self.src.__class__.__name__
+        if name == 'GroundedWire':
+            r = np.max(self.rn)
+        elif name in ['CircularLoop', 'CoincidentLoop']:
+            r = max(self.r, self.src.radius)
+        else:
+            r = self.r
+        height = -np.ravel(self.sz)[0] - np.ravel(self.rz)[0]
+        return bool(height >= r / 10)
+
+    def auto_hankel_filter(self, accuracy, domain='Freq'):
+        """
+        hankel_filter='auto' で使うフィルタ (filters.select_hankel_filter) \\
+        domain = 'Time' では周波数範囲を 0.1 / t_max ~ 10 / t_min (rad/s) とする \\
+        精度表は空中 (地表) の VMD の応答のみなので、それ以外の送信源・
+        地中の送受信点では werthmuller201 を使う
+        """
+        name = self.src.__class__.__name__
+        if (name != 'VMD') or (self.slayer != 1) or (self.rlayer != 1):
+            warnings.warn(
+                'hankel_filter="auto" is available only for VMD sources with '
+                'the source and receiver in the air. '
+                'hankel_filter="werthmuller201" is used instead.')
+            return 'werthmuller201'
+        r = np.atleast_1d(self.r)
+        height = max(- self.sz - self.rz, 0)
+        height_ratios = [height / r.max(), height / r.min()]
+
+        if domain == 'Freq':
+            omegas = self.src.omegas
+        else:
+            time = self.src.freqtime
+            omegas = np.array([0.1 / time.max(), 10 / time.min()])
+        # 空気層を除く各層の導電率
+        sigma = np.abs(self.complex_conductivity(omegas)[:, 1:])
+
+        induction_numbers = [
+            analytic.induction_number(r.min(), omegas.min(), sigma.min()),
+            analytic.induction_number(r.max(), omegas.max(), sigma.max()),
+        ]
+        exclude = filters.FREQUENCY_DOMAIN_ONLY if domain == 'Time' else ()
+        hankel_filter, error = filters.select_hankel_filter(
+            r, induction_numbers, accuracy, height_ratios, exclude)
+        if error > accuracy:
+            warnings.warn(
+                'no hankel filter meets hankel_accuracy={:g} '
+                '(estimated error of {}: {:.1e})'.format(
+                    accuracy, hankel_filter, error))
+        return hankel_filter
+
+    #== COMPLEX CONDUCTIVITY ====================================#
+    def complex_conductivity(self, omegas):
+        """
+        各角周波数における各層の導電率 (len(omegas), num_layer) を返す。
+        Cole-Cole モデル (Pelton et al. (1978)) の場合は全周波数の
+        複素導電率を一度に計算する。(self.sigma は書き換えない)
+        """
+        omegas = np.atleast_1d(omegas)
+        if not self.cxres:
+            return np.broadcast_to(self.sigma, (len(omegas), self.num_layer))
+        # rho(w) = rho_0 [1 - m (1 - 1 / (1 + (i w tau)^c))]
+        im = 1 + (1j * omegas[:, None] * self.tau[None, :]) ** self.c[None, :]
+        res = self.res_0[None, :] * (1 - self.m[None, :] * (1 - 1 / im))
+        return 1 / res
+
     #== COMPUTE COEFFICIENTS (called by kernel function) ===============================================#
-    def compute_coefficients(self, omega):
+    def compute_coefficients(self, omega, sigma=None):
+        """
+        sigma : 角周波数 omega における各層の導電率 (complex_conductivity) \\
+            frequency_response は全周波数分をまとめて計算した値を渡す。
+            None の場合はここで計算する。
+        """
         ztilde = np.ones(self.num_layer, dtype=complex)
         ytilde = np.ones(self.num_layer, dtype=complex)
         k = np.zeros(self.num_layer, dtype=complex)
         u = np.ones((self.num_layer, self.filter_length), dtype=complex)
-        Y = np.ones((self.num_layer, self.filter_length), dtype=complex)
-        Z = np.ones((self.num_layer, self.filter_length), dtype=complex)
-        tanhuh = np.ones((self.num_layer, self.filter_length), dtype=complex)
 
         # COMPLEX RESISTIVITY MODEL (Pelton et al. (1978))
-        if self.cxres == True:
-            im = 1 - (1j * omega * self.tau) ** self.c
-            res = self.res_0 * (1 - self.m * (1 - 1 / im))
-            self.sigma = 1 / res
+        if sigma is None:
+            sigma = self.complex_conductivity(omega)[0]
         
         # インピーダンス＆アドミタンス
         ztilde[:] = 1j * omega * self.mu[:]
 
         # w1dem.pyでは何か変なことになってる
         if self.ignore_displacement_current:
-            ytilde[:] = self.sigma[:]
+            ytilde[:] = sigma[:]
             ytilde[0] = 1e-13
-            k[:] = (- 1.j * omega * self.mu[:] * self.sigma[:]) ** 0.5
+            k[:] = (- 1.j * omega * self.mu[:] * sigma[:]) ** 0.5
             k[0] = 0 # !!!
         else:
-            ytilde[:] = self.sigma[:] + 1.j * omega * self.epsln[:]
+            ytilde[:] = sigma[:] + 1.j * omega * self.epsln[:]
             k[:] = (omega ** 2.0 * self.mu[:] * self.epsln[:] \
-                    - 1.j * omega * self.mu[:] * self.sigma[:]) ** 0.5
+                    - 1.j * omega * self.mu[:] * sigma[:]) ** 0.5
         
+        # 送受信点がともに空気層にある場合 (空中電磁探査)
+        if (self.slayer == 1) and (self.rlayer == 1):
+            return self.compute_airborne_coefficients(omega, ztilde, ytilde, k)
+
         # u = (kx^2 + ky^2 - km^2)^0.5
         for i in range(self.num_layer):
             u[i] = (self.lambda_ ** 2 - k[i] ** 2) ** 0.5
 
-        # tanh
-        for i in range(1, self.num_layer - 1):
-            tanhuh[i] = np.tanh(u[i] * self.thicks[i - 1])
-
-        for i in range(self.num_layer):
-            Y[i] = u[i] / ztilde[i]
-            Z[i] = u[i] / ytilde[i]
-
         #return to self
         self.ztilde = ztilde
         self.ytilde = ytilde
         self.k = k
         self.u = u
 
-        #TE/TM mode 境界係数
-        r_te = np.ones((self.num_layer, self.filter_length), dtype=complex)
-        r_tm = np.ones((self.num_layer, self.filter_length), dtype=complex)
-        R_te = np.ones((self.num_layer, self.filter_length), dtype=complex)
-        R_tm = np.ones((self.num_layer, self.filter_length), dtype=complex)
-
-        #送受信層index+1　for コード短縮
-        si = self.slayer
-        ri = self.rlayer
-
-        ### DOWN ADMITTANCE & IMPEDANCE ###
-        Ytilde = np.zeros((self.num_layer, self.filter_length), dtype=complex)
-        Ztilde = np.zeros((self.num_layer, self.filter_length), dtype=complex)
-
-        Ytilde[-1] = Y[-1]
-        Ztilde[-1] = Z[-1]
-
-        r_te[-1] = 0
-        r_tm[-1] = 0
-
-        for ii in range(self.num_layer - 1, si, -1):
-            numerator_Y = Ytilde[ii] + Y[ii - 1] * tanhuh[ii - 1]
-            denominator_Y = Y[ii - 1] + Ytilde[ii] * tanhuh[ii - 1]
-            Ytilde[ii - 1] = Y[ii - 1] * numerator_Y / denominator_Y
-
-            numerator_Z = Ztilde[ii] + Z[ii - 1] * tanhuh[ii - 1]
-            denominator_Z = Z[ii - 1] + Ztilde[ii] * tanhuh[ii - 1]
-            Ztilde[ii - 1] = Z[ii - 1] * numerator_Z / denominator_Z
-
-            r_te[ii - 1] = (Y[ii - 1] - Ytilde[ii]) / (Y[ii - 1] + Ytilde[ii])
-            r_tm[ii - 1] = (Z[ii - 1] - Ztilde[ii]) / (Z[ii - 1] + Ztilde[ii])
-
-        if si != self.num_layer:
-            r_te[si - 1] = (Y[si - 1] - Ytilde[si]) / (Y[si - 1] + Ytilde[si])
-            r_tm[si - 1] = (Z[si - 1] - Ztilde[si]) / (Z[si - 1] + Ztilde[si])
-
-        ### UP ADMITTANCE & IMPEDANCE ###
-        Yhat = np.ones((self.num_layer, self.filter_length), dtype=complex)
-        Zhat = np.ones((self.num_layer, self.filter_length), dtype=complex)
-        
-        Yhat[0] = Y[0]
-        Zhat[0] = Z[0]
-
-        R_te[0] = 0
-        R_tm[0] = 0
-
-        for ii in range(2, si):
-            numerator_Y = Yhat[ii - 2] + Y[ii - 1] * tanhuh[ii - 1]
-            denominator_Y = Y[ii - 1] + Yhat[ii - 2] * tanhuh[ii - 1]
-            Yhat[ii - 1] = Y[ii - 1] * numerator_Y / denominator_Y  
-            # (2)Yhat{2,3,\,si-2,si-1}
-
-            numerator_Z = Zhat[ii - 2] + Z[ii - 1] * tanhuh[ii - 1]
-            denominator_Z = Z[ii - 1] + Zhat[ii - 2] * tanhuh[ii - 1]
-            Zhat[ii - 1] = Z[ii - 1] * numerator_Z / denominator_Z
-
-            R_te[ii - 1] = (Y[ii - 1] - Yhat[ii - 2]) / (Y[ii - 1] + Yhat[ii - 2])
-            R_tm[ii - 1] = (Z[ii - 1] - Zhat[ii - 2]) / (Z[ii - 1] + Zhat[ii - 2])
-        if si != 1 :
-            R_te[si - 1] = (Y[si - 1] - Yhat[si - 2]) / (Y[si - 1] + Yhat[si - 2])
-            R_tm[si - 1] = (Z[si - 1] - Zhat[si - 2]) / (Z[si - 1] + Zhat[si - 2])
-
-        U_te = np.ones((self.num_layer, self.filter_length), dtype=complex)
-        U_tm = np.ones((self.num_layer, self.filter_length), dtype=complex)
-        D_te = np.ones((self.num_layer, self.filter_length), dtype=complex)
-        D_tm = np.ones((self.num_layer, self.filter_length), dtype=complex)
-
-        # In the layer containing the source (slayer)
-        if si == 1:
-            U_te[si - 1] = 0
-            U_tm[si - 1] = 0
-            D_te[si - 1] = self.src.kernel_te_down_sign * r_te[si - 1] \
-                            * np.exp(-u[si - 1] * (self.depth[si - 1] - self.sz))
-            D_tm[si - 1] = self.src.kernel_tm_down_sign * r_tm[si - 1] \
-                            * np.exp(-u[si - 1] * (self.depth[si - 1] - self.sz))
-        elif si == self.num_layer:
-            U_te[si - 1] = self.src.kernel_te_up_sign * R_te[si - 1] \
-                            * np.exp(u[si - 1] * (self.depth[si - 2] - self.sz))
-            U_tm[si - 1] = self.src.kernel_tm_up_sign * R_tm[si - 1] \
-                            * np.exp(u[si - 1] * (self.depth[si - 2] - self.sz))
-            D_te[si - 1] = 0
-            D_tm[si - 1] = 0
+        # 以降の漸化計算は precision で指定した精度で行う
+        # (直達項とフィルタの積和は kernel 側で倍精度のまま計算する)
+        ftype, ctype = self.ftype, self.ctype
+        depth = self.depth.astype(ftype)
+        thicks = self.thicks.astype(ftype)
+        sz = np.asarray(self.sz).astype(ftype)
+        rz = np.asarray(self.rz).astype(ftype)
+        ztilde = ztilde.astype(ctype)
+        ytilde = ytilde.astype(ctype)
+        u = u.astype(ctype)
+
+        # 漸化計算は recursion._layer_column のみ (backend は実行方法の違い)
+        if self.backend == 'numba':
+            layer_recursion = recursion.layer_recursion
         else:
-            exp_term1 = np.exp(-2 * u[si - 1]
-                                * (self.depth[si - 1] - self.depth[si - 2]))
-            exp_term2u = np.exp( u[si - 1] * (self.depth[si - 2] - 2 * self.depth[si - 1] + self.sz))
-            exp_term2d = np.exp(-u[si - 1] * (self.depth[si - 1] - 2 * self.depth[si - 2] + self.sz))
-            exp_term3u = np.exp( u[si - 1] * (self.depth[si - 2] - self.sz))
-            exp_term3d = np.exp(-u[si - 1] * (self.depth[si - 1] - self.sz))
-
-            U_te[si - 1] = \
-                1 / (1 - R_te[si - 1] * r_te[si - 1] * exp_term1) \
-                * R_te[si - 1] \
-                * (self.src.kernel_te_down_sign * r_te[si - 1] * exp_term2u \
-                    + self.src.kernel_te_up_sign * exp_term3u)
-
-            U_tm[si - 1] = \
-                1 / (1 - R_tm[si - 1] * r_tm[si - 1] * exp_term1) \
-                * R_tm[si - 1] \
-                * (self.src.kernel_tm_down_sign  * r_tm[si - 1] * exp_term2u \
-                    + self.src.kernel_tm_up_sign * exp_term3u)
-
-            D_te[si - 1] = \
-                1 / (1 - R_te[si - 1] * r_te[si - 1] * exp_term1) \
-                * r_te[si - 1] \
-                * (self.src.kernel_te_up_sign * R_te[si - 1] * exp_term2d \
-                    + self.src.kernel_te_down_sign * exp_term3d)
-
-            D_tm[si - 1] = \
-                1 / (1 - R_tm[si - 1] * r_tm[si - 1] * exp_term1) \
-                * r_tm[si - 1] \
-                * (self.src.kernel_tm_up_sign * R_tm[si - 1] * exp_term2d \
-                    + self.src.kernel_tm_down_sign * exp_term3d)
-
-        # for the layers above the slayer
-        if ri < si:
-            if si == self.num_layer:
-                exp_term = np.exp(-u[si - 1] * (self.sz - self.depth[si - 2]))
-
-                D_te[si - 2] = \
-                    (Y[si - 2] * (1 + R_te[si - 1]) + Y[si - 1] * (1 - R_te[si - 1])) \
-                    / (2 * Y[si - 2]) * self.src.kernel_te_up_sign * exp_term
-
-                D_tm[si - 2] = \
-                    (Z[si - 2] * (1 + R_tm[si - 1]) + Z[si - 1] * (1 - R_tm[si - 1])) \
-                    / (2 * Z[si - 2]) * self.src.kernel_tm_up_sign * exp_term
-
-            elif si != 1 and si != self.num_layer:
-                exp_term = np.exp(-u[si - 1] * (self.sz - self.depth[si - 2]))
-                exp_termii = np.exp(-u[si - 1] * (self.depth[si - 1] - self.depth[si - 2]))
-                
-                D_te[si - 2] = \
-                    (Y[si - 2] * (1 + R_te[si - 1]) + Y[si - 1] * (1 - R_te[si - 1])) \
-                    / (2 * Y[si - 2]) * (D_te[si - 1] * exp_termii + self.src.kernel_te_up_sign * exp_term)
-
-                D_tm[si - 2] = \
-                    (Z[si - 2] * (1 + R_tm[si - 1]) + Z[si - 1] * (1 - R_tm[si - 1])) \
-                    / (2 * Z[si - 2]) * (D_tm[si - 1]  * exp_termii + self.src.kernel_tm_up_sign * exp_term)
-
-            for jj in range(si - 2, 0, -1):
-                exp_termjj = np.exp(-u[jj] \
-                                    * (self.depth[jj] - self.depth[jj - 1]))
-                D_te[jj - 1] = \
-                    (Y[jj - 1] * (1 + R_te[jj]) + Y[jj] * (1 - R_te[jj])) \
-                    / (2 * Y[jj - 1]) * D_te[jj] * exp_termjj
-                D_tm[jj - 1] = \
-                    (Z[jj - 1] * (1 + R_tm[jj]) + Z[jj] * (1 - R_tm[jj])) \
-                    / (2 * Z[jj - 1]) * D_tm[jj] * exp_termjj
-
-            for jj in range(si - 1, 1, -1):
-                exp_termjj = np.exp(u[jj - 1] * (self.depth[jj - 2] - self.depth[jj - 1]))
-                U_te[jj - 1] = D_te[jj - 1] * exp_termjj * R_te[jj - 1]
-                U_tm[jj - 1] = D_tm[jj - 1] * exp_termjj * R_tm[jj - 1]
-            U_te[0] = 0
-            U_tm[0] = 0
-
-        # for the layers below the slayer
-        if ri > si:
-            if si == 1:
-                exp_term = np.exp(-u[si - 1] * (self.depth[si - 1] - self.sz))
-                U_te[si] = (Y[si] * (1 + r_te[si - 1]) \
-                                + Y[si - 1] * (1 - r_te[si - 1])) \
-                            / (2 * Y[si]) \
-                            * self.src.kernel_te_down_sign * exp_term
-                U_tm[si] = (Z[si] * (1 + r_tm[si - 1]) \
-                                + Z[si - 1] * (1 - r_tm[si - 1])) \
-                            / (2 * Z[si]) \
-                            * self.src.kernel_tm_down_sign * exp_term
-
-            elif si != 1 and si != self.num_layer:
-                exp_termi = np.exp(-u[si - 1] \
-                                * (self.depth[si - 1] - self.depth[si - 2]))
-                exp_termii = np.exp(-u[si - 1] 
-                                * (self.depth[si - 1] - self.sz))
-                U_te[si] = (Y[si] * (1 + r_te[si - 1]) \
-                                    + Y[si - 1] * (1 - r_te[si - 1])) \
-                                / (2 * Y[si]) \
-                                * (U_te[si - 1] * exp_termi \
-                                    + self.src.kernel_te_down_sign * exp_termii)
-                U_tm[si] = (Z[si] * (1 + r_tm[si - 1]) + Z[si - 1] \
-                                    * (1 - r_tm[si - 1])) \
-                                / (2 * Z[si]) \
-                                * (U_tm[si - 1] * exp_termi \
-                                    + self.src.kernel_tm_down_sign * exp_termii)
-
-            for jj in range(si + 2, self.num_layer + 1):
-                exp_term = np.exp(-u[jj - 2] \
-                                * (self.depth[jj - 2] - self.depth[jj - 3]))
-                U_te[jj - 1] = (Y[jj - 1] * (1 + r_te[jj - 2]) \
-                                    + Y[jj - 2] * (1 - r_te[jj - 2])) \
-                                / (2 * Y[jj - 1]) * U_te[jj - 2] * exp_term
-                U_tm[jj - 1] = (Z[jj - 1] * (1 + r_tm[jj - 2]) \
-                                    + Z[jj - 2] * (1 - r_tm[jj - 2])) \
-                                / (2 * Z[jj - 1]) * U_tm[jj - 2] * exp_term
-                                
-            for jj in range(si + 1, self.num_layer):
-                D_te[jj - 1] = U_te[jj - 1] * np.exp(-u[jj - 1] \
-                                * (self.depth[jj - 1] - self.depth[jj - 2])) \
-                                * r_te[jj - 1]
-                D_tm[jj - 1] = U_tm[jj - 1] * np.exp(-u[jj - 1] \
-                                * (self.depth[jj - 1] - self.depth[jj - 2])) \
-                                * r_tm[jj - 1]
-            D_te[self.num_layer - 1] = 0
-            D_tm[self.num_layer - 1] = 0
-
-        # compute Damping coefficient
-        if ri == 1:
-            e_up = np.zeros(self.filter_length, dtype=np.complex)
-            e_down = np.exp(u[ri - 1] * (self.rz - self.depth[ri - 1]))
-        elif ri == self.num_layer:
-            e_up = np.exp(-u[ri - 1] * (self.rz - self.depth[ri - 2]))
-            e_down = np.zeros(self.filter_length, dtype=np.complex)
+            layer_recursion = recursion.layer_recursion_numpy
+        signs = (self.src.kernel_te_up_sign, self.src.kernel_te_down_sign,
+                 self.src.kernel_tm_up_sign, self.src.kernel_tm_down_sign)
+        return layer_recursion(
+            u, ztilde, ytilde, thicks, depth,
+            ftype(np.ravel(sz)[0]), ftype(np.ravel(rz)[0]),
+            self.slayer, self.rlayer, signs)
+
+    def compute_airborne_coefficients(self, omega, ztilde, ytilde, k):
+        """
+        送受信点がともに空気層にある場合の compute_coefficients \\
+        応答は送受信点の高度に exp(-u0 (h_s + h_r)) を通してのみ依存し、
+        大地の影響は地表の反射係数 r_te[0], r_tm[0] に集約される。
+        漸化計算の状態 (surface_recursion) は (周波数, λ) 毎に
+        reflection_cache に保存し、高度を変えた locate() + emulate() では
+        層の漸化計算を省略する。
+        (λ は送受信点間距離で決まるため、距離を変えた場合は再計算する)
+        """
+        key = (omega, self.hankel_filter, float(np.ravel(self.lambda_)[0]),
+               self.precision, self.ignore_displacement_current)
+        cache = getattr(self, 'reflection_cache', None)
+        if cache is None:
+            cache = self.reflection_cache = {}
+
+        ftype, ctype = self.ftype, self.ctype
+        with _CACHE_LOCK:
+            state = cache.get(key)
+        if state is None:
+            state = self.surface_recursion(k, ztilde, ytilde)
+        elif state['changed']:
+            # update_layer() で変更された層から地表までのみ再計算する
+            state = self.surface_recursion(k, ztilde, ytilde, copy_state(state))
         else:
-            e_up = np.exp(-u[ri - 1] * (self.rz - self.depth[ri - 2]))
-            e_down = np.exp(u[ri - 1] * (self.rz - self.depth[ri - 1]))
-
-        #self.r_te = r_te
-        #self.r_tm = r_tm
-        #self.R_te = R_te
-        #self.R_tm = R_tm
-        #self.U_te = U_te
-        #self.U_tm = U_tm
-        #self.D_te = D_te
-        #self.D_tm = D_tm
-        #self.e_up = e_up
-        #self.e_down = e_down
+            cache = None
+        if cache is not None:
+            with _CACHE_LOCK:
+                cache[key] = state
+                limit_cache(cache)
+        u0, r_te0, r_tm0 = state['u'][0], state['r_te0'], state['r_tm0']
+
+        # kernel 側は空気層の u (model.u[0]) のみ参照する
+        self.ztilde = ztilde
+        self.ytilde = ytilde
+        self.k = k
+        self.u = u0[None, :]
+
+        sz = ftype(np.ravel(self.sz)[0])
+        rz = ftype(np.ravel(self.rz)[0])
+        u0 = u0.astype(ctype)
+        exp_s = np.exp(-u0 * (self.depth.astype(ftype)[0] - sz))
+        U_te = np.zeros((1, self.filter_length), dtype=ctype)
+        U_tm = np.zeros((1, self.filter_length), dtype=ctype)
+        D_te = (self.src.kernel_te_down_sign * r_te0 * exp_s)[None, :]
+        D_tm = (self.src.kernel_tm_down_sign * r_tm0 * exp_s)[None, :]
+        e_up = np.zeros(self.filter_length, dtype=ctype)
+        e_down = np.exp(u0 * (rz - self.depth.astype(ftype)[0]))
         return U_te, U_tm, D_te, D_tm, e_up, e_down
 
+    def surface_recursion(self, k, ztilde, ytilde, state=None):
+        """
+        最下層から地表への下向きアドミタンス・インピーダンスの漸化計算 \\
+        state = None の場合は全層を計算し、状態 (u, Y, Z, tanh(u h),
+        Ytilde, Ztilde, 地表の反射係数) を dict で返す。
+        state を与えた場合は state['changed'] の層から地表までのみを
+        計算し直す。(第 j 層より深い層の Ytilde, Ztilde は変わらない)
+        層方向の漸化計算は recursion._surface_column (backend='numba' では
+        lambda 毎にコンパイルしたループ)
+        """
+        ftype, ctype = self.ftype, self.ctype
+        n = self.num_layer
+        if state is None:
+            state = {
+                'u' : np.ones((n, self.filter_length), dtype=complex),
+                'Y' : np.ones((n, self.filter_length), dtype=ctype),
+                'Z' : np.ones((n, self.filter_length), dtype=ctype),
+                'tanhuh' : np.ones((n, self.filter_length), dtype=ctype),
+                'Ytilde' : np.ones((n, self.filter_length), dtype=ctype),
+                'Ztilde' : np.ones((n, self.filter_length), dtype=ctype),
+                'changed' : set(range(n)),
+            }
+        layers = sorted(state['changed'])
+        state['changed'] = set()
+
+        u, Y, Z, tanhuh = state['u'], state['Y'], state['Z'], state['tanhuh']
+        Ytilde, Ztilde = state['Ytilde'], state['Ztilde']
+        thicks = self.thicks.astype(ftype)
+        ztilde = ztilde.astype(ctype)
+        ytilde = ytilde.astype(ctype)
+        for i in layers:
+            u[i] = (self.lambda_ ** 2 - k[i] ** 2) ** 0.5
+            uc = u[i].astype(ctype)
+            Y[i] = uc / ztilde[i]
+            Z[i] = uc / ytilde[i]
+            if 0 < i < n - 1:
+                tanhuh[i] = np.tanh(uc * thicks[i - 1])
+
+        # 変更された層のうち最も深い層から地表まで計算し直す
+        deepest = layers[-1]
+        if deepest == n - 1:
+            Ytilde[-1] = Y[-1]
+            Ztilde[-1] = Z[-1]
+        if self.backend == 'numba':
+            surface_recursion = recursion.surface_recursion
+        else:
+            surface_recursion = recursion.surface_recursion_numpy
+        state['r_te0'], state['r_tm0'] = surface_recursion(
+            Y, Z, tanhuh, Ytilde, Ztilde, min(deepest + 1, n - 1))
+        return state
+
+    def bessel_factors(self, r):
+        """
+        J0(λr), J1(λr) を返す。
+        λ (Hankel変換フィルタの横軸) と r は幾何のみで決まり、
+        周波数・物性に依存しないため、locate() 毎にキャッシュする。
+        """
+        key = (self.hankel_filter, float(np.ravel(self.lambda_)[0]), float(r))
+        cache = getattr(self, 'bessel_cache', None)
+        if cache is None:
+            cache = self.bessel_cache = {}
+        with _CACHE_LOCK:
+            factors = cache.get(key)
+        if factors is None:
+            arg = self.lambda_ * r
+            factors = (j0(arg), j1(arg))
+            with _CACHE_LOCK:
+                cache[key] = factors
+        return factors
+
     def in_which_layer(self, z):
         """
 
@@ -594,3 +799,26 @@ class Subsurface1D:
             else:
                 continue
         return layer_id
+
+class Workspace:
+    """
+    emulate() 1回分の設定と作業変数 \\
+    model の属性の浅いコピーに呼び出しの設定 (hankel_filter, precision,
+    components, ...) を加えたもの。transform, kernel が書き込む変数
+    (lambda_, filter_length, kernel, ztilde, ytilde, k, u, ...) は
+    Workspace に置き、model は書き換えない。
+    配列とキャッシュ (reflection_cache, bessel_cache) は model と共有する。
+    """
+    def __init__(self, model, **options):
+        self.__dict__.update(model.__dict__)
+        self.model = model
+        self.__dict__.update(options)
+        self.ftype, self.ctype = PRECISION[self.precision]
+
+    single_precision_safe = Subsurface1D.single_precision_safe
+    complex_conductivity = Subsurface1D.complex_conductivity
+    compute_coefficients = Subsurface1D.compute_coefficients
+    compute_airborne_coefficients = Subsurface1D.compute_airborne_coefficients
+    surface_recursion = Subsurface1D.surface_recursion
+    bessel_factors = Subsurface1D.bessel_factors
+    in_which_layer = Subsurface1D.in_which_layer
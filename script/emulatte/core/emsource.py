@@ -13,10 +13,11 @@
 # limitations under the License.
 
 # -*- coding: utf-8 -*-
+import copy
+from concurrent import futures
 import numpy as np
-from scipy import interpolate
 from . import transform
-from ..utils.function import ndarray_converter
+from ..utils.function import ndarray_converter, is_requested
 class Core:
     def __init__(self, freqtime):
         self.name = self.__class__.__name__.lower()
@@ -25,77 +26,37 @@ class Core:
         self.ft_size = len(self.freqtime)
 
     def get_result(
-            self, model, time_diff=False, td_transform=None):
+            self, model, time_diff=False, td_transform=None, out=None):
         """
-        Docstring
+        out : ndarray (len(freqtime), 6) complex, optional
+            周波数領域の応答の書き込み先 (返り値の各成分はその列ビュー)
         """
         #Frequancy Domain
         if model.domain == 'Freq':
-            ans = np.zeros((self.ft_size, 6), dtype=complex)
-            for index, omega in enumerate(self.omegas):
-                em_field = self.hankel_transform(model, omega)
-                # Electric fields
-                ans[index, 0] = em_field["e_x"]
-                ans[index, 1] = em_field["e_y"]
-                ans[index, 2] = em_field["e_z"]
-                # Magnetic fields
-                ans[index, 3] = em_field["h_x"]
-                ans[index, 4] = em_field["h_y"]
-                ans[index, 5] = em_field["h_z"]
-                if time_diff:
-                    ans[index, :] = ans[index, :] * 1j * omega       
-            ans = self.moment * ans
-            ans = {
-                "e_x": ans[:, 0], "e_y": ans[:, 1], "e_z": ans[:, 2],
-                "h_x": ans[:, 3], "h_y": ans[:, 4], "h_z": ans[:, 5]
-                }
-            return ans, self.freqtime
+            ans = self.frequency_response(model, self.omegas, out)
+            if time_diff:
+                ans *= 1j * self.omegas[:, None]
+            ans *= self.moment
+            return transform.field_views(ans), self.freqtime
         # Time Domain
         elif model.domain == 'Time':
             # Fast Fourier Transform
             if td_transform == 'FFT':
-                ans = np.zeros((self.ft_size, 6),dtype=float)
-                nFreqsPerDecade = 1000
-                if model.hankel_filter == 'werthmuller201':
-                    freq = np.logspace(-6, 8, nFreqsPerDecade)
-                elif model.hankel_filter == 'key201':
-                    freq = np.logspace(-8, 12, nFreqsPerDecade)
-                elif model.hankel_filter == 'anderson801':
-                    freq = np.logspace(-21, 21, nFreqsPerDecade)
-                else: # 他のフィルタは範囲不明
-                    freq = np.logspace(-21, 21, nFreqsPerDecade)
-                freq_ans = np.zeros((len(freq),6), dtype=complex)
-                omegas = 2 * np.pi * freq
-                for index, omega in enumerate(omegas):
-                    hankel_result = self.hankel_transform(model, omega)
-                    freq_ans[index,0] = hankel_result["e_x"]
-                    freq_ans[index,1] = hankel_result["e_y"]
-                    freq_ans[index,2] = hankel_result["e_z"]
-                    freq_ans[index,3] = hankel_result["h_x"]
-                    freq_ans[index,4] = hankel_result["h_y"]
-                    freq_ans[index,5] = hankel_result["h_z"]
-
-                f = interpolate.interp1d(
-                        2*np.pi*freq, freq_ans.T,
-                        kind='cubic', fill_value="extrapolate"
+                omega = transform.FourierTransform.fft_sampling(
+                            model, self.freqtime)
+                freq_ans = self.frequency_response(model, omega)
+                ans = transform.FourierTransform.fast_fourier_transform(
+                        model, freq_ans, omega, self.freqtime, time_diff
                     )
-
-                for index, time in enumerate(self.freqtime):
-                    time_ans = \
-                        transform.FourierTransform.fast_fourier_transform(
-                            model, f, time, time_diff
-                        )
-                    ans[index, 0] = time_ans[0]
-                    ans[index, 1] = time_ans[1]
-                    ans[index, 2] = time_ans[2]
-                    ans[index, 3] = time_ans[3]
-                    ans[index, 4] = time_ans[4]
-                    ans[index, 5] = time_ans[5]
-                ans = {
-                    "e_x": ans[:, 0], "e_y": ans[:, 1], "e_z": ans[:, 2],
-                    "h_x": ans[:, 3], "h_y": ans[:, 4], "h_z": ans[:, 5]
-                    }
-                return ans, self.freqtime
+                ans *= self.moment
+                return transform.field_views(ans), self.freqtime
+            # Euler Transform
+            elif td_transform == 'EULER':
+                ans = transform.FourierTransform.euler_transform(
+                        model, self.freqtime, time_diff
+                    )
+                ans *= self.moment
+                return transform.field_views(ans), self.freqtime
             # Adaptive Convolution
             elif td_transform == 'DLAG':
                 nb = int(
@@ -111,12 +72,18 @@ class Core:
                 emfield = list(dans.keys())
                 if not time_diff:
                     for ii, emfield in enumerate(emfield):
+                        # components で指定されていない成分は変換しない
+                        if not is_requested(model, emfield):
+                            continue
                         time_ans, arg = transform.FourierTransform.dlagf0em(
                             model, nb, emfield
                         )
                         ans[:, ii] = time_ans
                 else:
                     for ii, emfield in enumerate(emfield):
+                        # components で指定されていない成分は変換しない
+                        if not is_requested(model, emfield):
+                            continue
                         time_ans, arg = transform.FourierTransform.dlagf1em(
                             model, nb, emfield
                         )
@@ -129,6 +96,46 @@ class Core:
                 dans["h_y"] = ans[:, 4]
                 dans["h_z"] = ans[:, 5]
                 return dans, arg
+            else:
+                raise NameError('invalid td_transform name')
+
+    def frequency_response(self, model, omegas, out=None):
+        """
+        各角周波数 omegas における6成分の応答 (len(omegas), 6) を返す。
+        out を指定した場合はそこに直接書き込む。
+        model.workers > 1 の場合、周波数をスレッドプールで分割して計算する。
+        (numpy/BLAS 演算, numba backend の漸化計算は GIL を解放する)
+        """
+        if out is None:
+            ans = np.zeros((len(omegas), 6), dtype=complex)
+        else:
+            if out.shape != (len(omegas), 6) or out.dtype != complex:
+                raise Exception('out must be a complex array of shape (len(freqtime), 6)')
+            ans = out
+        # 各層の (複素) 導電率を全周波数分まとめて計算しておく
+        sigma = model.complex_conductivity(omegas)
+
+        def run(ws, index):
+            for ii in index:
+                # ans[ii] (e_x, e_y, e_z, h_x, h_y, h_z) に直接書き込む
+                self.hankel_transform(ws, omegas[ii], ans[ii], sigma[ii])
+
+        workers = getattr(model, 'workers', None)
+        if not workers or workers <= 1 or len(omegas) < 2:
+            run(model, range(len(omegas)))
+        else:
+            # HankelTransform は model (emlayers.Workspace) に作業変数を
+            # 書き込むため、スレッド毎にその浅いコピーを渡す。
+            # キャッシュ (reflection_cache, bessel_cache) は共有する
+            # (emlayers 側でロックして更新する)
+            spaces = [(copy.copy(model), index) for index
+                      in np.array_split(np.arange(len(omegas)), workers)
+                      if len(index)]
+            with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                jobs = [executor.submit(run, ws, index) for ws, index in spaces]
+                for job in jobs:
+                    job.result()
+        return ans
 
 class VMD(Core):
     """
@@ -16,8 +16,10 @@
 """
 hankelフィルター係数のロード
 """
+import numpy as np
 from ..filter_files import anderson_801, anderson_time_787, key_201, key_time_201
 from ..filter_files import kong_241, mizunaga_90, raito_time_250, werthmuller_201, werthmuller_time_201
+from ..filter_files import hankel_accuracy
 
 
 # function for load hankel filter
@@ -116,4 +118,179 @@ def load_werthmuller_time_201():
     base = werthmuller_time_201.base
     cos = werthmuller_time_201.cos
     sin = werthmuller_time_201.sin
-    return base, cos, sin
\ No newline at end of file
+    return base, cos, sin
+
+# hankel_filter='auto' の候補 (フィルタ長の短い順, 同じ長さは精度の高い順)
+HANKEL_FILTER_COST = [
+    ('mizunaga90', 90), ('werthmuller201', 201), ('key201', 201),
+    ('kong241', 241), ('anderson801', 801),
+]
+
+# 時間領域変換には使えないフィルタ
+# (mizunaga90 の横軸 0.025 <= λr <= 140 は遅い時間の応答を決める低波数側を
+#  覆わず、core.validation の時間領域の誤差が 10 % 以上になる)
+FREQUENCY_DOMAIN_ONLY = ['mizunaga90']
+
+
+def select_hankel_filter(r, induction_numbers, accuracy, height_ratios=(0,),
+                         exclude=()):
+    """
+    送受信点間距離 r、誘導数 B、高度比 (h_s + h_r) / r の範囲で、
+    hankel_accuracy の表の最大相対誤差が accuracy 以下となる
+    最も短いフィルタを返す。
+    該当するフィルタがない場合は最大相対誤差が最小のフィルタを返す。
+
+    r : array-like
+        送受信点間距離 (m)
+    induction_numbers : array-like
+        誘導数 B = r (ω μ0 σ)^0.5 (analytic.induction_number)
+    accuracy : float
+        要求する相対誤差
+    height_ratios : array-like
+        送受信点の高度の和と r の比 (0 : 地表)
+    exclude : list of str
+        候補から除くフィルタ
+
+    return : str, float
+        フィルタ名, 表の最大相対誤差
+    """
+    errors = [
+        (hankel_filter_error(name, r, induction_numbers, height_ratios), name)
+        for name, _ in HANKEL_FILTER_COST if name not in exclude
+    ]
+    for error, name in errors:
+        if error <= accuracy:
+            return name, error
+    error, name = min(errors)
+    return name, error
+
+
+def hankel_filter_error(hankel_filter_name, r, induction_numbers,
+                        height_ratios=(0,)):
+    """
+    hankel_accuracy の表から、高度比, r, 誘導数 B の範囲
+    (前後の格子点を含む) の最大相対誤差を返す
+    """
+    table = hankel_accuracy
+    log10_error = np.asarray(table.log10_error[hankel_filter_name])
+    heights = _bracket(table.height_ratio,
+                       np.min(height_ratios), np.max(height_ratios))
+    rows = _bracket(table.r, np.min(r), np.max(r))
+    cols = _bracket(table.induction_number,
+                    np.min(induction_numbers), np.max(induction_numbers))
+    return 10 ** np.max(log10_error[heights, rows, cols])
+
+
+def _bracket(grid, lower, upper):
+    grid = np.asarray(grid)
+    i0 = max(np.searchsorted(grid, lower, side='right') - 1, 0)
+    i1 = min(np.searchsorted(grid, upper, side='left'), len(grid) - 1)
+    i1 = max(i0, i1)
+    return slice(i0, i1 + 1)
+
+
+def make_hankel_accuracy_table(
+        r=(1, 10, 100, 1000), induction_number=np.logspace(-2, 3, 26),
+        height_ratio=(0, 0.01, 0.1, 1, 10), sigma=0.01):
+    """
+    filter_files/hankel_accuracy.py の表を作成する
+    VMD による同じ高度の h_z, h_r を均質半無限媒質の参照解と比較し、
+    |誤差| / |h_z| の log10 を返す。(変位電流は無視,
+    フィルタ毎に height_ratio x r x induction_number の表)
+    height_ratio = 0 : 送受信点が地表 (analytic.halfspace_vmd)
+    height_ratio > 0 : 送受信点が高度 height_ratio * r / 2
+                       (analytic.halfspace_vmd_airborne)
+    """
+    from . import analytic, emlayers, emsource
+    import scipy.constants as const
+    r = np.asarray(r, dtype=float)
+    induction_number = np.asarray(induction_number, dtype=float)
+    height_ratio = np.asarray(height_ratio, dtype=float)
+    references = {}
+    for k, ratio in enumerate(height_ratio):
+        for i, ri in enumerate(r):
+            omega = induction_number ** 2 / (ri ** 2 * const.mu_0 * sigma)
+            if ratio == 0:
+                references[k, i] = analytic.halfspace_vmd(ri, omega, sigma)
+            else:
+                references[k, i] = analytic.halfspace_vmd_airborne(
+                    ri, ratio * ri, omega, sigma)
+    log10_error = {}
+    for name, _ in HANKEL_FILTER_COST:
+        error = np.zeros((len(height_ratio), len(r), len(induction_number)))
+        for (k, i), (h_z, h_r) in references.items():
+            ri = r[i]
+            z = - height_ratio[k] * ri / 2
+            omega = induction_number ** 2 / (ri ** 2 * const.mu_0 * sigma)
+            model = emlayers.Subsurface1D([])
+            model.set_properties(res=[2e14, 1 / sigma])
+            vmd = emsource.VMD(omega / (2 * np.pi), moment=1)
+            model.locate(vmd, [0, 0, z], [ri, 0, z])
+            ans = model.emulate(name, ignore_displacement_current=True)
+            error[k, i] = np.maximum(
+                np.abs(ans['h_z'] - h_z), np.abs(ans['h_x'] - h_r)) / np.abs(h_z)
+        log10_error[name] = np.log10(np.maximum(error, 1e-16))
+    return height_ratio, r, induction_number, log10_error
+
+
+def write_hankel_accuracy_table(path=None, **kwargs):
+    """
+    make_hankel_accuracy_table() の結果を filter_files/hankel_accuracy.py に書き出す
+    """
+    import os
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                            'filter_files', 'hankel_accuracy.py')
+    height_ratio, r, induction_number, log10_error = \
+        make_hankel_accuracy_table(**kwargs)
+    with open(path) as f:
+        license = f.read().split('"""')[0]
+    fmt = lambda values, width: [
+        ' '.join(values[i:i + width]) for i in range(0, len(values), width)]
+    lines = [license.rstrip('\n'), '"""', _TABLE_DOC.strip('\n'), '"""', '']
+    lines.append('height_ratio = [{}]'.format(
+        ', '.join('{:g}'.format(v) for v in height_ratio)))
+    lines.append('')
+    lines.append('r = [{}]'.format(', '.join('{:g}'.format(v) for v in r)))
+    lines.append('')
+    lines.append('induction_number = [')
+    lines += ['        ' + line for line in fmt(
+        ['{:.4e},'.format(v) for v in induction_number], 6)]
+    lines.append(']')
+    lines.append('')
+    lines.append('log10_error = {')
+    for name, error in log10_error.items():
+        lines.append("    '{}' : [".format(name))
+        for block in error:
+            lines.append('        [')
+            for row in block:
+                lines.append('            [')
+                lines += ['                ' + line for line in fmt(
+                    ['{:.2f},'.format(v) for v in row], 8)]
+                lines.append('            ],')
+            lines.append('        ],')
+        lines.append('    ],')
+    lines.append('}')
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+_TABLE_DOC = """
+Relative error of the Hankel transform filters against the half-space
+VMD response used by hankel_filter='auto'.
+
+VMD source and receiver at the same height above a homogeneous
+half-space (sigma = 0.01 S/m, displacement current ignored).
+height_ratio = (h_s + h_r) / r; 0 is the surface (core.analytic.halfspace_vmd),
+> 0 is airborne (core.analytic.halfspace_vmd_airborne, quadrature).
+log10_error[name][k][i][j] = log10(max(|dh_z|, |dh_r|) / |h_z|)
+at height_ratio[k], offset r[i] (m) and induction number induction_number[j].
+
+For coplanar source and receiver the direct term of the kernel is barely
+damped (emulate separates them by 1e-8 m, 1e-4 m for anderson801).
+Filters with a wide abscissa range (key201, kong241) cannot integrate it,
+which sets their error floor (key201: 25 % in h_r) at every height;
+their coefficients agree with Key (2012) and Kong (2007).
+
+Generated by core.filters.write_hankel_accuracy_table().
+"""
@@ -14,89 +14,70 @@
 # -*- coding: utf-8 -*-
 
 import numpy as np
-from scipy.special import erf, erfc, jn
-from ..utils.function import kroneckers_delta
+from scipy.special import erf, erfc
+from ..utils.function import kroneckers_delta, is_requested
 
-def compute_kernel_vmd(model, omega):
+def compute_kernel_vmd(model, omega, sigma=None):
     """
-    
+    直接波 (送受信点が同じ層の場合) は含まない \\
+    (transform.add_direct_field で全空間の解析解を加える)
     """
-    U_te, U_tm, D_te, D_tm, e_up, e_down = model.compute_coefficients(omega)
+    U_te, U_tm, D_te, D_tm, e_up, e_down = model.compute_coefficients(omega, sigma)
     kernel_te = U_te[model.rlayer - 1] * e_up \
-                    + D_te[model.rlayer - 1] * e_down \
-                    + kroneckers_delta(model.rlayer, model.slayer) \
-                    * np.exp(-model.u[model.slayer - 1] \
-                        * np.abs(model.rz - model.sz))
-    kernel_te_hr = U_te[model.rlayer - 1] * e_up \
-                    - D_te[model.rlayer - 1] * e_down \
-                    +  kroneckers_delta(model.rlayer, model.slayer) \
-                    * (model.rz - model.sz) / np.abs(model.rz - model.sz) \
-                    * np.exp(-model.u[model.slayer - 1] \
-                        * np.abs(model.rz - model.sz))
+                    + D_te[model.rlayer - 1] * e_down
+    kernel = np.zeros((3, model.filter_length), dtype=complex)
     kernel_e_phi = kernel_te * model.lambda_ ** 2 \
                     / model.u[model.slayer - 1]
-    kernel_h_r = kernel_te_hr * model.lambda_ ** 2 \
-                    * model.u[model.rlayer - 1] \
-                    / model.u[model.slayer - 1]
-    kernel_h_z = kernel_e_phi * model.lambda_
-    kernel = [kernel_e_phi, kernel_h_r, kernel_h_z]
-    kernel = np.array(kernel)
+    if is_requested(model, 'e_x', 'e_y'):
+        kernel[0] = kernel_e_phi
+    # 水平磁場成分が不要な場合は計算しない
+    if is_requested(model, 'h_x', 'h_y'):
+        kernel_te_hr = U_te[model.rlayer - 1] * e_up \
+                        - D_te[model.rlayer - 1] * e_down
+        kernel[1] = kernel_te_hr * model.lambda_ ** 2 \
+                        * model.u[model.rlayer - 1] \
+                        / model.u[model.slayer - 1]
+    if is_requested(model, 'h_z'):
+        kernel[2] = kernel_e_phi * model.lambda_
     model.kernel = kernel
     return kernel
 
-def compute_kernel_hmd(model, omega):
+def compute_kernel_hmd(model, omega, sigma=None):
     """
-    
+    直接波 (送受信点が同じ層の場合) は含まない \\
+    (transform.add_direct_field で全空間の解析解を加える)
     """
-    U_te, U_tm, D_te, D_tm, e_up, e_down = model.compute_coefficients(omega)
-    kernel_tm_er = (-U_tm[model.rlayer - 1] * e_up \
-                        + D_tm[model.rlayer - 1] * e_down \
-                        - np.sign(model.rz - model.sz) \
-                        * kroneckers_delta(model.rlayer, model.slayer) \
-                        * np.exp(-model.u[model.slayer - 1] \
-                                * np.abs(model.rz -model.sz))) \
-                    * model.u[model.rlayer - 1] \
-                    / model.u[model.slayer - 1]
-    kernel_te_er = U_te[model.rlayer - 1] * e_up \
-                    + D_te[model.rlayer - 1] * e_down \
-                    + np.sign(model.rz - model.sz) \
-                    * kroneckers_delta(model.rlayer, model.slayer) \
-                    * np.exp(-model.u[model.slayer - 1] \
-                            * np.abs(model.rz - model.sz))
-    kernel_tm_ez = (U_tm[model.rlayer - 1] * e_up \
-                        + D_tm[model.rlayer - 1] * e_down \
-                        + kroneckers_delta(model.rlayer, model.slayer) \
-                        * np.exp(-model.u[model.slayer - 1] \
-                                * np.abs(model.rz -model.sz))) \
-                    / model.u[model.slayer - 1]
-    kernel_tm_hr = (U_tm[model.rlayer - 1] * e_up \
-                        + D_tm[model.rlayer - 1] * e_down \
-                        + kroneckers_delta(model.rlayer, model.slayer) \
-                        * np.exp(-model.u[model.slayer - 1] \
-                                * np.abs(model.rz -model.sz))) \
-                    / model.u[model.slayer - 1]
-    kernel_te_hr = (-U_te[model.rlayer - 1] * e_up \
-                        + D_te[model.rlayer - 1] * e_down \
-                        - kroneckers_delta(model.rlayer, model.slayer) \
-                        * np.exp(-model.u[model.slayer - 1] \
-                                * np.abs(model.rz - model.sz))) \
-                    * model.u[model.rlayer - 1]
-    kernel_te_hz = U_te[model.rlayer - 1] * e_up \
-                    + D_te[model.rlayer - 1] * e_down \
-                    + np.sign(model.rz - model.sz) \
-                    * kroneckers_delta(model.rlayer, model.slayer) \
-                    * np.exp(-model.u[model.slayer - 1] \
-                            * np.abs(model.rz - model.sz))
-    kernel = [kernel_tm_er , kernel_te_er, kernel_tm_ez,
-                   kernel_tm_hr, kernel_te_hr, kernel_te_hz]
-    kernel = np.array(kernel)
+    U_te, U_tm, D_te, D_tm, e_up, e_down = model.compute_coefficients(omega, sigma)
+    kernel = np.zeros((6, model.filter_length), dtype=complex)
+    # 要求された成分 (emulate の components) に必要なカーネルのみ計算する
+    if is_requested(model, 'e_x', 'e_y'):
+        kernel[0] = (-U_tm[model.rlayer - 1] * e_up \
+                            + D_tm[model.rlayer - 1] * e_down) \
+                        * model.u[model.rlayer - 1] \
+                        / model.u[model.slayer - 1]
+        kernel[1] = U_te[model.rlayer - 1] * e_up \
+                        + D_te[model.rlayer - 1] * e_down
+    if is_requested(model, 'e_z'):
+        kernel[2] = (U_tm[model.rlayer - 1] * e_up \
+                            + D_tm[model.rlayer - 1] * e_down) \
+                        / model.u[model.slayer - 1]
+    if is_requested(model, 'h_x', 'h_y'):
+        kernel[3] = (U_tm[model.rlayer - 1] * e_up \
+                            + D_tm[model.rlayer - 1] * e_down) \
+                        / model.u[model.slayer - 1]
+        kernel[4] = (-U_te[model.rlayer - 1] * e_up \
+                            + D_te[model.rlayer - 1] * e_down) \
+                        * model.u[model.rlayer - 1]
+    if is_requested(model, 'h_z'):
+        kernel[5] = U_te[model.rlayer - 1] * e_up \
+                        + D_te[model.rlayer - 1] * e_down
     return kernel
 
-def compute_kernel_ved(model, omega):
+def compute_kernel_ved(model, omega, sigma=None):
     """
 
     """
-    U_te, U_tm, D_te, D_tm, e_up, e_down = model.compute_coefficients(omega)
+    U_te, U_tm, D_te, D_tm, e_up, e_down = model.compute_coefficients(omega, sigma)
     kernel_tm = U_tm[model.rlayer - 1] * e_up \
                     + D_tm[model.rlayer - 1] * e_down \
                     + kroneckers_delta(model.rlayer, model.slayer) \
@@ -115,11 +96,11 @@ def compute_kernel_ved(model, omega):
     kernel = np.array([kernel_e_phi, kernel_e_z ,kernel_h_r])
     return kernel
 
-def compute_kernel_hed(model, omega):
+def compute_kernel_hed(model, omega, sigma=None):
     """
 
     """
-    U_te, U_tm, D_te, D_tm, e_up, e_down = model.compute_coefficients(omega)
+    U_te, U_tm, D_te, D_tm, e_up, e_down = model.compute_coefficients(omega, sigma)
     kernel_tm_er = (-U_tm[model.rlayer - 1] * e_up \
                         + D_tm[model.rlayer - 1] * e_down \
                         - kroneckers_delta(model.rlayer, model.slayer) \
@@ -158,11 +139,11 @@ def compute_kernel_hed(model, omega):
                     kernel_tm_hr, kernel_te_hr, kernel_te_hz])
     return kernel
 
-def compute_kernel_circular(model, omega):
+def compute_kernel_circular(model, omega, sigma=None):
     """
 
     """
-    U_te, U_tm, D_te, D_tm, e_up, e_down = model.compute_coefficients(omega)
+    U_te, U_tm, D_te, D_tm, e_up, e_down = model.compute_coefficients(omega, sigma)
     kernel_te = U_te[model.rlayer - 1] * e_up \
                     + D_te[model.rlayer - 1] * e_down \
                     + kroneckers_delta(model.rlayer, model.slayer) \
@@ -174,8 +155,7 @@ def compute_kernel_circular(model, omega):
                     * (model.rz - model.sz) / np.abs(model.rz - model.sz) \
                     * np.exp(-model.u[model.slayer - 1] \
                             * np.abs(model.rz - model.sz))
-    besk1 = jn(1, model.lambda_ * model.r)
-    besk0 = jn(0, model.lambda_ * model.r)
+    besk0, besk1 = model.bessel_factors(model.r)
 
     kernel_e_phi = kernel_te * model.lambda_ * besk1 \
                     / model.u[model.slayer - 1]
@@ -188,17 +168,17 @@ def compute_kernel_circular(model, omega):
     kernel = np.array(kernel)
     return kernel
 
-def compute_kernel_coincident(model, omega):
+def compute_kernel_coincident(model, omega, sigma=None):
     """
 
     """
-    U_te, U_tm, D_te, D_tm, e_up, e_down = model.compute_coefficients(omega)
+    U_te, U_tm, D_te, D_tm, e_up, e_down = model.compute_coefficients(omega, sigma)
     kernel_te = U_te[model.rlayer - 1] * e_up \
                     + D_te[model.rlayer - 1] * e_down \
                     - kroneckers_delta(model.rlayer, model.slayer) \
                     * np.exp(-model.u[model.slayer - 1] \
                             * np.abs(model.rz - model.sz))
-    besk1rad = jn(1, model.lambda_ * model.src.radius)
+    _, besk1rad = model.bessel_factors(model.src.radius)
     kernel_h_z = kernel_te * model.lambda_ * besk1rad \
                     / model.u[model.slayer - 1]
     kernel = np.array(kernel_h_z)
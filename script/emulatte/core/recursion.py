@@ -0,0 +1,381 @@
+# Copyright 2021 Waseda Geophysics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# -*- coding: utf-8 -*-
+"""
+層の漸化計算 (Subsurface1D.compute_coefficients, surface_recursion)
+
+漸化計算は _layer_column, _surface_column の1つの実装のみで、
+backend='numba' では filter 係数 (lambda) 毎の列として numba で
+コンパイルしたループ (layer_recursion, surface_recursion) から、
+backend='numpy' では全 lambda の行をまとめて numpy 配列のまま
+(layer_recursion_numpy, surface_recursion_numpy) 実行する。
+numba が無い環境では HAS_NUMBA = False となり、emulate は numpy に戻る。
+コンパイル後は GIL を解放して実行される (emulate の workers と併用)。
+"""
+import numpy as np
+
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    numba = None
+    HAS_NUMBA = False
+
+BACKENDS = ['numpy', 'numba']
+
+
+def _jit(func):
+    if HAS_NUMBA:
+        return numba.njit(cache=True, nogil=True)(func)
+    return func
+
+
+def _python(func):
+    # numba でコンパイルする前の関数 (numpy 配列の行単位で実行する)
+    return getattr(func, 'py_func', func)
+
+
+@_jit
+def _layer_column(u, ztilde, ytilde, thicks, depth, sz, rz, si, ri, signs,
+                  out, work):
+    """
+    Subsurface1D.compute_coefficients の漸化計算 (唯一の実装)
+
+    u の第2軸以降は任意で、backend='numba' では filter 係数 (lambda) 1点
+    毎に u[:, j] (スカラーの列) として、backend='numpy' では
+    u (num_layer, filter_length) のまま各層の行をまとめて計算する。
+
+    Parameters
+    ----------
+    u : ndarray (num_layer, ...)
+    ztilde, ytilde : ndarray (num_layer, )
+    thicks : ndarray (num_layer - 2, )
+    depth : ndarray (num_layer - 1, )
+    sz, rz : float
+    si, ri : int
+        送信層、受信層 (1始まり)
+    signs : (te_up, te_down, tm_up, tm_down)
+        送信源の kernel_te_up_sign, ... (emsource)
+    out : (U_te, U_tm, D_te, D_tm, damp)
+        結果の書き込み先 (u と同じ形, damp は (2, ...) で e_up, e_down)
+        U_te, ... は 1, damp は 0 で初期化しておく
+    work : (Y, Z, tanhuh, r_te, r_tm, R_te, R_tm, Ytilde, Ztilde, Yhat, Zhat)
+        u と同じ形の作業領域
+    """
+    te_up_sign, te_down_sign, tm_up_sign, tm_down_sign = signs
+    U_te, U_tm, D_te, D_tm, damp = out
+    Y, Z, tanhuh, r_te, r_tm, R_te, R_tm, Ytilde, Ztilde, Yhat, Zhat = work
+    nl = u.shape[0]
+
+    for i in range(nl):
+        Y[i] = u[i] / ztilde[i]
+        Z[i] = u[i] / ytilde[i]
+    for i in range(1, nl - 1):
+        tanhuh[i] = np.tanh(u[i] * thicks[i - 1])
+
+    ### DOWN ADMITTANCE & IMPEDANCE ###
+    Ytilde[nl - 1] = Y[nl - 1]
+    Ztilde[nl - 1] = Z[nl - 1]
+    r_te[nl - 1] = 0
+    r_tm[nl - 1] = 0
+
+    for ii in range(nl - 1, si, -1):
+        numerator_Y = Ytilde[ii] + Y[ii - 1] * tanhuh[ii - 1]
+        denominator_Y = Y[ii - 1] + Ytilde[ii] * tanhuh[ii - 1]
+        Ytilde[ii - 1] = Y[ii - 1] * numerator_Y / denominator_Y
+
+        numerator_Z = Ztilde[ii] + Z[ii - 1] * tanhuh[ii - 1]
+        denominator_Z = Z[ii - 1] + Ztilde[ii] * tanhuh[ii - 1]
+        Ztilde[ii - 1] = Z[ii - 1] * numerator_Z / denominator_Z
+
+        r_te[ii - 1] = (Y[ii - 1] - Ytilde[ii]) / (Y[ii - 1] + Ytilde[ii])
+        r_tm[ii - 1] = (Z[ii - 1] - Ztilde[ii]) / (Z[ii - 1] + Ztilde[ii])
+
+    if si != nl:
+        r_te[si - 1] = (Y[si - 1] - Ytilde[si]) / (Y[si - 1] + Ytilde[si])
+        r_tm[si - 1] = (Z[si - 1] - Ztilde[si]) / (Z[si - 1] + Ztilde[si])
+
+    ### UP ADMITTANCE & IMPEDANCE ###
+    Yhat[0] = Y[0]
+    Zhat[0] = Z[0]
+    R_te[0] = 0
+    R_tm[0] = 0
+
+    for ii in range(2, si):
+        numerator_Y = Yhat[ii - 2] + Y[ii - 1] * tanhuh[ii - 1]
+        denominator_Y = Y[ii - 1] + Yhat[ii - 2] * tanhuh[ii - 1]
+        Yhat[ii - 1] = Y[ii - 1] * numerator_Y / denominator_Y
+
+        numerator_Z = Zhat[ii - 2] + Z[ii - 1] * tanhuh[ii - 1]
+        denominator_Z = Z[ii - 1] + Zhat[ii - 2] * tanhuh[ii - 1]
+        Zhat[ii - 1] = Z[ii - 1] * numerator_Z / denominator_Z
+
+        R_te[ii - 1] = (Y[ii - 1] - Yhat[ii - 2]) / (Y[ii - 1] + Yhat[ii - 2])
+        R_tm[ii - 1] = (Z[ii - 1] - Zhat[ii - 2]) / (Z[ii - 1] + Zhat[ii - 2])
+    if si != 1:
+        R_te[si - 1] = (Y[si - 1] - Yhat[si - 2]) / (Y[si - 1] + Yhat[si - 2])
+        R_tm[si - 1] = (Z[si - 1] - Zhat[si - 2]) / (Z[si - 1] + Zhat[si - 2])
+
+    us = u[si - 1]
+    # In the layer containing the source (slayer)
+    if si == 1:
+        U_te[si - 1] = 0
+        U_tm[si - 1] = 0
+        D_te[si - 1] = te_down_sign * r_te[si - 1] \
+                        * np.exp(-us * (depth[si - 1] - sz))
+        D_tm[si - 1] = tm_down_sign * r_tm[si - 1] \
+                        * np.exp(-us * (depth[si - 1] - sz))
+    elif si == nl:
+        U_te[si - 1] = te_up_sign * R_te[si - 1] \
+                        * np.exp(us * (depth[si - 2] - sz))
+        U_tm[si - 1] = tm_up_sign * R_tm[si - 1] \
+                        * np.exp(us * (depth[si - 2] - sz))
+        D_te[si - 1] = 0
+        D_tm[si - 1] = 0
+    else:
+        exp_term1 = np.exp(-2 * us * (depth[si - 1] - depth[si - 2]))
+        exp_term2u = np.exp( us * (depth[si - 2] - 2 * depth[si - 1] + sz))
+        exp_term2d = np.exp(-us * (depth[si - 1] - 2 * depth[si - 2] + sz))
+        exp_term3u = np.exp( us * (depth[si - 2] - sz))
+        exp_term3d = np.exp(-us * (depth[si - 1] - sz))
+
+        U_te[si - 1] = \
+            1 / (1 - R_te[si - 1] * r_te[si - 1] * exp_term1) \
+            * R_te[si - 1] \
+            * (te_down_sign * r_te[si - 1] * exp_term2u \
+                + te_up_sign * exp_term3u)
+        U_tm[si - 1] = \
+            1 / (1 - R_tm[si - 1] * r_tm[si - 1] * exp_term1) \
+            * R_tm[si - 1] \
+            * (tm_down_sign * r_tm[si - 1] * exp_term2u \
+                + tm_up_sign * exp_term3u)
+        D_te[si - 1] = \
+            1 / (1 - R_te[si - 1] * r_te[si - 1] * exp_term1) \
+            * r_te[si - 1] \
+            * (te_up_sign * R_te[si - 1] * exp_term2d \
+                + te_down_sign * exp_term3d)
+        D_tm[si - 1] = \
+            1 / (1 - R_tm[si - 1] * r_tm[si - 1] * exp_term1) \
+            * r_tm[si - 1] \
+            * (tm_up_sign * R_tm[si - 1] * exp_term2d \
+                + tm_down_sign * exp_term3d)
+
+    # for the layers above the slayer
+    if ri < si:
+        if si == nl:
+            exp_term = np.exp(-us * (sz - depth[si - 2]))
+            D_te[si - 2] = \
+                (Y[si - 2] * (1 + R_te[si - 1]) + Y[si - 1] * (1 - R_te[si - 1])) \
+                / (2 * Y[si - 2]) * te_up_sign * exp_term
+            D_tm[si - 2] = \
+                (Z[si - 2] * (1 + R_tm[si - 1]) + Z[si - 1] * (1 - R_tm[si - 1])) \
+                / (2 * Z[si - 2]) * tm_up_sign * exp_term
+        elif si != 1 and si != nl:
+            exp_term = np.exp(-us * (sz - depth[si - 2]))
+            exp_termii = np.exp(-us * (depth[si - 1] - depth[si - 2]))
+            D_te[si - 2] = \
+                (Y[si - 2] * (1 + R_te[si - 1]) + Y[si - 1] * (1 - R_te[si - 1])) \
+                / (2 * Y[si - 2]) * (D_te[si - 1] * exp_termii + te_up_sign * exp_term)
+            D_tm[si - 2] = \
+                (Z[si - 2] * (1 + R_tm[si - 1]) + Z[si - 1] * (1 - R_tm[si - 1])) \
+                / (2 * Z[si - 2]) * (D_tm[si - 1] * exp_termii + tm_up_sign * exp_term)
+
+        for jj in range(si - 2, 0, -1):
+            exp_termjj = np.exp(-u[jj] * (depth[jj] - depth[jj - 1]))
+            D_te[jj - 1] = \
+                (Y[jj - 1] * (1 + R_te[jj]) + Y[jj] * (1 - R_te[jj])) \
+                / (2 * Y[jj - 1]) * D_te[jj] * exp_termjj
+            D_tm[jj - 1] = \
+                (Z[jj - 1] * (1 + R_tm[jj]) + Z[jj] * (1 - R_tm[jj])) \
+                / (2 * Z[jj - 1]) * D_tm[jj] * exp_termjj
+
+        for jj in range(si - 1, 1, -1):
+            exp_termjj = np.exp(u[jj - 1] * (depth[jj - 2] - depth[jj - 1]))
+            U_te[jj - 1] = D_te[jj - 1] * exp_termjj * R_te[jj - 1]
+            U_tm[jj - 1] = D_tm[jj - 1] * exp_termjj * R_tm[jj - 1]
+        U_te[0] = 0
+        U_tm[0] = 0
+
+    # for the layers below the slayer
+    if ri > si:
+        if si == 1:
+            exp_term = np.exp(-us * (depth[si - 1] - sz))
+            U_te[si] = (Y[si] * (1 + r_te[si - 1]) \
+                            + Y[si - 1] * (1 - r_te[si - 1])) \
+                        / (2 * Y[si]) * te_down_sign * exp_term
+            U_tm[si] = (Z[si] * (1 + r_tm[si - 1]) \
+                            + Z[si - 1] * (1 - r_tm[si - 1])) \
+                        / (2 * Z[si]) * tm_down_sign * exp_term
+        elif si != 1 and si != nl:
+            exp_termi = np.exp(-us * (depth[si - 1] - depth[si - 2]))
+            exp_termii = np.exp(-us * (depth[si - 1] - sz))
+            U_te[si] = (Y[si] * (1 + r_te[si - 1]) \
+                            + Y[si - 1] * (1 - r_te[si - 1])) \
+                        / (2 * Y[si]) \
+                        * (U_te[si - 1] * exp_termi + te_down_sign * exp_termii)
+            U_tm[si] = (Z[si] * (1 + r_tm[si - 1]) + Z[si - 1] \
+                            * (1 - r_tm[si - 1])) \
+                        / (2 * Z[si]) \
+                        * (U_tm[si - 1] * exp_termi + tm_down_sign * exp_termii)
+
+        for jj in range(si + 2, nl + 1):
+            exp_term = np.exp(-u[jj - 2] * (depth[jj - 2] - depth[jj - 3]))
+            U_te[jj - 1] = (Y[jj - 1] * (1 + r_te[jj - 2]) \
+                                + Y[jj - 2] * (1 - r_te[jj - 2])) \
+                            / (2 * Y[jj - 1]) * U_te[jj - 2] * exp_term
+            U_tm[jj - 1] = (Z[jj - 1] * (1 + r_tm[jj - 2]) \
+                                + Z[jj - 2] * (1 - r_tm[jj - 2])) \
+                            / (2 * Z[jj - 1]) * U_tm[jj - 2] * exp_term
+
+        for jj in range(si + 1, nl):
+            D_te[jj - 1] = U_te[jj - 1] * np.exp(-u[jj - 1] \
+                                * (depth[jj - 1] - depth[jj - 2])) * r_te[jj - 1]
+            D_tm[jj - 1] = U_tm[jj - 1] * np.exp(-u[jj - 1] \
+                                * (depth[jj - 1] - depth[jj - 2])) * r_tm[jj - 1]
+        D_te[nl - 1] = 0
+        D_tm[nl - 1] = 0
+
+    # compute Damping coefficient (damp[0] : e_up, damp[1] : e_down)
+    ur = u[ri - 1]
+    if ri == 1:
+        damp[1] = np.exp(ur * (rz - depth[ri - 1]))
+    elif ri == nl:
+        damp[0] = np.exp(-ur * (rz - depth[ri - 2]))
+    else:
+        damp[0] = np.exp(-ur * (rz - depth[ri - 2]))
+        damp[1] = np.exp(ur * (rz - depth[ri - 1]))
+
+
+def _layer_buffers(shape, ctype):
+    U_te = np.ones(shape, dtype=ctype)
+    U_tm = np.ones(shape, dtype=ctype)
+    D_te = np.ones(shape, dtype=ctype)
+    D_tm = np.ones(shape, dtype=ctype)
+    damp = np.zeros((2,) + shape[1:], dtype=ctype)
+    return U_te, U_tm, D_te, D_tm, damp
+
+
+def layer_recursion_numpy(u, ztilde, ytilde, thicks, depth, sz, rz, si, ri,
+                          signs):
+    """
+    _layer_column を numpy 配列の行単位 (全 lambda をまとめて) で実行する
+
+    Returns
+    -------
+    U_te, U_tm, D_te, D_tm, e_up, e_down
+    """
+    U_te, U_tm, D_te, D_tm, damp = out = _layer_buffers(u.shape, u.dtype)
+    work = (
+        np.ones_like(u), np.ones_like(u), np.ones_like(u),
+        np.ones_like(u), np.ones_like(u), np.ones_like(u), np.ones_like(u),
+        np.zeros_like(u), np.zeros_like(u), np.ones_like(u), np.ones_like(u),
+    )
+    _python(_layer_column)(
+        u, ztilde, ytilde, thicks, depth, sz, rz, si, ri, signs, out, work)
+    return U_te, U_tm, D_te, D_tm, damp[0], damp[1]
+
+
+@_jit
+def layer_recursion(u, ztilde, ytilde, thicks, depth, sz, rz, si, ri, signs):
+    """
+    _layer_column を filter 係数 (lambda) 毎に層方向のループとして実行する
+    (backend='numba', 1列分の作業領域を使い回す)
+
+    Returns
+    -------
+    U_te, U_tm, D_te, D_tm, e_up, e_down
+    """
+    nl, nf = u.shape
+    ctype = u.dtype
+    U_te = np.ones((nl, nf), dtype=ctype)
+    U_tm = np.ones((nl, nf), dtype=ctype)
+    D_te = np.ones((nl, nf), dtype=ctype)
+    D_tm = np.ones((nl, nf), dtype=ctype)
+    damp = np.zeros((2, nf), dtype=ctype)
+    work = (
+        np.ones(nl, dtype=ctype), np.ones(nl, dtype=ctype),
+        np.ones(nl, dtype=ctype), np.ones(nl, dtype=ctype),
+        np.ones(nl, dtype=ctype), np.ones(nl, dtype=ctype),
+        np.ones(nl, dtype=ctype), np.zeros(nl, dtype=ctype),
+        np.zeros(nl, dtype=ctype), np.ones(nl, dtype=ctype),
+        np.ones(nl, dtype=ctype),
+    )
+    for j in range(nf):
+        out = (U_te[:, j], U_tm[:, j], D_te[:, j], D_tm[:, j], damp[:, j])
+        _layer_column(u[:, j], ztilde, ytilde, thicks, depth, sz, rz, si, ri,
+                      signs, out, work)
+    return U_te, U_tm, D_te, D_tm, damp[0], damp[1]
+
+
+@_jit
+def _surface_column(Y, Z, tanhuh, Ytilde, Ztilde, start):
+    """
+    Subsurface1D.surface_recursion の漸化計算 (第 start 層から地表まで,
+    唯一の実装)。Ytilde, Ztilde は書き換える。
+    _layer_column と同様に、第2軸以降は numba では lambda 1点、
+    numpy では全 lambda。
+
+    Returns
+    -------
+    r_te0, r_tm0 : 地表の反射係数
+    """
+    for ii in range(start, 1, -1):
+        numerator_Y = Ytilde[ii] + Y[ii - 1] * tanhuh[ii - 1]
+        denominator_Y = Y[ii - 1] + Ytilde[ii] * tanhuh[ii - 1]
+        Ytilde[ii - 1] = Y[ii - 1] * numerator_Y / denominator_Y
+
+        numerator_Z = Ztilde[ii] + Z[ii - 1] * tanhuh[ii - 1]
+        denominator_Z = Z[ii - 1] + Ztilde[ii] * tanhuh[ii - 1]
+        Ztilde[ii - 1] = Z[ii - 1] * numerator_Z / denominator_Z
+
+    r_te0 = (Y[0] - Ytilde[1]) / (Y[0] + Ytilde[1])
+    r_tm0 = (Z[0] - Ztilde[1]) / (Z[0] + Ztilde[1])
+    return r_te0, r_tm0
+
+
+def surface_recursion_numpy(Y, Z, tanhuh, Ytilde, Ztilde, start):
+    """
+    _surface_column を numpy 配列の行単位で実行する
+
+    Returns
+    -------
+    r_te0, r_tm0 : ndarray (filter_length, )
+    """
+    return _python(_surface_column)(Y, Z, tanhuh, Ytilde, Ztilde, start)
+
+
+@_jit
+def surface_recursion(Y, Z, tanhuh, Ytilde, Ztilde, start):
+    """
+    _surface_column を filter 係数 (lambda) 毎に実行する (backend='numba')
+
+    Parameters
+    ----------
+    Y, Z, tanhuh, Ytilde, Ztilde : ndarray (num_layer, filter_length)
+    start : int
+        Ytilde[start - 1] から計算する (start より深い層は計算済み)
+
+    Returns
+    -------
+    r_te0, r_tm0 : ndarray (filter_length, )
+        地表の反射係数
+    """
+    nl, nf = Y.shape
+    r_te0 = np.zeros(nf, dtype=Y.dtype)
+    r_tm0 = np.zeros(nf, dtype=Y.dtype)
+    for j in range(nf):
+        r_te0[j], r_tm0[j] = _surface_column(
+            Y[:, j], Z[:, j], tanhuh[:, j], Ytilde[:, j], Ztilde[:, j], start)
+    return r_te0, r_tm0
@@ -21,11 +21,78 @@ Class List
 * FourierTransform
 """
 import numpy as np
+from scipy import interpolate
 from . import kernels, filters
+from ..utils.function import is_requested
+
+# FFT で周波数応答を計算する帯域 [Hz] (Hankel変換フィルタ毎)
+FFT_FREQ_BAND = {
+    'werthmuller201' : (1e-6, 1e8),
+    'key201' : (1e-8, 1e12),
+    'kong241' : (1e-2, 1e12),   # 1e-3 Hz 以下で Im(F) の誤差が 4 % 以上 (core.validation)
+    'anderson801' : (1e-21, 1e21),
+}
+# 他のフィルタは範囲不明
+FFT_FREQ_BAND_DEFAULT = (1e-21, 1e21)
+
+# 応答の6成分 (HankelTransform の出力 out[0..5] の並び)
+FIELDS = ('e_x', 'e_y', 'e_z', 'h_x', 'h_y', 'h_z')
+# (n, 6) の複素配列を名前付きフィールドで参照する構造化データ型
+FIELD_DTYPE = np.dtype([(name, complex) for name in FIELDS])
+
+def field_buffer(out=None):
+    """HankelTransform の出力先 (長さ6の複素配列)"""
+    if out is None:
+        out = np.zeros(6, dtype=complex)
+    return out
+
+def field_views(ans):
+    """(n, 6) の応答から各成分の列ビュー (コピーなし) の dict を返す"""
+    return {name: ans[:, i] for i, name in enumerate(FIELDS)}
+
+def add_direct_field(model, moment, out):
+    """
+    送受信点が同じ層にある場合、単位モーメントの磁気双極子 (向き moment)
+    による直接波 (その層の全空間の解析解) を out に加える。
+    kernels.compute_kernel_vmd, compute_kernel_hmd は直接波を含まない。
+    (同じ高度の送受信点では直接波のカーネルが λ について減衰せず、
+     短いフィルタでは積分できないため)
+    Ward & Hohmann (1988) eq. 2.56, 2.57 (γ = ik, exp(-γR))
+    """
+    if model.slayer != model.rlayer:
+        return out
+    dist = np.array([np.ravel(model.rx - model.sx)[0],
+                     np.ravel(model.ry - model.sy)[0],
+                     np.ravel(model.rz - model.sz)[0]])
+    R = np.linalg.norm(dist)
+    unit = dist / R
+    moment = np.asarray(moment, dtype=float)
+    gamma_R = (-model.k[model.slayer - 1] ** 2) ** 0.5 * R
+    decay = np.exp(-gamma_R) / (4 * np.pi)
+    h = decay / R ** 3 * ((3 + 3 * gamma_R + gamma_R ** 2) \
+                            * np.dot(unit, moment) * unit \
+                        - (1 + gamma_R + gamma_R ** 2) * moment)
+    e = - model.ztilde[model.slayer - 1] * decay / R ** 2 \
+            * (1 + gamma_R) * np.cross(moment, unit)
+    # 要求された成分 (emulate の components) にのみ加える
+    for i, name in enumerate(FIELDS):
+        if is_requested(model, name):
+            out[i] += e[i] if i < 3 else h[i - 3]
+    return out
+
+# 時間ゲート・フィルタ毎の FFT 演算子 (fft_operator) のキャッシュ
+_fft_operator_cache = {}
+# 時間範囲・フィルタ毎の遅延畳み込み DLF の周波数 (dlf_lagged_sampling) のキャッシュ
+_dlf_lagged_cache = {}
 
 class HankelTransform:
     """Hankel Transform
     Hankel変換による応答の計算
+    各メソッドは6成分 (FIELDS の順) を out (長さ6の複素配列) に書き込んで返す
+    (out = None の場合は新たに確保する)
+    model : emlayers.Workspace (作業変数 lambda_, filter_length, kernel 等を書き込む)
+    sigma : 角周波数 omega における各層の導電率 (model.complex_conductivity)
+    (None の場合は compute_coefficients で計算する)
 
     Index:
         vmd
@@ -42,49 +109,61 @@ class HankelTransform:
         y_line_source
     """
     @staticmethod
-    def vmd(model, omega):
+    def vmd(model, omega, out=None, sigma=None):
         """
 
         """
         y_base, wt0, wt1 = filters.load_hankel_filter(model.hankel_filter)
         model.filter_length = len(y_base)
         model.lambda_ = y_base/model.r
-        kernel = kernels.compute_kernel_vmd(model, omega)
-        ans = {}
-        e_phi = np.dot(wt1, kernel[0]) / model.r
-        h_r = np.dot(wt1, kernel[1]) / model.r
-        h_z = np.dot(wt0, kernel[2]) / model.r
-        ans["e_x"] = -1 / (4 * np.pi) * model.ztilde[model.slayer - 1] \
+        kernel = kernels.compute_kernel_vmd(model, omega, sigma)
+        out = field_buffer(out)
+        # 要求されていない成分 (emulate の components) の積和は省略する
+        e_phi = h_r = h_z = 0
+        if is_requested(model, 'e_x', 'e_y'):
+            e_phi = np.dot(wt1, kernel[0]) / model.r
+        if is_requested(model, 'h_x', 'h_y'):
+            h_r = np.dot(wt1, kernel[1]) / model.r
+        if is_requested(model, 'h_z'):
+            h_z = np.dot(wt0, kernel[2]) / model.r
+        out[0] = -1 / (4 * np.pi) * model.ztilde[model.slayer - 1] \
                         * -model.sin_phi * e_phi
-        ans["e_y"] = -1 / (4 * np.pi) * model.ztilde[model.slayer - 1] \
+        out[1] = -1 / (4 * np.pi) * model.ztilde[model.slayer - 1] \
                         *  model.cos_phi * e_phi
-        ans["e_z"] = 0
-        ans["h_x"] = 1 / (4 * np.pi) * model.cos_phi * h_r
-        ans["h_y"] = 1 / (4 * np.pi) * model.sin_phi * h_r
-        ans["h_z"] = 1 / (4 * np.pi) * model.ztilde[model.slayer - 1] \
+        out[2] = 0
+        out[3] = 1 / (4 * np.pi) * model.cos_phi * h_r
+        out[4] = 1 / (4 * np.pi) * model.sin_phi * h_r
+        out[5] = 1 / (4 * np.pi) * model.ztilde[model.slayer - 1] \
                         / model.ztilde[model.rlayer - 1] * h_z 
-        return ans
+        return add_direct_field(model, (0, 0, 1), out)
 
     @staticmethod
-    def hmdx(model, omega):
+    def hmdx(model, omega, out=None, sigma=None):
         """
 
         """
         y_base, wt0, wt1 = filters.load_hankel_filter(model.hankel_filter)
         model.filter_length = len(y_base)
         model.lambda_ = y_base / model.r
-        kernel = kernels.compute_kernel_hmd(model, omega)
-        ans = {}
-        tm_er_1 = np.dot(wt0, kernel[0] * model.lambda_) / model.r
-        tm_er_2 = np.dot(wt1, kernel[0]) / model.r
-        te_er_1 = np.dot(wt0, kernel[1] * model.lambda_) / model.r
-        te_er_2 = np.dot(wt1, kernel[1]) / model.r
-        tm_ez = np.dot(wt1, kernel[2] * model.lambda_**2) / model.r
-        tm_hr_1 = np.dot(wt0, kernel[3] * model.lambda_) / model.r
-        tm_hr_2 = np.dot(wt1, kernel[3]) / model.r
-        te_hr_1 = np.dot(wt0, kernel[4] * model.lambda_) / model.r
-        te_hr_2 = np.dot(wt1, kernel[4]) / model.r
-        te_hz = np.dot(wt1, kernel[5] * model.lambda_**2) / model.r
+        kernel = kernels.compute_kernel_hmd(model, omega, sigma)
+        out = field_buffer(out)
+        # 要求されていない成分 (emulate の components) の積和は省略する
+        tm_er_1 = tm_er_2 = te_er_1 = te_er_2 = tm_ez = 0
+        tm_hr_1 = tm_hr_2 = te_hr_1 = te_hr_2 = te_hz = 0
+        if is_requested(model, 'e_x', 'e_y'):
+            tm_er_1 = np.dot(wt0, kernel[0] * model.lambda_) / model.r
+            tm_er_2 = np.dot(wt1, kernel[0]) / model.r
+            te_er_1 = np.dot(wt0, kernel[1] * model.lambda_) / model.r
+            te_er_2 = np.dot(wt1, kernel[1]) / model.r
+        if is_requested(model, 'e_z'):
+            tm_ez = np.dot(wt1, kernel[2] * model.lambda_**2) / model.r
+        if is_requested(model, 'h_x', 'h_y'):
+            tm_hr_1 = np.dot(wt0, kernel[3] * model.lambda_) / model.r
+            tm_hr_2 = np.dot(wt1, kernel[3]) / model.r
+            te_hr_1 = np.dot(wt0, kernel[4] * model.lambda_) / model.r
+            te_hr_2 = np.dot(wt1, kernel[4]) / model.r
+        if is_requested(model, 'h_z'):
+            te_hz = np.dot(wt1, kernel[5] * model.lambda_**2) / model.r
         amp_tm_ex_1 = -(model.ztilde * model.ytilde)[model.slayer - 1] \
                         * (model.rx - model.sx) * (model.ry - model.sy) \
                         / (4 * np.pi * model.ytilde[model.rlayer - 1] \
@@ -113,8 +192,10 @@ class HankelTransform:
         amp_te_ey_2 = -model.ztilde[model.slayer - 1] \
                         / (4 * np.pi) * (2 * (model.rx - model.sx) ** 2 \
                             / model.r ** 3 - 1 / model.r)
-        amp_tm_ez = - model.ztilde[model.slayer - 1] \
-                        * (model.ry - model.sy) / (4 * np.pi * model.r)
+        amp_tm_ez = -(model.ztilde * model.ytilde)[model.slayer - 1] \
+                        * (model.ry - model.sy) \
+                        / (4 * np.pi * model.ytilde[model.rlayer - 1] \
+                            * model.r)
         amp_tm_hx_1 = model.k[model.slayer - 1] ** 2  \
                         * (model.ry - model.sy) ** 2 / model.r ** 2 \
                         / (4 * np.pi)
@@ -144,38 +225,45 @@ class HankelTransform:
                         / model.ztilde[model.rlayer - 1] \
                         * (model.rx - model.sx) / (4 * np.pi * model.r)
 
-        ans["e_x"] = amp_tm_ex_1 * tm_er_1 + amp_tm_ex_2 * tm_er_2 \
+        out[0] = amp_tm_ex_1 * tm_er_1 + amp_tm_ex_2 * tm_er_2 \
                     + amp_te_ex_1 * te_er_1 + amp_te_ex_2 * te_er_2
-        ans["e_y"] = amp_tm_ey_1 * tm_er_1 + amp_tm_ey_2 * tm_er_2 \
+        out[1] = amp_tm_ey_1 * tm_er_1 + amp_tm_ey_2 * tm_er_2 \
                     + amp_te_ey_1 * te_er_1 + amp_te_ey_2 * te_er_2
-        ans["e_z"] = amp_tm_ez * tm_ez
-        ans["h_x"] = amp_tm_hx_1 * tm_hr_1 + amp_tm_hx_2 * tm_hr_2 \
+        out[2] = amp_tm_ez * tm_ez
+        out[3] = amp_tm_hx_1 * tm_hr_1 + amp_tm_hx_2 * tm_hr_2 \
                     + amp_te_hx_1 * te_hr_1 + amp_te_hx_2 * te_hr_2
-        ans["h_y"] = amp_tm_hy_1 * tm_hr_1 + amp_tm_hy_2 * tm_hr_2 \
+        out[4] = amp_tm_hy_1 * tm_hr_1 + amp_tm_hy_2 * tm_hr_2 \
                     + amp_te_hy_1 * te_hr_1 + amp_te_hy_2 * te_hr_2
-        ans["h_z"] = amp_te_hz * te_hz
-        return ans
+        out[5] = amp_te_hz * te_hz
+        return add_direct_field(model, (1, 0, 0), out)
 
     @staticmethod
-    def hmdy(model, omega):
+    def hmdy(model, omega, out=None, sigma=None):
         """
 
         """
         y_base, wt0, wt1 = filters.load_hankel_filter(model.hankel_filter)
         model.filter_length = len(y_base)
         model.lambda_ = y_base / model.r
-        kernel = kernels.compute_kernel_hmd(model, omega)
-        ans = {}
-        tm_er_1 = np.dot(wt0, kernel[0] * model.lambda_) / model.r
-        tm_er_2 = np.dot(wt1, kernel[0]) / model.r
-        te_er_1 = np.dot(wt0, kernel[1] * model.lambda_) / model.r
-        te_er_2 = np.dot(wt1, kernel[1]) / model.r
-        tm_ez = np.dot(wt1, kernel[2] * model.lambda_**2) / model.r
-        tm_hr_1 = np.dot(wt0, kernel[3] * model.lambda_) / model.r
-        tm_hr_2 = np.dot(wt1, kernel[3]) / model.r
-        te_hr_1 = np.dot(wt0, kernel[4] * model.lambda_) / model.r
-        te_hr_2 = np.dot(wt1, kernel[4]) / model.r
-        te_hz = np.dot(wt1, kernel[5]* model.lambda_**2) / model.r
+        kernel = kernels.compute_kernel_hmd(model, omega, sigma)
+        out = field_buffer(out)
+        # 要求されていない成分 (emulate の components) の積和は省略する
+        tm_er_1 = tm_er_2 = te_er_1 = te_er_2 = tm_ez = 0
+        tm_hr_1 = tm_hr_2 = te_hr_1 = te_hr_2 = te_hz = 0
+        if is_requested(model, 'e_x', 'e_y'):
+            tm_er_1 = np.dot(wt0, kernel[0] * model.lambda_) / model.r
+            tm_er_2 = np.dot(wt1, kernel[0]) / model.r
+            te_er_1 = np.dot(wt0, kernel[1] * model.lambda_) / model.r
+            te_er_2 = np.dot(wt1, kernel[1]) / model.r
+        if is_requested(model, 'e_z'):
+            tm_ez = np.dot(wt1, kernel[2] * model.lambda_**2) / model.r
+        if is_requested(model, 'h_x', 'h_y'):
+            tm_hr_1 = np.dot(wt0, kernel[3] * model.lambda_) / model.r
+            tm_hr_2 = np.dot(wt1, kernel[3]) / model.r
+            te_hr_1 = np.dot(wt0, kernel[4] * model.lambda_) / model.r
+            te_hr_2 = np.dot(wt1, kernel[4]) / model.r
+        if is_requested(model, 'h_z'):
+            te_hz = np.dot(wt1, kernel[5] * model.lambda_**2) / model.r
 
         amp_tm_ex_1 = (model.ztilde * model.ytilde)[model.slayer - 1] \
                         * (model.rx - model.sx) ** 2 \
@@ -200,13 +288,13 @@ class HankelTransform:
                         * (model.rx - model.sx) * (model.ry - model.sy) \
                         / (2 * np.pi * model.ytilde[model.rlayer - 1] \
                             * model.r ** 3)
-        amp_te_ey_1 = model.ztilde[0,  model.slayer - 1] \
+        amp_te_ey_1 = model.ztilde[model.slayer - 1] \
                         * (model.rx - model.sx) * (model.ry - model.sy) \
                         / (4 * np.pi * model.r ** 2)
         amp_te_ey_2 = - model.ztilde[model.slayer - 1] \
                         * (model.rx - model.sx) * (model.ry - model.sy) \
                         / (2 * np.pi * model.r ** 3)
-        amp_tm_ez = -(model.ztilde * model.ytilde)[model.slayer - 1] \
+        amp_tm_ez = (model.ztilde * model.ytilde)[model.slayer - 1] \
                         * (model.rx - model.sx) \
                         / (4 * np.pi * model.ytilde[model.rlayer - 1] \
                             * model.r)
@@ -230,7 +318,7 @@ class HankelTransform:
                         / model.ztilde[model.rlayer - 1] \
                         * (model.ry - model.sy) ** 2 \
                         / (4 * np.pi * model.r ** 2)
-        amp_te_hy_2 = - model.ztilde[0,  model.slayer - 1] \
+        amp_te_hy_2 = - model.ztilde[model.slayer - 1] \
                         / model.ztilde[model.rlayer - 1] \
                         * (2 * (model.ry - model.sy) ** 2 / model.r ** 3 \
                             - 1 / model.r) / (4 * np.pi)
@@ -238,53 +326,53 @@ class HankelTransform:
                         / model.ztilde[model.rlayer - 1] \
                         * (model.ry - model.sy) / (4 * np.pi * model.r)
 
-        ans["e_x"] = amp_tm_ex_1 * tm_er_1 + amp_tm_ex_2 * tm_er_2 \
+        out[0] = amp_tm_ex_1 * tm_er_1 + amp_tm_ex_2 * tm_er_2 \
                         + amp_te_ex_1 * te_er_1 + amp_te_ex_2 * te_er_2
-        ans["e_y"] = amp_tm_ey_1 * tm_er_1 + amp_tm_ey_2 * tm_er_2 \
+        out[1] = amp_tm_ey_1 * tm_er_1 + amp_tm_ey_2 * tm_er_2 \
                         + amp_te_ey_1 * te_er_1 + amp_te_ey_2 * te_er_2
-        ans["e_z"] = amp_tm_ez * tm_ez
-        ans["h_x"] = amp_tm_hx_1 * tm_hr_1 + amp_tm_hx_2 * tm_hr_2 \
+        out[2] = amp_tm_ez * tm_ez
+        out[3] = amp_tm_hx_1 * tm_hr_1 + amp_tm_hx_2 * tm_hr_2 \
                         + amp_te_hx_1 * te_hr_1 + amp_te_hx_2 * te_hr_2
-        ans["h_y"] = amp_tm_hy_1 * tm_hr_1 + amp_tm_hy_2 * tm_hr_2 \
+        out[4] = amp_tm_hy_1 * tm_hr_1 + amp_tm_hy_2 * tm_hr_2 \
                         + amp_te_hy_1 * te_hr_1 + amp_te_hy_2 * te_hr_2
-        ans["h_z"] = amp_te_hz * te_hz
-        return ans
+        out[5] = amp_te_hz * te_hz
+        return add_direct_field(model, (0, 1, 0), out)
     
     @staticmethod
-    def ved(model, omega):
+    def ved(model, omega, out=None, sigma=None):
         """
 
         """
         y_base, wt0, wt1 = filters.load_hankel_filter(model.hankel_filter)
         model.filter_length = len(y_base)
         model.lambda_ = y_base / model.r
-        kernel = kernels.compute_kernel_ved(model, omega)
-        ans = {}
+        kernel = kernels.compute_kernel_ved(model, omega, sigma)
+        out = field_buffer(out)
         e_phai = np.dot(wt1, kernel[0] * model.lambda_ ** 2) / model.r
         e_z = np.dot(wt0, kernel[1] * model.lambda_ ** 3) / model.r
         h_r = np.dot(wt1, kernel[2] * model.lambda_ ** 2) / model.r
 
-        ans["e_x"] = -1 / (4 * np.pi * model.ytilde[model.rlayer - 1]) \
+        out[0] = -1 / (4 * np.pi * model.ytilde[model.rlayer - 1]) \
                     * model.cos_phi * e_phai
-        ans["e_y"] = -1 / (4 * np.pi * model.ytilde[model.rlayer - 1]) \
+        out[1] = -1 / (4 * np.pi * model.ytilde[model.rlayer - 1]) \
                     * model.sin_phi * e_phai
-        ans["e_z"] = 1 / (4 * np.pi * model.ytilde[model.rlayer - 1]) \
+        out[2] = 1 / (4 * np.pi * model.ytilde[model.rlayer - 1]) \
                     * e_z
-        ans["h_x"] = -1 / (4 * np.pi) * model.sin_phi * h_r
-        ans["h_y"] = -1 / (4 * np.pi) * model.cos_phi * h_r
-        ans["h_z"] = 0
-        return ans
+        out[3] = -1 / (4 * np.pi) * model.sin_phi * h_r
+        out[4] = -1 / (4 * np.pi) * model.cos_phi * h_r
+        out[5] = 0
+        return out
     
     @staticmethod
-    def hedx(model, omega):
+    def hedx(model, omega, out=None, sigma=None):
         """
 
         """
         y_base, wt0, wt1 = filters.load_hankel_filter(model.hankel_filter)
         model.filter_length = len(y_base)
         model.lambda_ = y_base / model.r
-        kernel = kernels.compute_kernel_hed(model, omega)
-        ans = {}
+        kernel = kernels.compute_kernel_hed(model, omega, sigma)
+        out = field_buffer(out)
         tm_er_1 = np.dot(wt0, kernel[0] * model.lambda_) / model.r
         tm_er_2 = np.dot(wt1, kernel[0]) / model.r
         te_er_1 = np.dot(wt0, kernel[1] * model.lambda_) / model.r
@@ -356,30 +444,30 @@ class HankelTransform:
                         / model.ztilde[model.rlayer - 1] \
                         * (model.ry - model.sy) / (4 * np.pi * model.r)
 
-        ans["e_x"] = amp_tm_ex_g_1 * tm_er_1 + amp_tm_ex_g_2 * tm_er_2 \
+        out[0] = amp_tm_ex_g_1 * tm_er_1 + amp_tm_ex_g_2 * tm_er_2 \
                         + amp_te_ex_g_1 * te_er_1 + amp_te_ex_g_2 * te_er_2 \
                         + amp_te_ex_line * te_er_1
-        ans["e_y"] = amp_tm_ey_g_1 * tm_er_1 + amp_tm_ey_g_2 * tm_er_2 \
+        out[1] = amp_tm_ey_g_1 * tm_er_1 + amp_tm_ey_g_2 * tm_er_2 \
                         + amp_te_ey_g_1 * te_er_1 + amp_te_ey_g_2 * te_er_2
-        ans["e_z"] = amp_tm_ez * tm_ez
-        ans["h_x"] = amp_tm_hx_g_1 * tm_hr_1 + amp_tm_hx_g_2 * tm_hr_2 \
+        out[2] = amp_tm_ez * tm_ez
+        out[3] = amp_tm_hx_g_1 * tm_hr_1 + amp_tm_hx_g_2 * tm_hr_2 \
                         + amp_te_hx_g_1 * te_hr_1 + amp_te_hx_g_2 * te_hr_2
-        ans["h_y"] = amp_tm_hy_g_1 * tm_hr_1 + amp_tm_hy_g_2 * tm_hr_2 \
+        out[4] = amp_tm_hy_g_1 * tm_hr_1 + amp_tm_hy_g_2 * tm_hr_2 \
                         + amp_te_hy_g_1 * te_hr_1 + amp_te_hy_g_2 * te_hr_2 \
                         + amp_te_hy_line * te_hr_1
-        ans["h_z"] = amp_te_hz_line * te_hz
-        return ans
+        out[5] = amp_te_hz_line * te_hz
+        return out
     
     @staticmethod
-    def hedy(model, omega):
+    def hedy(model, omega, out=None, sigma=None):
         """
 
         """
         y_base, wt0, wt1 = filters.load_hankel_filter(model.hankel_filter)
         model.filter_length = len(y_base)
         model.lambda_ = y_base / model.r
-        kernel = kernels.compute_kernel_hed(model, omega)
-        ans = {}
+        kernel = kernels.compute_kernel_hed(model, omega, sigma)
+        out = field_buffer(out)
         tm_er_1 = np.dot(wt0, kernel[0] * model.lambda_) / model.r
         tm_er_2 = np.dot(wt1, kernel[0]) / model.r
         te_er_1 = np.dot(wt0, kernel[1] * model.lambda_) / model.r
@@ -448,69 +536,69 @@ class HankelTransform:
                         / model.ztilde[model.rlayer - 1] \
                         * (model.rx - model.sx) / (4 * np.pi * model.r)
 
-        ans["e_x"] = amp_tm_ex_g_1 * tm_er_1 + amp_tm_ex_g_2 * tm_er_2 \
+        out[0] = amp_tm_ex_g_1 * tm_er_1 + amp_tm_ex_g_2 * tm_er_2 \
                         + amp_te_ex_g_1 * te_er_1 + amp_te_ex_g_2 * te_er_2
-        ans["e_y"] = amp_tm_ey_g_1 * tm_er_1 + amp_tm_ey_g_2 * tm_er_2 \
+        out[1] = amp_tm_ey_g_1 * tm_er_1 + amp_tm_ey_g_2 * tm_er_2 \
                         + amp_te_ey_g_1 * te_er_1 + amp_te_ey_g_2 * te_er_2 \
                         + amp_te_ey_line * te_er_1
-        ans["e_z"] = amp_tm_ez * tm_ez
-        ans["h_x"] = amp_tm_hx_g_1 * tm_hr_1 + amp_tm_hx_g_2 * tm_hr_2 \
+        out[2] = amp_tm_ez * tm_ez
+        out[3] = amp_tm_hx_g_1 * tm_hr_1 + amp_tm_hx_g_2 * tm_hr_2 \
                         + amp_te_hx_g_1 * te_hr_1 + amp_te_hx_g_2 * te_hr_2 \
                         + amp_te_hx_line * te_hr_1
-        ans["h_y"] = amp_tm_hy_g_1 * tm_hr_1 + amp_tm_hy_g_2 * tm_hr_2 \
+        out[4] = amp_tm_hy_g_1 * tm_hr_1 + amp_tm_hy_g_2 * tm_hr_2 \
                         + amp_te_hy_g_1 * te_hr_1 + amp_te_hy_g_2 * te_hr_2
-        ans["h_z"] = amp_te_hz_line * te_hz
-        return ans
+        out[5] = amp_te_hz_line * te_hz
+        return out
     
     @staticmethod
-    def circular_loop(model, omega):
+    def circular_loop(model, omega, out=None, sigma=None):
         """
 
         """
         y_base, wt0, wt1 = filters.load_hankel_filter(model.hankel_filter)
         model.filter_length = len(y_base)
         model.lambda_ = y_base / model.src.radius
-        kernel = kernels.compute_kernel_circular(model, omega)
-        ans = {}
+        kernel = kernels.compute_kernel_circular(model, omega, sigma)
+        out = field_buffer(out)
         e_phai = np.dot(wt1, kernel[0]) / model.src.radius
         h_r = np.dot(wt1, kernel[1]) / model.src.radius
         h_z = np.dot(wt1, kernel[2]) / model.src.radius
-        ans["e_x"] =  model.ztilde[model.slayer - 1] * model.src.radius\
+        out[0] =  model.ztilde[model.slayer - 1] * model.src.radius\
                         * model.sin_phi / 2 * e_phai
-        ans["e_y"] = -model.ztilde[model.slayer - 1] * model.src.radius\
+        out[1] = -model.ztilde[model.slayer - 1] * model.src.radius\
                         * model.cos_phi / 2 * e_phai
-        ans["e_z"] = 0
-        ans["h_x"] = -model.src.radius * model.ztilde[model.slayer - 1]\
+        out[2] = 0
+        out[3] = -model.src.radius * model.ztilde[model.slayer - 1]\
                         / model.ztilde[model.rlayer - 1] \
                         * model.cos_phi / 2 * h_r
-        ans["h_y"] = -model.src.radius * model.ztilde[model.slayer - 1]\
+        out[4] = -model.src.radius * model.ztilde[model.slayer - 1]\
                         / model.ztilde[model.rlayer - 1] \
                         * model.sin_phi / 2 * h_r
-        ans["h_z"] = model.src.radius * model.ztilde[model.slayer - 1] \
+        out[5] = model.src.radius * model.ztilde[model.slayer - 1] \
                         / model.ztilde[model.rlayer - 1] / 2 * h_z
-        return ans
+        return out
     
     @staticmethod
-    def coincident_loop(model, omega):
+    def coincident_loop(model, omega, out=None, sigma=None):
         """
 
         """
         y_base, wt0, wt1 = filters.load_hankel_filter(model.hankel_filter)
         model.filter_length = len(y_base)
         model.lambda_ = y_base / model.r
-        kernel = kernels.compute_kernel_coincident(model, omega)
-        ans = {}
+        kernel = kernels.compute_kernel_coincident(model, omega, sigma)
+        out = field_buffer(out)
         h_z_co = np.dot(wt1, kernel[0]) / model.src.radius
-        ans["e_x"] = 0
-        ans["e_y"] = 0
-        ans["e_z"] = 0
-        ans["h_x"] = 0
-        ans["h_y"] = 0
-        ans["h_z"] = (1 * np.pi * model.src.radius ** 2 * h_z_co)
-        return ans
+        out[0] = 0
+        out[1] = 0
+        out[2] = 0
+        out[3] = 0
+        out[4] = 0
+        out[5] = (1 * np.pi * model.src.radius ** 2 * h_z_co)
+        return out
     
     @staticmethod
-    def grounded_wire(model, omega):
+    def grounded_wire(model, omega, out=None, sigma=None):
         """
 
         """
@@ -522,7 +610,7 @@ class HankelTransform:
         kernel = np.zeros((6, model.filter_length, model.src.nsplit), dtype=complex)
         for i in range(model.src.nsplit):
             model.lambda_ = lambda_[:,i]
-            kernel[:,:,i] = kernels.compute_kernel_hed(model, omega)
+            kernel[:,:,i] = kernels.compute_kernel_hed(model, omega, sigma)
         model.lambda_ = lambda_
         tm_er_g_first = np.dot(wt1, kernel[0][:, 0]) / model.rn[0]
         tm_er_g_end = np.dot(wt1, kernel[0][:, model.src.nsplit - 1]) \
@@ -616,25 +704,25 @@ class HankelTransform:
                         / model.ztilde[model.rlayer - 1] \
                         * model.yy / model.rn * model.ds / (4*np.pi) \
                         ,te_hz_l.T)
-        ans = {}
-        ans["e_x"] = model.cos_theta * rot_ans["e_x"] - model.sin_theta * rot_ans["e_y"]
-        ans["e_y"] = model.cos_theta * rot_ans["e_y"] + model.sin_theta * rot_ans["e_x"]
-        ans["e_z"] = rot_ans["e_z"]
-        ans["h_x"] = model.cos_theta * rot_ans["h_x"] - model.sin_theta * rot_ans["h_y"]
-        ans["h_y"] = model.cos_theta * rot_ans["h_y"] + model.sin_theta * rot_ans["h_x"]
-        ans["h_z"] = rot_ans["h_z"]
-        return ans
+        out = field_buffer(out)
+        out[0] = model.cos_theta * rot_ans["e_x"] - model.sin_theta * rot_ans["e_y"]
+        out[1] = model.cos_theta * rot_ans["e_y"] + model.sin_theta * rot_ans["e_x"]
+        out[2] = rot_ans["e_z"]
+        out[3] = model.cos_theta * rot_ans["h_x"] - model.sin_theta * rot_ans["h_y"]
+        out[4] = model.cos_theta * rot_ans["h_y"] + model.sin_theta * rot_ans["h_x"]
+        out[5] = rot_ans["h_z"]
+        return out
     
     @staticmethod
-    def loop_source(model, omega):
+    def loop_source(model, omega, out=None, sigma=None):
         """
 
         """
         y_base, wt0, wt1 = filters.load_hankel_filter(model.hankel_filter)
         model.filter_length = len(y_base)
         model.lambda_ = y_base / model.r
-        kernel = kernels.compute_kernel_hed(model, omega)
-        ans = {}
+        kernel = kernels.compute_kernel_hed(model, omega, sigma)
+        out = field_buffer(out)
         te_ex_l = np.dot(wt0, kernel[1] * model.lambda_) / model.rn
         te_hy_l = np.dot(wt0, kernel[4] * model.lambda_) / model.rn
         te_hz_l = np.dot(wt1, kernel[5] * model.lambda_ ** 2) / model.rn
@@ -642,29 +730,29 @@ class HankelTransform:
         te_hy_line = model.ztilde[model.slayer - 1] \
                         / model.ztilde[model.rlayer - 1] / (4 * np.pi)
 
-        ans["e_x"] =  te_ex_line * model.ds \
+        out[0] =  te_ex_line * model.ds \
                         * np.dot(te_ex_l, np.ones((model.src.num_dipole,1)))
-        ans["e_y"] = 0
-        ans["e_z"] = 0
-        ans["h_x"] = 0
-        ans["h_y"] = te_hy_line * model.ds \
+        out[1] = 0
+        out[2] = 0
+        out[3] = 0
+        out[4] = te_hy_line * model.ds \
                         * np.dot(te_hy_l, np.ones((model.src.num_dipole,1)))
-        ans["h_z"] = np.dot(model.ztilde[model.slayer - 1] \
+        out[5] = np.dot(model.ztilde[model.slayer - 1] \
                         / model.ztilde[model.rlayer - 1] \
                         * model.yy / model.rn * model.ds / (4*np.pi) \
                         , te_hz_l.T)
-        return ans
+        return out
 
     @staticmethod
-    def x_line_source(model, omega):
+    def x_line_source(model, omega, out=None, sigma=None):
         """
 
         """
         y_base, wt0, wt1 = filters.load_hankel_filter(model.hankel_filter)
         model.filter_length = len(y_base)
         model.lambda_ = y_base / model.r
-        kernel = kernels.compute_kernel_hed(model, omega)
-        ans = {}
+        kernel = kernels.compute_kernel_hed(model, omega, sigma)
+        out = field_buffer(out)
         te_er_1 = np.dot(wt0, kernel[1] * model.lambda_) / model.r
         te_hr_1 = np.dot(wt0, kernel[4] * model.lambda_) / model.r
         te_hz = np.dot(wt1, kernel[5] * model.lambda_**2) / model.r
@@ -676,24 +764,24 @@ class HankelTransform:
                         / model.ztilde[model.rlayer - 1] \
                         * (model.ry - model.sy) / (4 * np.pi * model.r)
 
-        ans["e_x"] = model.ds * amp_te_ex_line * te_er_1
-        ans["e_y"] = 0
-        ans["e_z"] = 0
-        ans["h_x"] = 0
-        ans["h_y"] = model.ds * amp_te_hy_line * te_hr_1
-        ans["h_z"] = model.ds * amp_te_hz_line * te_hz
-        return ans
+        out[0] = model.ds * amp_te_ex_line * te_er_1
+        out[1] = 0
+        out[2] = 0
+        out[3] = 0
+        out[4] = model.ds * amp_te_hy_line * te_hr_1
+        out[5] = model.ds * amp_te_hz_line * te_hz
+        return out
 
     @staticmethod
-    def y_line_source(model, omega):
+    def y_line_source(model, omega, out=None, sigma=None):
         """
 
         """
         y_base, wt0, wt1 = filters.load_hankel_filter(model.hankel_filter)
         model.filter_length = len(y_base)
         model.lambda_ = y_base / model.r
-        kernel = kernels.compute_kernel_hed(model, omega)
-        ans = {}
+        kernel = kernels.compute_kernel_hed(model, omega, sigma)
+        out = field_buffer(out)
         te_er_1 = np.dot(wt0, kernel[1] * model.lambda_) / model.r
         te_hr_1 = np.dot(wt0, kernel[4] * model.lambda_) / model.r
         te_hz = np.dot(wt1, kernel[5] * model.lambda_ ** 2) / model.r
@@ -704,78 +792,216 @@ class HankelTransform:
         amp_te_hz_line = - model.ztilde[model.slayer - 1] \
                         / model.ztilde[model.rlayer - 1] \
                         * (model.rx - model.sx) / (4 * np.pi * model.r)
-        ans["e_x"] = 0
-        ans["e_y"] = model.ds * amp_te_ey_line * te_er_1
-        ans["e_z"] = 0
-        ans["h_x"] = model.ds * amp_te_hx_line * te_hr_1
-        ans["h_y"] = 0
-        ans["h_z"] = model.ds * amp_te_hz_line * te_hz
-        return ans
+        out[0] = 0
+        out[1] = model.ds * amp_te_ey_line * te_er_1
+        out[2] = 0
+        out[3] = model.ds * amp_te_hx_line * te_hr_1
+        out[4] = 0
+        out[5] = model.ds * amp_te_hz_line * te_hz
+        return out
 
 class FourierTransform:
     @staticmethod
-    def euler_transform(model, time):
+    def euler_transform(model, time, time_diff):
         """
         フーリエ変換のデジタルフィルタでオイラーのフィルタを用いた変換。
-        時間微分でないものは後々実装予定。
+        フィルタ (raito_time_250) は次数 ∓1/2 の Hankel 変換として
+        余弦・正弦変換を与える。
+            ∫ F(ω) cos(ωt) dω = √(π/2) Σ F(b/t) √b wt0 / t
+            ∫ F(ω) sin(ωt) dω = √(π/2) Σ F(b/t) √b wt1 / t
+        全時間ゲートの角周波数 (len(time), 250) の応答を一度に計算する。
+        time_diff = False : ステップ (遮断) 応答 (余弦変換)
+        time_diff = True  : インパルス応答 (正弦変換)
+        return : ndarray (len(time), 6)
         """
-        ans = {}
         y_base_time, wt0_time, wt1_time = filters.load_fft_filter(
                                             'raito_time_250')
-        filter_length_time = len(y_base_time)
-        e_x_set = np.zeros((filter_length_time, 1), dtype=complex)
-        e_y_set = np.zeros((filter_length_time, 1), dtype=complex)
-        e_z_set = np.zeros((filter_length_time, 1), dtype=complex)
-        h_x_set = np.zeros((filter_length_time, 1), dtype=complex)
-        h_y_set = np.zeros((filter_length_time, 1), dtype=complex)
-        h_z_set = np.zeros((filter_length_time, 1), dtype=complex)
-        time_range = time - model.src.freqtime[0]
-        omega_set = y_base_time / time_range
-        for ii in range(filter_length_time):
-            omega = omega_set[ii]
-            hankel_result = model.src.hankel_transform(model, omega)
-            e_x_set[ii] = hankel_result["e_x"]
-            e_y_set[ii] = hankel_result["e_y"]
-            e_z_set[ii] = hankel_result["e_z"]
-            h_x_set[ii] = hankel_result["h_x"]
-            h_y_set[ii] = hankel_result["h_y"]
-            h_z_set[ii] = hankel_result["h_z"]
-
-        ans["e_x"] = -np.dot(wt1_time.T, np.imag(e_x_set)) \
-                        * (2.0 * time_range / np.pi) ** 0.5 / time_range
-        ans["e_y"] = -np.dot(wt1_time.T, np.imag(e_y_set)) \
-                        * (2.0 * time_range / np.pi) ** 0.5 / time_range
-        ans["e_z"] = -np.dot(wt1_time.T, np.imag(e_z_set)) \
-                        * (2.0 * time_range / np.pi) ** 0.5 / time_range
-        ans["h_x"] = -np.dot(wt1_time.T, np.imag(h_x_set)) \
-                        * (2.0 * time_range / np.pi) ** 0.5 / time_range
-        ans["h_y"] = -np.dot(wt1_time.T, np.imag(h_y_set)) \
-                        * (2.0 * time_range / np.pi) ** 0.5 / time_range
-        ans["h_z"] = -np.dot(wt1_time.T, np.imag(h_z_set)) \
-                        * (2.0 * time_range / np.pi) ** 0.5 / time_range
+        y_base_time = np.asarray(y_base_time)
+        time = np.atleast_1d(time)
+        omega_set = y_base_time[None, :] / time[:, None]
+        freq_ans = model.src.frequency_response(model, omega_set.ravel())
+        freq_ans = freq_ans.reshape(len(time), len(y_base_time), 6)
+
+        if not time_diff:
+            # -2/π ∫ Im(F)/ω cos(ωt) dω
+            weight = -(2 / np.pi) ** 0.5 \
+                        * np.asarray(wt0_time) / y_base_time ** 0.5
+            weight = weight[None, :] * np.ones((len(time), 1))
+        else:
+            # 2/π ∫ Im(F) sin(ωt) dω
+            weight = (2 / np.pi) ** 0.5 \
+                        * np.asarray(wt1_time) * y_base_time ** 0.5
+            weight = weight[None, :] / time[:, None]
+        ans = np.einsum('tb,tbc->tc', weight, np.imag(freq_ans))
         return ans
 
     @staticmethod
-    def fast_fourier_transform(model, f, time, time_diff):
+    def fft_sampling(model, time):
+        """
+        FFT で周波数応答を計算する角周波数。
+        フィルタが時間ゲート全体で必要とする範囲 base / time と
+        Hankel変換フィルタの帯域の共通部分を、対数等間隔に
+        1桁あたり model.fft_freqs_per_decade 点で分割する。
+        """
+        base, _, _ = filters.load_fft_filter(model.fft_filter)
+        base = np.asarray(base)
+        time = np.atleast_1d(time)
+        band = FFT_FREQ_BAND.get(model.hankel_filter, FFT_FREQ_BAND_DEFAULT)
+        omega_min = max(base.min() / time.max(), 2 * np.pi * band[0])
+        omega_max = min(base.max() / time.min(), 2 * np.pi * band[1])
+        if not omega_min < omega_max:
+            raise Exception('TimeRangeError: time gates are out of the frequency band.')
+        decades = np.log10(omega_max / omega_min)
+        num = max(int(np.ceil(decades * model.fft_freqs_per_decade)) + 1, 4)
+        return np.logspace(np.log10(omega_min), np.log10(omega_max), num)
+
+    @staticmethod
+    def fft_weight(fft_filter, omega, time, time_diff):
+        """
+        全時間ゲートの角周波数 (len(time), len(base)) と、
+        Im(F) に掛ける正弦・余弦変換の重み
+        サンプリング帯域 omega の外側では、低周波側は Im(F) ∝ ω、
+        高周波側は Im(F) = 0 とする。
+        """
+        base, cos, sin = filters.load_fft_filter(fft_filter)
+        base = np.asarray(base)
+        omega_base = base[None, :] / time[:, None]
+        if not time_diff:
+            weight = -2 / np.pi * np.asarray(cos)[None, :] / omega_base
+        else:
+            weight = 2 / np.pi * np.asarray(sin)[None, :] * np.ones_like(omega_base)
+        weight = weight / time[:, None]
+        weight = np.where(
+                    omega_base < omega[0], weight * omega_base / omega[0], weight)
+        weight[omega_base > omega[-1]] = 0
+        return omega_base, weight
+
+    @staticmethod
+    def fft_operator(fft_filter, omega, time, time_diff):
+        """
+        対数周波数の三次spline補間とフィルタの積和をまとめた線形演算子
+        K (len(time), len(omega)) : 時間領域応答 = K @ Im(F(omega))
+        時間ゲート・フィルタ・サンプリング周波数が同じなら再利用する。
+        """
+        key = (fft_filter, time_diff, time.tobytes(), omega.tobytes())
+        if key in _fft_operator_cache:
+            return _fft_operator_cache[key]
+
+        omega_base, weight = FourierTransform.fft_weight(
+                                fft_filter, omega, time, time_diff)
+        # 単位行列の spline 補間 = サンプル点の値に対する基底関数
+        log_omega = np.log(omega)
+        spline = interpolate.make_interp_spline(
+                    log_omega, np.eye(len(omega)), k=3)
+        operator = np.zeros((len(time), len(omega)))
+        for i in range(len(time)):
+            x = np.log(np.clip(omega_base[i], omega[0], omega[-1]))
+            operator[i] = np.dot(weight[i], spline(x))
+
+        if len(_fft_operator_cache) >= 32:
+            _fft_operator_cache.clear()
+        _fft_operator_cache[key] = operator
+        return operator
+
+    @staticmethod
+    def fast_fourier_transform(model, freq_ans, omega, time, time_diff):
         """
         フーリエ正弦・余弦変換による周波数→時間領域への変換。
-        (ただし、三次spline補間により計算時間を高速化)
-        f :  -
-            spline補間により得られた周波数領域における電磁応答の多項式近似
+        周波数応答の虚部を対数周波数で三次spline補間する。
+        (model.fft_log_magnitude = True の場合は log|Im(F)| を補間する)
+        freq_ans : ndarray (len(omega), 6)
+            fft_sampling の角周波数 omega における周波数領域の応答
+        time : array-like
+            時間ゲート
+        return : ndarray (len(time), 6)
         """
-        base, cos, sin = filters.load_fft_filter(
-                            'anderson_sin_cos_filter_787')
+        time = np.atleast_1d(time)
+        f_imag = np.imag(freq_ans)
+        ans = np.zeros((len(time), f_imag.shape[1]))
+
+        # 符号が一定の成分は log|Im(F)| を補間し、それ以外は Im(F) を補間する
+        logscale = np.zeros(f_imag.shape[1], dtype=bool)
+        if getattr(model, 'fft_log_magnitude', False):
+            sign = np.sign(f_imag[0])
+            logscale = np.all(f_imag * sign > 0, axis=0)
+
+        if np.any(logscale):
+            log_f = np.log(np.abs(f_imag[:, logscale]))
+            spline = interpolate.make_interp_spline(np.log(omega), log_f, k=3)
+            omega_base, weight = FourierTransform.fft_weight(
+                            model.fft_filter, omega, time, time_diff)
+            x = np.log(np.clip(omega_base, omega[0], omega[-1]))
+            f_base = sign[logscale] * np.exp(spline(x))
+            ans[:, logscale] = np.einsum('tb,tbc->tc', weight, f_base)
+        # 応答が 0 の成分 (components で指定されていない成分) は変換しない
+        linear = ~logscale & np.any(f_imag != 0, axis=0)
+        if np.any(linear):
+            operator = FourierTransform.fft_operator(
+                            model.fft_filter, omega, time, time_diff)
+            ans[:, linear] = np.dot(operator, f_imag[:, linear])
+        return ans
+
+    @staticmethod
+    def dlf_lagged_sampling(fft_filter, tmin, tmax):
+        """
+        遅延畳み込み (lagged convolution) による DLF の周波数と時間。
+        フィルタの横軸が対数等間隔 (間隔 Δ) であることを利用し、
+        時間を t_k = tmin exp(kΔ) (t_k >= tmax まで) にとると、
+        全ての時間の角周波数 b_j / t_k は len(base) + nlag - 1 点に収まる。
+        時間範囲・フィルタが同じなら再利用する。
+
+        return : omega (角周波数, 昇順), time_lag (時間, 昇順)
+        """
+        key = (fft_filter, float(tmin), float(tmax))
+        if key in _dlf_lagged_cache:
+            return _dlf_lagged_cache[key]
+
+        base, _, _ = filters.load_fft_filter(fft_filter)
+        log_base = np.log(np.asarray(base))
+        delta = np.diff(log_base)
+        if not np.allclose(delta, delta[0], rtol=1e-6):
+            raise Exception('lagged convolution requires a log-spaced filter')
+        delta = np.mean(delta)
+
+        nlag = int(np.ceil(np.log(tmax / tmin) / delta - 1e-9)) + 1
+        nlag = max(nlag, 4) # 時間領域の spline 補間に必要
+        time_lag = tmin * np.exp(np.arange(nlag) * delta)
+        # omega[m] = b_0 exp(mΔ) / t_(nlag-1)
+        nfreq = len(base) + nlag - 1
+        omega = np.exp(
+                    log_base[0] + np.arange(nfreq) * delta
+                ) / time_lag[-1]
 
+        if len(_dlf_lagged_cache) >= 32:
+            _dlf_lagged_cache.clear()
+        _dlf_lagged_cache[key] = (omega, time_lag)
+        return omega, time_lag
+
+    @staticmethod
+    def dlf_lagged_transform(fft_filter, freq_ans, omega, time_lag, time_diff=False):
+        """
+        dlf_lagged_sampling の周波数における応答 freq_ans を時間領域へ変換する。
+        time_diff = False : ステップ (遮断) 応答 -2/π ∫ Im(F)/ω cos(ωt) dω
+        time_diff = True  : インパルス応答       2/π ∫ Im(F) sin(ωt) dω
+
+        freq_ans : ndarray (len(omega), ...)
+        return : ndarray (len(time_lag), ...)
+        """
+        base, cos, sin = filters.load_fft_filter(fft_filter)
+        nbase = len(base)
+        nlag = len(time_lag)
+        freq_ans = np.asarray(freq_ans)
         if not time_diff:
-            omega_base = base / time
-            f = f(omega_base)
-            f_imag =  -2 / np.pi * np.imag(f) / omega_base
-            ans = np.dot(f_imag, cos.T) / time
+            f_imag = -2 / np.pi * np.imag(freq_ans) \
+                        / omega.reshape((-1,) + (1,) * (freq_ans.ndim - 1))
+            weight = np.asarray(cos)
         else:
-            omega_base = base / time
-            f = f(omega_base)
-            f_imag = 2 / np.pi * np.imag(f)
-            ans = np.dot(f_imag, sin.T) / time
+            f_imag = 2 / np.pi * np.imag(freq_ans)
+            weight = np.asarray(sin)
+        # t_k の角周波数 b_j / t_k は omega[j + nlag - 1 - k]
+        index = np.arange(nbase)[None, :] + (nlag - 1 - np.arange(nlag))[:, None]
+        ans = np.tensordot(weight, f_imag[index], axes=([0], [1]))
+        ans = ans / time_lag.reshape((-1,) + (1,) * (freq_ans.ndim - 1))
         return ans
 
     # TODO DLAG ！コードに無駄が多いので要修正　修正完了まで非推奨とする
@@ -835,7 +1061,7 @@ class FourierTransform:
                 g = y
 
                 hankel_result = model.src.hankel_transform(model, g) 
-                dwork[ir-1] = np.imag(hankel_result[emfield]) / g
+                dwork[ir-1] = np.imag(hankel_result[FIELDS.index(emfield)]) / g
                 nofun = np.fix(np.fix(nofun) + 1)
 
             c = dwork[ir-1] * cos[i-1]
@@ -909,7 +1135,7 @@ class FourierTransform:
                         key[ir-1] = iroll + ir
                         g = y
                         hankel_result = model.src.hankel_transform(model, g)
-                        dwork[ir-1] = np.imag(hankel_result[emfield]) / g
+                        dwork[ir-1] = np.imag(hankel_result[FIELDS.index(emfield)]) / g
                         nofun = np.fix(np.fix(nofun) + 1)
                     c = dwork[ir-1] * cos[i-1]
                     dsum = dsum + c
@@ -971,7 +1197,7 @@ class FourierTransform:
                 key[ir-1] = iroll + ir
                 g = y
                 hankel_result = model.src.hankel_transform(model, g)
-                dwork[ir-1] = np.imag(hankel_result[emfield])
+                dwork[ir-1] = np.imag(hankel_result[FIELDS.index(emfield)])
                 nofun = np.fix(np.fix(nofun) + 1)
 
             c = dwork[ir-1] * sin[i-1]
@@ -1046,7 +1272,7 @@ class FourierTransform:
                         key[ir-1] = iroll + ir
                         g = y
                         hankel_result = model.src.hankel_transform(model, g)
-                        dwork[ir-1] = np.imag(hankel_result[emfield])
+                        dwork[ir-1] = np.imag(hankel_result[FIELDS.index(emfield)])
                         nofun = np.fix(np.fix(nofun) + 1)
                     c = dwork[ir-1] * sin[i-1]
                     dsum = dsum + c
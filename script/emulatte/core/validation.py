@@ -0,0 +1,449 @@
+# Copyright 2021 Waseda Geophysics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# -*- coding: utf-8 -*-
+"""
+均質半無限媒質の解析解 (core.analytic) に対する精度と計算時間の検証
+
+地表の VMD, HMDx (offset 100 m) と円形ループ中心 (半径 10 m) について、
+周波数領域 (1 Hz ~ 100 kHz) と時間領域 (10 us ~ 10 ms, h と dh/dt) の応答を
+全ハンケル変換フィルタ x 全時間領域変換 (FFT, DLAG, EULER) で計算し、
+最大相対誤差をケース毎の要求精度 (ACCURACY) と比較する。
+(時間領域に使えないフィルタ filters.FREQUENCY_DOMAIN_ONLY は周波数領域のみ)
+KNOWN_FAILURES には対象外のケース (非推奨の DLAG) のみを理由と共に記す。
+emlayers, kernels, transform を変更した場合は実行して、
+精度と計算時間の悪化 (regression) がないことを確認すること。
+(tests/test_validation.py は一部のケースを pytest で確認する)
+
+    python -m emulatte.core.validation                  # 精度と計算時間の比較
+    python -m emulatte.core.validation --no-check-time  # 精度のみ比較する
+    python -m emulatte.core.validation --update         # 基準値の更新
+
+計算時間は計算機に依存するので、基準値 (filter_files/validation_baseline.py)
+に対する各ケースの時間比を全ケースの時間比の中央値 (計算機の速さ) で割った
+相対的な速さで比較し、--time-tolerance 倍 (既定 1.5) より遅いケースを
+失敗とする。(遅いケースは測り直してから判定する)
+誤差も基準値の --error-tolerance 倍 (既定 10) を超えると失敗とする。(DLAG の時間は dlagf0em/dlagf1em が返す時間で比較する)
+"""
+import argparse
+import fnmatch
+import os
+import sys
+import time as _time
+import numpy as np
+
+from . import analytic, emlayers, emsource, filters
+
+SIGMA = 0.01
+OFFSET = 100
+RADIUS = 10
+FREQS = np.logspace(0, 5, 11)
+TIMES = np.logspace(-5, -2, 16)
+SOURCES = ['vmd', 'hmd', 'loop']
+TD_TRANSFORMS = ['FFT', 'DLAG', 'EULER']
+HANKEL_FILTERS = [name for name, _ in filters.HANKEL_FILTER_COST]
+
+# 要求精度 (解析解に対する最大相対誤差)
+# {(時間領域変換, 'h' or 'dhdt') : 精度} (周波数領域は ('FD', None))
+ACCURACY = {
+    ('FD', None): 1e-5,
+    ('FFT', 'h'): 2e-3,
+    ('FFT', 'dhdt'): 1e-2,
+    ('DLAG', 'h'): 1e-3,
+    ('DLAG', 'dhdt'): 1e-3,
+    ('EULER', 'h'): 1e-3,
+    ('EULER', 'dhdt'): 1e-5,
+}
+# td_transform='FFT' の設定
+# (既定の anderson_sin_cos_filter_787 は dh/dt でフィルタ自体の誤差が 2-8 %,
+#  既定の Im(F) の線形補間では 10 点/桁で h の誤差が 4e-3 程度になる)
+FFT_OPTIONS = {
+    'fft_filter': 'key_time_201',
+    'fft_freqs_per_decade': 20,
+}
+# フィルタ長の短いフィルタの周波数領域の要求精度
+FILTER_ACCURACY = {
+    'mizunaga90': 1e-3,
+}
+
+# 要求精度を満たさない既知のケース (case_name の fnmatch パターン, 理由)
+KNOWN_FAILURES = [
+    ('*/DLAG/*',
+     'DLAG is deprecated until it is fixed (TODO in core.transform); '
+     'it returns ~1e-5 of the reference'),
+]
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    'filter_files', 'validation_baseline.py')
+
+
+def case_name(source, hankel_filter, td_transform=None, time_diff=False):
+    """
+    'vmd/FD/werthmuller201', 'loop/EULER/dhdt/key201' など
+    """
+    if td_transform is None:
+        return '/'.join([source, 'FD', hankel_filter])
+    field = 'dhdt' if time_diff else 'h'
+    return '/'.join([source, td_transform, field, hankel_filter])
+
+
+def parse_case(name):
+    """
+    case_name の逆 : (source, hankel_filter, td_transform, time_diff)
+    """
+    parts = name.split('/')
+    if parts[1] == 'FD':
+        return parts[0], parts[2], None, False
+    return parts[0], parts[3], parts[1], parts[2] == 'dhdt'
+
+
+def case_names(hankel_filters=None, td_transforms=None, sources=None):
+    """
+    run() で計算するケースの名前
+    """
+    if hankel_filters is None:
+        hankel_filters = HANKEL_FILTERS
+    if td_transforms is None:
+        td_transforms = TD_TRANSFORMS
+    if sources is None:
+        sources = SOURCES
+    names = []
+    for source in sources:
+        for hankel_filter in hankel_filters:
+            names.append(case_name(source, hankel_filter))
+            if hankel_filter in filters.FREQUENCY_DOMAIN_ONLY:
+                continue
+            for td_transform in td_transforms:
+                for time_diff in [False, True]:
+                    names.append(case_name(
+                        source, hankel_filter, td_transform, time_diff))
+    return names
+
+
+def accuracy(name):
+    """
+    ケースの要求精度 (最大相対誤差)
+    """
+    source, hankel_filter, td_transform, time_diff = parse_case(name)
+    if td_transform is None:
+        return FILTER_ACCURACY.get(hankel_filter, ACCURACY['FD', None])
+    return ACCURACY[td_transform, 'dhdt' if time_diff else 'h']
+
+
+def known_failure(name):
+    """
+    要求精度を満たさない既知のケースならその理由, そうでなければ None
+    """
+    for pattern, reason in KNOWN_FAILURES:
+        if fnmatch.fnmatchcase(name, pattern):
+            return reason
+    return None
+
+
+def _setup(source, freqtime):
+    model = emlayers.Subsurface1D([])
+    model.set_properties(res=[2e14, 1 / SIGMA])
+    if source == 'vmd':
+        src = emsource.VMD(freqtime, moment=1)
+        rc = [OFFSET, 0, 0]
+    elif source == 'hmd':
+        src = emsource.HMDx(freqtime, moment=1)
+        rc = [OFFSET, 0, 0]
+    elif source == 'loop':
+        src = emsource.CircularLoop(freqtime, current=1, radius=RADIUS, turns=1)
+        rc = [0, 0, 0]
+    else:
+        raise NameError('invalid source name')
+    model.locate(src, [0, 0, 0], rc)
+    return model
+
+
+def _reference(source, freqtime, td_transform, time_diff):
+    """
+    比較する成分と解析解 {component : ndarray}
+    """
+    if td_transform is None:
+        omega = 2 * np.pi * freqtime
+        if source == 'vmd':
+            h_z, h_r = analytic.halfspace_vmd(OFFSET, omega, SIGMA)
+            return {'h_z': h_z, 'h_x': h_r}
+        elif source == 'hmd':
+            return {'h_z': analytic.halfspace_hmd(OFFSET, 0, omega, SIGMA)}
+        else:
+            return {'h_z': analytic.halfspace_loop(RADIUS, omega, SIGMA)}
+    if source == 'vmd':
+        h_z, dh_z, h_r, dh_r = analytic.halfspace_vmd_step(
+            OFFSET, freqtime, SIGMA)
+        if time_diff:
+            return {'h_z': dh_z, 'h_x': dh_r}
+        return {'h_z': h_z, 'h_x': h_r}
+    elif source == 'hmd':
+        h_z, dh_z = analytic.halfspace_hmd_step(OFFSET, 0, freqtime, SIGMA)
+    else:
+        h_z, dh_z = analytic.halfspace_loop_step(RADIUS, freqtime, SIGMA)
+    return {'h_z': dh_z if time_diff else h_z}
+
+
+def run_case(source, hankel_filter, td_transform=None, time_diff=False,
+             repeat=3, min_time=0.2):
+    """
+    1ケースの最大相対誤差と計算時間 (s)
+    時間は repeat 回以上、合計 min_time 秒以上繰り返した最小値
+    (計算時間の短いケースほど多く繰り返して揺らぎを抑える)
+
+    return : float, float
+        max(|emulatte - 解析解| / |解析解|), 時間
+    """
+    freqtime = FREQS if td_transform is None else TIMES
+    components = list(_reference(source, freqtime, None, False).keys())
+    options = FFT_OPTIONS if td_transform == 'FFT' else {}
+    elapsed = np.inf
+    count = total = 0
+    while (count < repeat) or (total < min_time):
+        # reflection_cache を使わない時間を測るため毎回 model を作り直す
+        model = _setup(source, freqtime)
+        start = _time.perf_counter()
+        ans = model.emulate(
+            hankel_filter, ignore_displacement_current=True,
+            time_diff=time_diff, td_transform=td_transform,
+            components=components, **options)
+        lap = _time.perf_counter() - start
+        elapsed = min(elapsed, lap)
+        count += 1
+        total += lap
+    if td_transform == 'DLAG':
+        ans, freqtime = ans
+    reference = _reference(source, freqtime, td_transform, time_diff)
+    error = 0
+    for component, ref in reference.items():
+        value = ans[component]
+        if td_transform is not None:
+            value = np.real(value)
+        error = max(error, np.max(np.abs(value - ref) / np.abs(ref)))
+    return float(error), float(elapsed)
+
+
+def run(hankel_filters=None, td_transforms=None, sources=None, repeat=3):
+    """
+    全ケースを計算する
+    計算時間は全ケースを repeat 回巡回して測った最小値
+    (計算機の負荷の揺らぎが特定のケースに偏らないようにする)
+
+    return : dict
+        {case_name : (error, time)}
+    """
+    names = case_names(hankel_filters, td_transforms, sources)
+    results = {}
+    for _ in range(repeat):
+        for name in names:
+            error, elapsed = run_case(*parse_case(name), repeat=1)
+            if name in results:
+                elapsed = min(elapsed, results[name][1])
+            results[name] = (error, elapsed)
+    return results
+
+
+def load_baseline(path=None):
+    """
+    基準値 {case_name : (error, time)} を読み込む (ファイルがなければ {})
+    """
+    if path is None:
+        path = BASELINE_PATH
+    if not os.path.exists(path):
+        return {}
+    namespace = {}
+    with open(path) as f:
+        exec(f.read(), namespace)
+    return {name: tuple(value) for name, value in namespace['baseline'].items()}
+
+
+_LICENSE = [
+    '# Copyright 2021 Waseda Geophysics Laboratory',
+    '#',
+    '# Licensed under the Apache License, Version 2.0 (the "License");',
+    '# you may not use this file except in compliance with the License.',
+    '# You may obtain a copy of the License at',
+    '#',
+    '# http://www.apache.org/licenses/LICENSE-2.0',
+    '#',
+    '# Unless required by applicable law or agreed to in writing, software',
+    '# distributed under the License is distributed on an "AS IS" BASIS,',
+    '# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.',
+    '# See the License for the specific language governing permissions and',
+    '# limitations under the License.',
+]
+
+
+def write_baseline(results, path=None):
+    """
+    run() の結果を基準値として書き出す
+    """
+    if path is None:
+        path = BASELINE_PATH
+    lines = _LICENSE + [
+        '"""',
+        'Accuracy and timing baseline of core.validation',
+        '(relative error against core.analytic, best time in seconds).',
+        'The times are compared relative to each other (core.validation.slow_cases)',
+        'and the errors against themselves (core.validation.worse_cases);',
+        'core.validation.ACCURACY gives the required accuracy of each case.',
+        '',
+        'Generated by python -m emulatte.core.validation --update',
+        '"""',
+        '',
+        'baseline = {',
+    ]
+    for name, (error, elapsed) in results.items():
+        lines.append("    '{}' : ({:.3e}, {:.3e}),".format(name, error, elapsed))
+    lines.append('}')
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def failures(results):
+    """
+    要求精度を満たさないケース
+
+    return : dict
+        {case_name : 'fail' (regression) or 'known' (KNOWN_FAILURES)
+         or 'xpass' (KNOWN_FAILURES だが要求精度を満たす)}
+    """
+    flagged = {}
+    for name, (error, _) in results.items():
+        passed = error <= accuracy(name)
+        known = known_failure(name) is not None
+        if not passed:
+            flagged[name] = 'known' if known else 'fail'
+        elif known:
+            flagged[name] = 'xpass'
+    return flagged
+
+
+def relative_speed(results, baseline):
+    """
+    各ケースの計算時間の基準値に対する比を、全ケースの比の中央値で
+    割ったもの (1 より大きいほど他のケースに比べて遅くなった)
+    基準値にないケースは含まない。
+
+    return : dict
+        {case_name : float}
+    """
+    ratios = {name: elapsed / baseline[name][1]
+              for name, (_, elapsed) in results.items() if name in baseline}
+    if not ratios:
+        return {}
+    machine = np.median(list(ratios.values()))
+    return {name: ratio / machine for name, ratio in ratios.items()}
+
+
+def slow_cases(results, baseline, factor=1.5, floor=1e-3):
+    """
+    相対的な速さ (relative_speed) が factor 倍より遅いケース
+    (時間の差が floor 秒以下のケースは除く)
+    """
+    speed = relative_speed(results, baseline)
+    return [name for name, ratio in speed.items()
+            if (ratio > factor)
+            and (results[name][1] - baseline[name][1] > floor)]
+
+
+def worse_cases(results, baseline, factor=10, floor=1e-12):
+    """
+    誤差が基準値の factor 倍より大きくなったケース
+    (要求精度以下でも精度の悪化とする。誤差が floor 以下のケースは除く)
+    """
+    return [name for name, (error, _) in results.items()
+            if (name in baseline) and (error > floor)
+            and (error > factor * baseline[name][0])]
+
+
+def report(results, baseline=None, flagged=None, slow=(), worse=()):
+    """
+    結果の表 (str)
+    """
+    if baseline is None:
+        baseline = {}
+    if flagged is None:
+        flagged = failures(results)
+    speed = relative_speed(results, baseline)
+    lines = ['{:<36} {:>10} {:>10} {:>10} {:>8}  {}'.format(
+        'case', 'error', 'required', 'time [s]', 'speed', 'status')]
+    for name, (error, elapsed) in results.items():
+        status = [flagged.get(name, 'ok')]
+        if name in worse:
+            status.append('worse')
+        if name in slow:
+            status.append('slow')
+        lines.append('{:<36} {:>10.2e} {:>10.0e} {:>10.4f} {:>8.2f}  {}'.format(
+            name, error, accuracy(name), elapsed, speed.get(name, np.nan),
+            ','.join(status)))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='emulatte accuracy and speed against analytic half-space solutions')
+    parser.add_argument('--update', action='store_true',
+                        help='write the results as the new timing baseline')
+    parser.add_argument('--error-tolerance', type=float, default=10,
+                        help='fail on cases whose error exceeds the baseline error '
+                             'by this factor (default: 10)')
+    parser.add_argument('--no-check-time', action='store_true',
+                        help='do not fail on cases slower than the baseline')
+    parser.add_argument('--time-tolerance', type=float, default=1.5,
+                        help='fail on cases slower than the baseline by this factor '
+                             'relative to the others (default: 1.5)')
+    parser.add_argument('--baseline', default=None,
+                        help='baseline file (default: filter_files/validation_baseline.py)')
+    parser.add_argument('--filters', nargs='+', default=None,
+                        help='hankel filters (default: all)')
+    parser.add_argument('--td-transforms', nargs='+', default=None,
+                        help='FFT, DLAG, EULER (default: all)')
+    parser.add_argument('--sources', nargs='+', default=None,
+                        help='vmd, hmd, loop (default: all)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    results = run(args.filters, args.td_transforms, args.sources, args.repeat)
+    baseline = load_baseline(args.baseline)
+    flagged = failures(results)
+    slow = slow_cases(results, baseline, args.time_tolerance)
+    if slow and not (args.update or args.no_check_time):
+        # 遅いケースは測り直し、短い時間の揺らぎでは失敗としない
+        for _ in range(args.repeat):
+            for name in slow:
+                _, elapsed = run_case(*parse_case(name), repeat=1)
+                results[name] = (results[name][0], min(results[name][1], elapsed))
+        slow = slow_cases(results, baseline, args.time_tolerance)
+    worse = worse_cases(results, baseline, args.error_tolerance)
+    print(report(results, baseline, flagged, slow, worse))
+    for name, status in flagged.items():
+        if status != 'fail':
+            print('{} ({}): {}'.format(name, status, known_failure(name)))
+    if args.update:
+        write_baseline(results, args.baseline)
+        return 0
+    failed = [name for name, status in flagged.items() if status == 'fail']
+    failed += [name for name in worse if name not in failed]
+    if not args.no_check_time:
+        failed += [name for name in slow if name not in failed]
+    if failed:
+        print('\n{} regression(s)'.format(len(failed)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,707 @@
+# Copyright 2021 Waseda Geophysics Laboratory
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+# http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Relative error of the Hankel transform filters against the half-space
+VMD response used by hankel_filter='auto'.
+
+VMD source and receiver at the same height above a homogeneous
+half-space (sigma = 0.01 S/m, displacement current ignored).
+height_ratio = (h_s + h_r) / r; 0 is the surface (core.analytic.halfspace_vmd),
+> 0 is airborne (core.analytic.halfspace_vmd_airborne, quadrature).
+log10_error[name][k][i][j] = log10(max(|dh_z|, |dh_r|) / |h_z|)
+at height_ratio[k], offset r[i] (m) and induction number induction_number[j].
+
+For coplanar source and receiver the direct term of the kernel is barely
+damped (emulate separates them by 1e-8 m, 1e-4 m for anderson801).
+Filters with a wide abscissa range (key201, kong241) cannot integrate it,
+which sets their error floor (key201: 25 % in h_r) at every height;
+their coefficients agree with Key (2012) and Kong (2007).
+
+Generated by core.filters.write_hankel_accuracy_table().
+"""
+
+height_ratio = [0, 0.01, 0.1, 1, 10]
+
+r = [1, 10, 100, 1000]
+
+induction_number = [
+        1.0000e-02, 1.5849e-02, 2.5119e-02, 3.9811e-02, 6.3096e-02, 1.0000e-01,
+        1.5849e-01, 2.5119e-01, 3.9811e-01, 6.3096e-01, 1.0000e+00, 1.5849e+00,
+        2.5119e+00, 3.9811e+00, 6.3096e+00, 1.0000e+01, 1.5849e+01, 2.5119e+01,
+        3.9811e+01, 6.3096e+01, 1.0000e+02, 1.5849e+02, 2.5119e+02, 3.9811e+02,
+        6.3096e+02, 1.0000e+03,
+]
+
+log10_error = {
+    'mizunaga90' : [
+        [
+            [
+                -6.74, -6.25, -5.82, -5.45, -5.12, -4.89, -4.83, -4.91,
+                -5.12, -5.52, -6.14, -7.01, -7.68, -7.67, -7.09, -6.44,
+                -6.08, -5.68, -5.28, -4.88, -4.48, -4.08, -3.68, -3.28,
+                -2.88, -2.48,
+            ],
+            [
+                -6.74, -6.25, -5.82, -5.45, -5.12, -4.89, -4.83, -4.91,
+                -5.12, -5.52, -6.14, -7.02, -8.10, -8.68, -8.09, -7.44,
+                -7.08, -6.68, -6.28, -5.88, -5.48, -5.08, -4.68, -4.28,
+                -3.88, -3.48,
+            ],
+            [
+                -6.74, -6.25, -5.82, -5.45, -5.12, -4.89, -4.83, -4.91,
+                -5.12, -5.52, -6.14, -7.02, -8.14, -9.31, -9.09, -8.45,
+                -8.09, -7.69, -7.29, -6.89, -6.49, -6.09, -5.69, -5.29,
+                -4.90, -4.50,
+            ],
+            [
+                -6.74, -6.25, -5.82, -5.45, -5.12, -4.89, -4.83, -4.91,
+                -5.12, -5.52, -6.14, -7.02, -8.14, -9.43, -10.10, -9.54,
+                -9.19, -8.78, -8.39, -8.01, -7.65, -7.27, -6.89, -6.50,
+                -6.11, -5.71,
+            ],
+        ],
+        [
+            [
+                -6.74, -6.25, -5.82, -5.45, -5.12, -4.89, -4.83, -4.91,
+                -5.12, -5.52, -6.14, -7.02, -7.67, -7.68, -7.11, -6.48,
+                -6.13, -5.75, -5.40, -5.07, -4.77, -4.52, -4.32, -4.17,
+                -4.07, -4.00,
+            ],
+            [
+                -6.74, -6.25, -5.82, -5.45, -5.12, -4.89, -4.83, -4.91,
+                -5.12, -5.52, -6.14, -7.02, -8.11, -8.69, -8.11, -7.48,
+                -7.13, -6.76, -6.40, -6.07, -5.77, -5.52, -5.32, -5.17,
+                -5.07, -5.00,
+            ],
+            [
+                -6.74, -6.25, -5.82, -5.45, -5.12, -4.89, -4.83, -4.91,
+                -5.12, -5.52, -6.14, -7.02, -8.14, -9.32, -9.11, -8.49,
+                -8.14, -7.76, -7.41, -7.08, -6.78, -6.53, -6.33, -6.19,
+                -6.09, -6.01,
+            ],
+            [
+                -6.74, -6.25, -5.82, -5.45, -5.12, -4.89, -4.83, -4.91,
+                -5.12, -5.52, -6.14, -7.02, -8.15, -9.44, -10.12, -9.58,
+                -9.23, -8.86, -8.52, -8.19, -7.94, -7.70, -7.55, -7.53,
+                -7.48, -7.40,
+            ],
+        ],
+        [
+            [
+                -6.74, -6.25, -5.82, -5.45, -5.12, -4.90, -4.83, -4.91,
+                -5.13, -5.53, -6.16, -7.05, -7.66, -7.77, -7.28, -6.79,
+                -6.53, -6.33, -6.18, -6.08, -6.01, -5.96, -5.93, -5.91,
+                -5.90, -5.89,
+            ],
+            [
+                -6.74, -6.25, -5.82, -5.45, -5.12, -4.90, -4.83, -4.91,
+                -5.13, -5.53, -6.16, -7.06, -8.15, -8.80, -8.28, -7.79,
+                -7.54, -7.33, -7.18, -7.08, -7.01, -6.96, -6.93, -6.91,
+                -6.90, -6.90,
+            ],
+            [
+                -6.74, -6.25, -5.82, -5.45, -5.12, -4.90, -4.83, -4.91,
+                -5.13, -5.53, -6.16, -7.06, -8.21, -9.48, -9.28, -8.80,
+                -8.54, -8.34, -8.19, -8.09, -8.02, -7.97, -7.94, -7.92,
+                -7.91, -7.90,
+            ],
+            [
+                -6.74, -6.25, -5.82, -5.45, -5.12, -4.90, -4.83, -4.91,
+                -5.13, -5.53, -6.16, -7.06, -8.21, -9.55, -10.32, -9.90,
+                -9.65, -9.44, -9.29, -9.19, -9.12, -9.07, -9.04, -9.02,
+                -9.01, -9.00,
+            ],
+        ],
+        [
+            [
+                -6.74, -6.25, -5.82, -5.46, -5.13, -4.91, -4.86, -4.96,
+                -5.22, -5.68, -6.39, -7.42, -7.61, -7.67, -7.70, -7.72,
+                -7.72, -7.73, -7.73, -7.73, -7.73, -7.73, -7.73, -7.73,
+                -7.73, -7.73,
+            ],
+            [
+                -6.74, -6.25, -5.82, -5.46, -5.13, -4.91, -4.86, -4.96,
+                -5.22, -5.68, -6.39, -7.43, -8.53, -8.67, -8.70, -8.72,
+                -8.73, -8.73, -8.73, -8.73, -8.73, -8.73, -8.73, -8.73,
+                -8.73, -8.73,
+            ],
+            [
+                -6.74, -6.25, -5.82, -5.46, -5.13, -4.91, -4.86, -4.96,
+                -5.22, -5.68, -6.39, -7.43, -8.81, -9.70, -9.73, -9.74,
+                -9.75, -9.75, -9.75, -9.75, -9.75, -9.76, -9.75, -9.76,
+                -9.75, -9.75,
+            ],
+            [
+                -6.74, -6.25, -5.82, -5.46, -5.13, -4.91, -4.86, -4.96,
+                -5.22, -5.68, -6.39, -7.43, -8.81, -10.63, -10.86, -10.88,
+                -10.90, -10.92, -10.92, -10.92, -10.93, -10.93, -10.93, -10.94,
+                -10.94, -10.94,
+            ],
+        ],
+        [
+            [
+                -6.76, -6.26, -5.85, -5.53, -5.25, -5.04, -5.06, -5.40,
+                -6.13, -7.17, -7.51, -7.51, -7.51, -7.52, -7.52, -7.52,
+                -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52,
+                -7.52, -7.52,
+            ],
+            [
+                -6.76, -6.26, -5.85, -5.53, -5.25, -5.04, -5.06, -5.40,
+                -6.13, -7.17, -8.29, -8.40, -8.43, -8.45, -8.46, -8.46,
+                -8.47, -8.47, -8.47, -8.47, -8.47, -8.47, -8.48, -8.48,
+                -8.48, -8.48,
+            ],
+            [
+                -6.76, -6.26, -5.85, -5.53, -5.25, -5.04, -5.06, -5.40,
+                -6.13, -7.17, -8.43, -8.77, -8.94, -9.04, -9.09, -9.13,
+                -9.15, -9.16, -9.17, -9.18, -9.18, -9.18, -9.18, -9.18,
+                -9.19, -9.19,
+            ],
+            [
+                -6.76, -6.26, -5.85, -5.53, -5.25, -5.04, -5.06, -5.40,
+                -6.13, -7.17, -8.44, -8.79, -9.03, -9.17, -9.26, -9.32,
+                -9.36, -9.38, -9.39, -9.40, -9.41, -9.41, -9.41, -9.41,
+                -9.42, -9.42,
+            ],
+        ],
+    ],
+    'werthmuller201' : [
+        [
+            [
+                -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52,
+                -7.53, -7.54, -7.57, -7.65, -7.82, -7.67, -7.09, -6.44,
+                -6.08, -5.68, -5.28, -4.88, -4.48, -4.08, -3.68, -3.28,
+                -2.88, -2.48,
+            ],
+            [
+                -8.52, -8.52, -8.52, -8.52, -8.52, -8.52, -8.52, -8.52,
+                -8.53, -8.54, -8.57, -8.65, -8.81, -8.67, -8.09, -7.44,
+                -7.08, -6.68, -6.28, -5.88, -5.48, -5.08, -4.68, -4.28,
+                -3.88, -3.48,
+            ],
+            [
+                -9.51, -9.51, -9.51, -9.51, -9.51, -9.51, -9.51, -9.51,
+                -9.51, -9.52, -9.55, -9.63, -9.80, -9.67, -9.08, -8.43,
+                -8.07, -7.67, -7.27, -6.87, -6.47, -6.07, -5.67, -5.27,
+                -4.87, -4.47,
+            ],
+            [
+                -10.39, -10.39, -10.39, -10.40, -10.40, -10.39, -10.39, -10.40,
+                -10.40, -10.41, -10.44, -10.51, -10.65, -10.59, -10.02, -9.38,
+                -9.01, -8.61, -8.21, -7.81, -7.41, -7.01, -6.62, -6.21,
+                -5.79, -5.38,
+            ],
+        ],
+        [
+            [
+                -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52,
+                -7.53, -7.54, -7.57, -7.65, -7.81, -7.68, -7.11, -6.48,
+                -6.13, -5.75, -5.40, -5.07, -4.77, -4.52, -4.32, -4.17,
+                -4.07, -4.00,
+            ],
+            [
+                -8.52, -8.52, -8.52, -8.52, -8.52, -8.52, -8.52, -8.52,
+                -8.53, -8.54, -8.57, -8.65, -8.81, -8.68, -8.11, -7.48,
+                -7.13, -6.75, -6.40, -6.07, -5.77, -5.52, -5.32, -5.17,
+                -5.06, -5.00,
+            ],
+            [
+                -9.51, -9.51, -9.51, -9.51, -9.51, -9.51, -9.51, -9.51,
+                -9.51, -9.52, -9.56, -9.63, -9.79, -9.68, -9.10, -8.47,
+                -8.12, -7.75, -7.39, -7.06, -6.76, -6.51, -6.31, -6.17,
+                -6.07, -5.98,
+            ],
+            [
+                -10.39, -10.40, -10.39, -10.39, -10.40, -10.40, -10.40, -10.40,
+                -10.40, -10.42, -10.44, -10.51, -10.64, -10.60, -10.04, -9.41,
+                -9.06, -8.69, -8.33, -8.00, -7.73, -7.47, -7.30, -7.28,
+                -7.30, -7.25,
+            ],
+        ],
+        [
+            [
+                -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52,
+                -7.53, -7.54, -7.57, -7.64, -7.78, -7.76, -7.28, -6.79,
+                -6.53, -6.33, -6.18, -6.08, -6.01, -5.96, -5.93, -5.91,
+                -5.90, -5.89,
+            ],
+            [
+                -8.52, -8.52, -8.52, -8.52, -8.52, -8.52, -8.52, -8.52,
+                -8.53, -8.54, -8.57, -8.64, -8.78, -8.76, -8.28, -7.79,
+                -7.53, -7.33, -7.18, -7.07, -7.00, -6.96, -6.93, -6.91,
+                -6.90, -6.89,
+            ],
+            [
+                -9.51, -9.51, -9.51, -9.51, -9.51, -9.51, -9.51, -9.51,
+                -9.51, -9.52, -9.55, -9.62, -9.76, -9.76, -9.27, -8.78,
+                -8.53, -8.32, -8.17, -8.07, -8.00, -7.95, -7.92, -7.91,
+                -7.89, -7.89,
+            ],
+            [
+                -10.39, -10.39, -10.40, -10.39, -10.39, -10.39, -10.39, -10.39,
+                -10.39, -10.41, -10.43, -10.50, -10.61, -10.64, -10.19, -9.71,
+                -9.46, -9.26, -9.10, -9.00, -8.93, -8.89, -8.86, -8.84,
+                -8.83, -8.82,
+            ],
+        ],
+        [
+            [
+                -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52,
+                -7.53, -7.53, -7.54, -7.57, -7.62, -7.66, -7.70, -7.72,
+                -7.72, -7.72, -7.73, -7.73, -7.73, -7.73, -7.73, -7.73,
+                -7.73, -7.73,
+            ],
+            [
+                -8.52, -8.52, -8.52, -8.52, -8.52, -8.52, -8.52, -8.52,
+                -8.52, -8.53, -8.54, -8.57, -8.61, -8.66, -8.70, -8.72,
+                -8.72, -8.72, -8.72, -8.72, -8.72, -8.73, -8.73, -8.73,
+                -8.73, -8.73,
+            ],
+            [
+                -9.51, -9.51, -9.51, -9.51, -9.51, -9.51, -9.51, -9.51,
+                -9.51, -9.52, -9.53, -9.56, -9.60, -9.65, -9.68, -9.70,
+                -9.70, -9.71, -9.70, -9.70, -9.71, -9.71, -9.71, -9.71,
+                -9.71, -9.71,
+            ],
+            [
+                -10.40, -10.39, -10.40, -10.40, -10.40, -10.40, -10.39, -10.40,
+                -10.40, -10.41, -10.42, -10.46, -10.48, -10.52, -10.55, -10.55,
+                -10.56, -10.56, -10.56, -10.57, -10.56, -10.56, -10.56, -10.56,
+                -10.57, -10.56,
+            ],
+        ],
+        [
+            [
+                -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52,
+                -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52,
+                -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52, -7.52,
+                -7.52, -7.52,
+            ],
+            [
+                -8.52, -8.52, -8.52, -8.52, -8.52, -8.52, -8.52, -8.52,
+                -8.52, -8.52, -8.52, -8.52, -8.52, -8.52, -8.52, -8.52,
+                -8.52, -8.52, -8.52, -8.52, -8.52, -8.52, -8.52, -8.52,
+                -8.52, -8.52,
+            ],
+            [
+                -9.51, -9.51, -9.51, -9.51, -9.51, -9.51, -9.51, -9.51,
+                -9.51, -9.51, -9.51, -9.51, -9.51, -9.51, -9.51, -9.51,
+                -9.51, -9.51, -9.51, -9.51, -9.51, -9.51, -9.51, -9.51,
+                -9.51, -9.51,
+            ],
+            [
+                -10.40, -10.39, -10.39, -10.39, -10.39, -10.39, -10.39, -10.40,
+                -10.40, -10.40, -10.39, -10.39, -10.40, -10.39, -10.39, -10.40,
+                -10.39, -10.39, -10.39, -10.40, -10.40, -10.39, -10.39, -10.39,
+                -10.39, -10.39,
+            ],
+        ],
+    ],
+    'key201' : [
+        [
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.62, -0.65, -0.69, -0.73, -0.68, -0.43, 0.15,
+                0.53, 0.94, 1.34, 1.74, 2.14, 2.54, 2.94, 3.34,
+                3.74, 4.14,
+            ],
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.62, -0.65, -0.69, -0.73, -0.68, -0.42, 0.15,
+                0.54, 0.94, 1.34, 1.74, 2.14, 2.54, 2.94, 3.34,
+                3.74, 4.14,
+            ],
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.62, -0.64, -0.69, -0.73, -0.68, -0.42, 0.15,
+                0.54, 0.94, 1.34, 1.74, 2.14, 2.54, 2.94, 3.34,
+                3.74, 4.14,
+            ],
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.62, -0.64, -0.69, -0.73, -0.68, -0.42, 0.15,
+                0.54, 0.94, 1.34, 1.74, 2.14, 2.54, 2.94, 3.34,
+                3.74, 4.14,
+            ],
+        ],
+        [
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.62, -0.65, -0.69, -0.73, -0.68, -0.43, 0.12,
+                0.49, 0.86, 1.22, 1.55, 1.84, 2.10, 2.30, 2.45,
+                2.55, 2.62,
+            ],
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.62, -0.64, -0.69, -0.73, -0.68, -0.43, 0.12,
+                0.49, 0.86, 1.22, 1.55, 1.85, 2.10, 2.30, 2.45,
+                2.55, 2.62,
+            ],
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.62, -0.64, -0.69, -0.73, -0.68, -0.43, 0.12,
+                0.49, 0.86, 1.22, 1.55, 1.85, 2.10, 2.30, 2.45,
+                2.55, 2.62,
+            ],
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.62, -0.64, -0.69, -0.73, -0.68, -0.43, 0.12,
+                0.49, 0.86, 1.22, 1.55, 1.85, 2.10, 2.30, 2.45,
+                2.55, 2.62,
+            ],
+        ],
+        [
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.62, -0.64, -0.69, -0.72, -0.69, -0.48, -0.12,
+                0.12, 0.32, 0.46, 0.56, 0.63, 0.67, 0.70, 0.72,
+                0.73, 0.73,
+            ],
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.62, -0.64, -0.69, -0.72, -0.69, -0.48, -0.12,
+                0.13, 0.32, 0.46, 0.56, 0.63, 0.67, 0.70, 0.72,
+                0.73, 0.74,
+            ],
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.62, -0.64, -0.69, -0.72, -0.69, -0.48, -0.12,
+                0.13, 0.32, 0.46, 0.56, 0.63, 0.67, 0.70, 0.72,
+                0.73, 0.74,
+            ],
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.62, -0.64, -0.69, -0.72, -0.69, -0.48, -0.12,
+                0.13, 0.32, 0.46, 0.56, 0.63, 0.67, 0.70, 0.72,
+                0.73, 0.74,
+            ],
+        ],
+        [
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.62, -0.63, -0.65, -0.67, -0.69, -0.69, -0.69,
+                -0.69, -0.68, -0.68, -0.68, -0.68, -0.68, -0.68, -0.68,
+                -0.68, -0.68,
+            ],
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.61, -0.63, -0.65, -0.67, -0.69, -0.69, -0.69,
+                -0.69, -0.68, -0.68, -0.68, -0.68, -0.68, -0.68, -0.68,
+                -0.68, -0.68,
+            ],
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.61, -0.63, -0.65, -0.67, -0.69, -0.69, -0.69,
+                -0.69, -0.68, -0.68, -0.68, -0.68, -0.68, -0.68, -0.68,
+                -0.68, -0.68,
+            ],
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.61, -0.63, -0.65, -0.67, -0.69, -0.69, -0.69,
+                -0.69, -0.68, -0.68, -0.68, -0.68, -0.68, -0.68, -0.68,
+                -0.68, -0.68,
+            ],
+        ],
+        [
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.61,
+            ],
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.61,
+            ],
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.61,
+            ],
+            [
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61, -0.61,
+                -0.61, -0.61,
+            ],
+        ],
+    ],
+    'kong241' : [
+        [
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.45, -4.47, -4.52, -4.55, -4.51, -4.25, -3.68,
+                -3.29, -2.89, -2.49, -2.09, -1.69, -1.29, -0.89, -0.49,
+                -0.09, 0.31,
+            ],
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.45, -4.47, -4.52, -4.55, -4.51, -4.25, -3.68,
+                -3.29, -2.89, -2.49, -2.09, -1.69, -1.29, -0.89, -0.49,
+                -0.09, 0.31,
+            ],
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.45, -4.47, -4.52, -4.55, -4.51, -4.25, -3.68,
+                -3.29, -2.89, -2.49, -2.09, -1.69, -1.29, -0.89, -0.49,
+                -0.09, 0.31,
+            ],
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.45, -4.47, -4.52, -4.55, -4.51, -4.25, -3.68,
+                -3.29, -2.89, -2.49, -2.09, -1.69, -1.29, -0.89, -0.49,
+                -0.09, 0.31,
+            ],
+        ],
+        [
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.45, -4.47, -4.52, -4.55, -4.51, -4.26, -3.70,
+                -3.34, -2.96, -2.61, -2.28, -1.98, -1.73, -1.53, -1.38,
+                -1.28, -1.21,
+            ],
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.45, -4.47, -4.52, -4.55, -4.51, -4.26, -3.70,
+                -3.34, -2.96, -2.61, -2.28, -1.98, -1.73, -1.53, -1.38,
+                -1.28, -1.21,
+            ],
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.45, -4.47, -4.52, -4.55, -4.51, -4.26, -3.70,
+                -3.34, -2.96, -2.61, -2.28, -1.98, -1.73, -1.53, -1.38,
+                -1.28, -1.21,
+            ],
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.45, -4.47, -4.52, -4.55, -4.51, -4.26, -3.70,
+                -3.34, -2.96, -2.61, -2.28, -1.98, -1.73, -1.53, -1.38,
+                -1.28, -1.21,
+            ],
+        ],
+        [
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.45, -4.47, -4.51, -4.55, -4.51, -4.31, -3.94,
+                -3.70, -3.51, -3.36, -3.26, -3.20, -3.15, -3.13, -3.11,
+                -3.10, -3.09,
+            ],
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.45, -4.47, -4.51, -4.55, -4.51, -4.31, -3.94,
+                -3.70, -3.51, -3.36, -3.26, -3.20, -3.15, -3.13, -3.11,
+                -3.10, -3.09,
+            ],
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.45, -4.47, -4.51, -4.55, -4.51, -4.31, -3.94,
+                -3.70, -3.51, -3.36, -3.26, -3.20, -3.15, -3.13, -3.11,
+                -3.10, -3.09,
+            ],
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.45, -4.47, -4.51, -4.55, -4.51, -4.31, -3.94,
+                -3.70, -3.51, -3.36, -3.26, -3.20, -3.15, -3.13, -3.11,
+                -3.10, -3.09,
+            ],
+        ],
+        [
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.44, -4.45, -4.47, -4.50, -4.52, -4.52, -4.52,
+                -4.51, -4.51, -4.51, -4.51, -4.51, -4.50, -4.50, -4.50,
+                -4.50, -4.50,
+            ],
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.44, -4.45, -4.47, -4.50, -4.52, -4.52, -4.52,
+                -4.51, -4.51, -4.51, -4.51, -4.51, -4.50, -4.50, -4.50,
+                -4.50, -4.50,
+            ],
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.44, -4.45, -4.47, -4.50, -4.52, -4.52, -4.52,
+                -4.51, -4.51, -4.51, -4.51, -4.51, -4.50, -4.50, -4.50,
+                -4.50, -4.50,
+            ],
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.44, -4.44, -4.45, -4.47, -4.50, -4.52, -4.52, -4.52,
+                -4.51, -4.51, -4.51, -4.51, -4.51, -4.50, -4.50, -4.50,
+                -4.50, -4.50,
+            ],
+        ],
+        [
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.43, -4.43,
+            ],
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.43, -4.43,
+            ],
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.43, -4.43,
+            ],
+            [
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43, -4.43,
+                -4.43, -4.43,
+            ],
+        ],
+    ],
+    'anderson801' : [
+        [
+            [
+                -6.73, -6.13, -5.99, -5.69, -5.46, -6.07, -5.51, -5.71,
+                -5.78, -5.82, -5.49, -5.53, -5.86, -5.45, -5.26, -5.23,
+                -4.21, -3.85, -3.47, -3.37, -2.97, -2.57, -1.87, -1.47,
+                -2.87, -0.67,
+            ],
+            [
+                -4.64, -4.65, -4.70, -4.95, -4.65, -4.43, -4.80, -4.10,
+                -3.82, -4.35, -4.19, -4.06, -4.17, -4.46, -3.80, -3.19,
+                -2.91, -5.14, -2.08, -1.68, -1.28, -0.88, -4.63, -0.08,
+                0.32, 0.72,
+            ],
+            [
+                -2.09, -2.09, -2.09, -2.09, -2.08, -2.08, -2.05, -2.44,
+                -2.54, -2.31, -2.66, -2.38, -3.36, -4.46, -2.43, -1.91,
+                -1.16, -0.78, -0.38, -6.14, 0.42, 0.82, -5.38, -4.64,
+                -4.09, 2.42,
+            ],
+            [
+                -1.33, -1.33, -1.33, -1.33, -1.33, -1.33, -1.33, -1.31,
+                -1.26, -1.13, -0.91, -0.67, -0.58, -1.70, -0.04, 0.42,
+                0.82, -5.14, -5.82, -5.20, 2.42, -4.89, 3.22, 3.62,
+                4.02, -3.37,
+            ],
+        ],
+        [
+            [
+                -5.68, -5.58, -6.06, -5.75, -5.83, -5.62, -5.87, -6.14,
+                -7.53, -5.92, -6.89, -6.38, -5.92, -6.84, -5.44, -4.92,
+                -4.74, -4.21, -3.67, -3.98, -3.39, -4.40, -3.10, -3.02,
+                -2.78, -2.73,
+            ],
+            [
+                -4.64, -4.65, -4.70, -4.95, -4.65, -4.42, -4.75, -5.19,
+                -5.42, -4.49, -4.23, -4.91, -4.18, -4.09, -3.88, -4.15,
+                -3.11, -3.56, -2.49, -1.83, -2.69, -1.38, -1.13, -2.13,
+                -0.80, -0.51,
+            ],
+            [
+                -2.47, -2.47, -2.47, -2.47, -2.46, -2.45, -3.16, -2.94,
+                -2.12, -2.34, -2.79, -2.53, -3.10, -2.82, -2.31, -1.70,
+                -2.29, -0.94, -1.13, -0.48, 0.27, 0.25, -0.11, -0.06,
+                0.77, -0.01,
+            ],
+            [
+                -0.37, -0.37, -0.37, -0.37, -0.37, -0.37, -0.37, -0.37,
+                -0.38, -0.41, -0.50, -0.74, -1.00, -2.19, -0.32, 0.41,
+                0.77, 1.14, -0.61, 1.83, -0.31, 2.38, 2.58, 2.73,
+                2.83, 2.90,
+            ],
+        ],
+        [
+            [
+                -5.68, -5.58, -5.99, -7.52, -6.03, -6.26, -5.53, -6.08,
+                -5.72, -6.71, -7.16, -5.94, -5.99, -6.42, -6.44, -5.82,
+                -5.21, -5.05, -4.97, -5.51, -5.15, -4.75, -4.26, -4.68,
+                -5.85, -4.71,
+            ],
+            [
+                -4.64, -4.65, -4.70, -4.94, -4.66, -4.26, -4.21, -4.62,
+                -3.98, -4.50, -4.07, -3.86, -5.11, -4.63, -3.94, -4.00,
+                -4.25, -3.73, -2.85, -2.99, -2.65, -4.73, -3.49, -3.15,
+                -2.51, -2.68,
+            ],
+            [
+                -1.96, -1.96, -1.96, -1.96, -1.96, -1.97, -1.99, -2.07,
+                -2.65, -2.84, -2.47, -2.42, -2.18, -2.33, -2.27, -1.91,
+                -1.71, -1.26, -1.15, -1.32, -1.01, -1.90, -0.77, -1.94,
+                -0.85, -0.80,
+            ],
+            [
+                -0.28, -0.28, -0.28, -0.28, -0.28, -0.28, -0.28, -0.28,
+                -0.28, -0.27, -0.25, -0.22, -0.20, -0.31, -0.23, -0.27,
+                -0.17, 0.68, -0.06, 1.18, -0.01, 1.00, -0.00, -0.00,
+                -0.00, -0.00,
+            ],
+        ],
+        [
+            [
+                -6.74, -5.92, -6.07, -5.98, -7.52, -5.97, -6.23, -6.21,
+                -5.97, -6.89, -6.24, -6.04, -7.21, -7.58, -6.30, -5.74,
+                -7.08, -6.51, -5.96, -6.20, -5.75, -5.84, -6.11, -6.35,
+                -6.10, -6.09,
+            ],
+            [
+                -4.64, -4.65, -4.70, -4.91, -4.77, -3.90, -3.90, -4.14,
+                -4.15, -3.91, -4.17, -4.09, -5.77, -4.60, -4.64, -3.87,
+                -4.14, -4.63, -4.39, -4.44, -4.26, -4.01, -4.07, -4.65,
+                -4.52, -3.97,
+            ],
+            [
+                -2.87, -2.87, -2.87, -2.87, -2.88, -2.22, -2.25, -2.37,
+                -3.51, -2.48, -3.32, -2.60, -3.18, -2.59, -2.57, -3.09,
+                -2.74, -2.34, -2.30, -2.41, -2.64, -2.94, -3.39, -4.23,
+                -3.45, -2.34,
+            ],
+            [
+                -0.37, -0.37, -0.37, -0.37, -0.37, -0.37, -0.37, -0.37,
+                -0.37, -0.39, -0.43, -0.51, -0.63, -0.74, -0.76, -0.74,
+                -0.72, -0.70, -0.69, -0.68, -0.67, -0.67, -0.67, -0.67,
+                -0.67, -0.67,
+            ],
+        ],
+        [
+            [
+                -5.76, -5.87, -7.52, -5.60, -6.35, -7.52, -6.67, -6.88,
+                -6.69, -6.14, -6.57, -5.88, -6.25, -5.73, -5.83, -5.96,
+                -7.53, -6.56, -6.88, -7.52, -6.05, -7.25, -7.52, -6.16,
+                -7.26, -6.28,
+            ],
+            [
+                -4.64, -4.65, -4.68, -4.78, -5.47, -4.49, -3.93, -4.00,
+                -4.55, -3.98, -4.46, -4.01, -4.12, -7.30, -4.67, -4.16,
+                -4.40, -4.67, -5.03, -5.72, -5.55, -5.24, -5.12, -5.05,
+                -5.02, -5.00,
+            ],
+            [
+                -2.47, -2.47, -2.47, -2.47, -2.46, -2.46, -2.45, -2.43,
+                -2.40, -2.37, -2.34, -2.31, -2.30, -2.29, -2.28, -2.28,
+                -2.28, -2.27, -2.27, -2.27, -2.27, -2.27, -2.27, -2.27,
+                -2.27, -2.27,
+            ],
+            [
+                -1.33, -1.33, -1.33, -1.33, -1.33, -1.33, -1.33, -1.33,
+                -1.33, -1.33, -1.32, -1.32, -1.32, -1.32, -1.32, -1.32,
+                -1.32, -1.32, -1.32, -1.32, -1.32, -1.32, -1.32, -1.32,
+                -1.32, -1.32,
+            ],
+        ],
+    ],
+}
@@ -0,0 +1,112 @@
+# Copyright 2021 Waseda Geophysics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Accuracy and timing baseline of core.validation
+(relative error against core.analytic, best time in seconds).
+The times are compared relative to each other (core.validation.slow_cases)
+and the errors against themselves (core.validation.worse_cases);
+core.validation.ACCURACY gives the required accuracy of each case.
+
+Generated by python -m emulatte.core.validation --update
+"""
+
+baseline = {
+    'vmd/FD/mizunaga90' : (1.933e-04, 2.114e-03),
+    'vmd/FD/werthmuller201' : (1.521e-06, 2.148e-03),
+    'vmd/FFT/h/werthmuller201' : (1.702e-04, 5.249e-02),
+    'vmd/FFT/dhdt/werthmuller201' : (7.191e-04, 5.491e-02),
+    'vmd/DLAG/h/werthmuller201' : (1.000e+00, 9.806e-01),
+    'vmd/DLAG/dhdt/werthmuller201' : (1.022e+00, 1.115e+00),
+    'vmd/EULER/h/werthmuller201' : (2.691e-04, 1.256e+00),
+    'vmd/EULER/dhdt/werthmuller201' : (1.654e-07, 1.016e+00),
+    'vmd/FD/key201' : (1.520e-06, 2.127e-03),
+    'vmd/FFT/h/key201' : (5.912e-05, 5.974e-02),
+    'vmd/FFT/dhdt/key201' : (1.162e-03, 5.889e-02),
+    'vmd/DLAG/h/key201' : (1.000e+00, 7.661e-01),
+    'vmd/DLAG/dhdt/key201' : (1.022e+00, 8.160e-01),
+    'vmd/EULER/h/key201' : (2.691e-04, 9.306e-01),
+    'vmd/EULER/dhdt/key201' : (1.987e-07, 1.164e+00),
+    'vmd/FD/kong241' : (1.520e-06, 2.219e-03),
+    'vmd/FFT/h/kong241' : (1.336e-04, 5.409e-02),
+    'vmd/FFT/dhdt/kong241' : (1.030e-03, 5.609e-02),
+    'vmd/DLAG/h/kong241' : (1.000e+00, 9.097e-01),
+    'vmd/DLAG/dhdt/kong241' : (1.022e+00, 1.098e+00),
+    'vmd/EULER/h/kong241' : (2.691e-04, 1.104e+00),
+    'vmd/EULER/dhdt/kong241' : (1.654e-07, 1.019e+00),
+    'vmd/FD/anderson801' : (2.893e-06, 3.070e-03),
+    'vmd/FFT/h/anderson801' : (5.912e-05, 1.069e-01),
+    'vmd/FFT/dhdt/anderson801' : (1.162e-03, 1.132e-01),
+    'vmd/DLAG/h/anderson801' : (1.000e+00, 9.386e-01),
+    'vmd/DLAG/dhdt/anderson801' : (1.022e+00, 1.148e+00),
+    'vmd/EULER/h/anderson801' : (2.688e-04, 1.265e+00),
+    'vmd/EULER/dhdt/anderson801' : (1.347e-06, 1.439e+00),
+    'hmd/FD/mizunaga90' : (1.935e-04, 3.114e-03),
+    'hmd/FD/werthmuller201' : (1.519e-06, 3.556e-03),
+    'hmd/FFT/h/werthmuller201' : (1.702e-04, 8.674e-02),
+    'hmd/FFT/dhdt/werthmuller201' : (7.191e-04, 8.267e-02),
+    'hmd/DLAG/h/werthmuller201' : (1.000e+00, 4.732e-01),
+    'hmd/DLAG/dhdt/werthmuller201' : (1.022e+00, 5.144e-01),
+    'hmd/EULER/h/werthmuller201' : (4.829e-09, 1.726e+00),
+    'hmd/EULER/dhdt/werthmuller201' : (1.654e-07, 1.715e+00),
+    'hmd/FD/key201' : (1.520e-06, 3.377e-03),
+    'hmd/FFT/h/key201' : (5.912e-05, 1.040e-01),
+    'hmd/FFT/dhdt/key201' : (1.162e-03, 1.042e-01),
+    'hmd/DLAG/h/key201' : (1.000e+00, 6.191e-01),
+    'hmd/DLAG/dhdt/key201' : (1.022e+00, 6.033e-01),
+    'hmd/EULER/h/key201' : (4.225e-09, 1.762e+00),
+    'hmd/EULER/dhdt/key201' : (1.987e-07, 1.457e+00),
+    'hmd/FD/kong241' : (1.520e-06, 3.490e-03),
+    'hmd/FFT/h/kong241' : (1.336e-04, 1.384e-01),
+    'hmd/FFT/dhdt/kong241' : (1.030e-03, 7.907e-02),
+    'hmd/DLAG/h/kong241' : (1.000e+00, 5.078e-01),
+    'hmd/DLAG/dhdt/kong241' : (1.022e+00, 5.294e-01),
+    'hmd/EULER/h/kong241' : (4.829e-09, 1.369e+00),
+    'hmd/EULER/dhdt/kong241' : (1.654e-07, 1.722e+00),
+    'hmd/FD/anderson801' : (1.520e-06, 4.230e-03),
+    'hmd/FFT/h/anderson801' : (5.912e-05, 1.747e-01),
+    'hmd/FFT/dhdt/anderson801' : (1.162e-03, 1.468e-01),
+    'hmd/DLAG/h/anderson801' : (1.000e+00, 5.798e-01),
+    'hmd/DLAG/dhdt/anderson801' : (1.022e+00, 6.148e-01),
+    'hmd/EULER/h/anderson801' : (1.824e-07, 1.929e+00),
+    'hmd/EULER/dhdt/anderson801' : (3.721e-07, 1.873e+00),
+    'loop/FD/mizunaga90' : (7.382e-06, 1.543e-03),
+    'loop/FD/werthmuller201' : (1.820e-10, 1.751e-03),
+    'loop/FFT/h/werthmuller201' : (2.516e-04, 4.390e-02),
+    'loop/FFT/dhdt/werthmuller201' : (1.126e-03, 4.209e-02),
+    'loop/DLAG/h/werthmuller201' : (1.000e+00, 3.804e-01),
+    'loop/DLAG/dhdt/werthmuller201' : (1.026e+00, 3.827e-01),
+    'loop/EULER/h/werthmuller201' : (1.149e-05, 7.101e-01),
+    'loop/EULER/dhdt/werthmuller201' : (9.819e-07, 7.411e-01),
+    'loop/FD/key201' : (3.852e-07, 1.690e-03),
+    'loop/FFT/h/key201' : (8.407e-05, 4.861e-02),
+    'loop/FFT/dhdt/key201' : (2.077e-03, 5.100e-02),
+    'loop/DLAG/h/key201' : (1.000e+00, 3.543e-01),
+    'loop/DLAG/dhdt/key201' : (1.026e+00, 3.770e-01),
+    'loop/EULER/h/key201' : (1.140e-05, 7.478e-01),
+    'loop/EULER/dhdt/key201' : (1.090e-06, 7.570e-01),
+    'loop/FD/kong241' : (3.849e-10, 1.755e-03),
+    'loop/FFT/h/kong241' : (1.145e-04, 3.971e-02),
+    'loop/FFT/dhdt/kong241' : (1.924e-03, 4.141e-02),
+    'loop/DLAG/h/kong241' : (1.000e+00, 3.756e-01),
+    'loop/DLAG/dhdt/kong241' : (1.026e+00, 4.224e-01),
+    'loop/EULER/h/kong241' : (6.417e-05, 7.249e-01),
+    'loop/EULER/dhdt/kong241' : (9.366e-07, 9.130e-01),
+    'loop/FD/anderson801' : (2.572e-10, 2.961e-03),
+    'loop/FFT/h/anderson801' : (8.406e-05, 1.313e-01),
+    'loop/FFT/dhdt/anderson801' : (2.077e-03, 1.082e-01),
+    'loop/DLAG/h/anderson801' : (1.000e+00, 5.692e-01),
+    'loop/DLAG/dhdt/anderson801' : (1.026e+00, 5.138e-01),
+    'loop/EULER/h/anderson801' : (1.140e-05, 1.391e+00),
+    'loop/EULER/dhdt/anderson801' : (9.847e-07, 1.442e+00),
+}
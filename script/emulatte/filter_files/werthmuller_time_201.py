@@ -80,7 +80,7 @@ base = np.array([
 66.16967141371431182506, 70.49597073962775084510, 75.10513176724701622788,
 80.01564853414659239661, 85.24722425335225750587, 90.82085037153834150558,
 96.75889079620085908573,103.08517162976365000304,109.82507677067211204758,
-17.00564976506775849430,124.65570231772045417529,132.80592989761206013100
+117.00564976506775849430,124.65570231772045417529,132.80592989761206013100
 ])
 
 
@@ -14,6 +14,7 @@
 
 from .core import emlayers
 from .core.emsource import *
+from .core.transform import FIELDS, FIELD_DTYPE
 
 def model(thicks):
     """
@@ -125,4 +126,51 @@ def transmitter(name, freqtime, **kwargs):
     """
     cls = globals()[name]
     tmr = cls(freqtime, **kwargs)
-    return tmr
\ No newline at end of file
+    return tmr
+
+
+def forward(model_params, survey, options):
+    """
+    Stateless forward computation. \\
+    A new model (Subsurface1D and transmitter) is built for every call,
+    so the inputs are never modified and no cache is kept between calls.
+    (emulate() itself writes its scratch variables to an
+    emlayers.Workspace, so a located model can also be shared by threads)
+
+    Parameters
+    ----------
+    model_params : dict \\
+        'thicks' : array-like (see model()) \\
+        and the properties of Subsurface1D.set_properties() \\
+        e.g.) {'thicks' : [100, 50], 'res' : [2e14, 100, 50, 200]}
+
+    survey : dict \\
+        'transmitter' : str (see transmitter()) \\
+        'freqtime' : number or list \\
+        'sc' : source coordinate, 'rc' : receiver coordinate \\
+        and the keyword arguments of the transmitter \\
+        e.g.) {'transmitter' : 'VMD', 'freqtime' : [1e3], 'moment' : 1,
+               'sc' : [0, 0, -30], 'rc' : [-7.86, 0, -30]}
+
+    options : dict \\
+        keyword arguments of Subsurface1D.emulate() \\
+        e.g.) {'hankel_filter' : 'werthmuller201'}
+
+    Returns
+    -------
+    same as Subsurface1D.emulate()
+    """
+    props = dict(model_params)
+    thicks = props.pop('thicks')
+    src_kwargs = dict(survey)
+    name = src_kwargs.pop('transmitter')
+    freqtime = src_kwargs.pop('freqtime')
+    sc = src_kwargs.pop('sc')
+    rc = src_kwargs.pop('rc')
+
+    # 呼び出し毎に model を作る
+    subsurface = model(thicks)
+    subsurface.set_properties(**props)
+    emsrc = transmitter(name, freqtime, **src_kwargs)
+    subsurface.locate(emsrc, sc, rc)
+    return subsurface.emulate(**options)
@@ -22,4 +22,14 @@ def ndarray_converter(array_like, valiable_name):
         print('TypeError : {} must be input as list, tuple or ndarray'.format(
             valiable_name
         ))
-        sys.exit
\ No newline at end of file
+        sys.exit
+
+def is_requested(model, *components):
+    """
+    emulate(components=...) で指定された成分のいずれかを含むか
+    (components の指定がない場合は常に True)
+    """
+    requested = getattr(model, 'components', None)
+    if requested is None:
+        return True
+    return any(c in requested for c in components)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# script パッケージ (script.GenerateDataset など) と emulatte を import できるようにする
+for path in [ROOT, os.path.join(ROOT, 'script')]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+import emulatte.forward as fwd
+from script import ModelingToolKit as mtk
+
+FREQS = np.logspace(1, 5, 9)
+PROPS = {
+    'res_0' : [2e14, 100, 10, 300],
+    'm' : [0, 0.5, 0.3, 0.1],
+    'tau' : [1e-3, 1e-3, 1e-2, 1e-4],
+    'c' : [1, 0.5, 0.8, 0.3],
+}
+
+
+def emulate(freqs, **kwargs):
+    model = fwd.model([20, 30])
+    model.set_properties(**PROPS)
+    model.locate(fwd.transmitter('HMDx', freqs, moment=1), [0, 0, 10], [40, 20, 25])
+    return model.emulate('werthmuller201', **kwargs)
+
+
+def test_batched_conductivity_matches_single_frequency():
+    # frequency_response は全周波数の導電率をまとめて計算して渡す
+    batched = emulate(FREQS, workers=3)
+    for i, freq in enumerate(FREQS):
+        single = emulate([freq])
+        for key in single:
+            np.testing.assert_allclose(batched[key][i], single[key][0], rtol=1e-12)
+
+
+def pelton(omega, res_0, m, tau, c):
+    # Pelton et al. (1978)
+    return res_0 * (1 - m * (1 - 1 / (1 + (1j * omega * tau) ** c)))
+
+
+def test_complex_conductivity_pelton():
+    model = fwd.model([20, 30])
+    model.set_properties(**PROPS)
+    omegas = 2 * np.pi * FREQS
+    sigma = model.complex_conductivity(omegas)
+    assert sigma.shape == (len(FREQS), 4)
+    for i, omega in enumerate(omegas):
+        for j in range(4):
+            rho = pelton(omega, *(PROPS[key][j] for key in ['res_0', 'm', 'tau', 'c']))
+            assert sigma[i, j] == pytest.approx(1 / rho, rel=1e-14)
+        # 1周波数ずつ計算した場合と同じ
+        np.testing.assert_array_equal(model.complex_conductivity(omega)[0], sigma[i])
+    # 低周波・高周波の極限は rho_0, rho_0 (1 - m)
+    limits = model.complex_conductivity([1e-30, 1e30])
+    np.testing.assert_allclose(1 / limits[0, 1:], PROPS['res_0'][1:], rtol=1e-6)
+    high = np.array(PROPS['res_0'][1:]) * (1 - np.array(PROPS['m'][1:]))
+    np.testing.assert_allclose(1 / limits[1, 1:], high, rtol=1e-6)
+
+
+@pytest.mark.parametrize('generate_mode', ['default', 'ymtmt'])
+@pytest.mark.parametrize('nlayer', [3, 4, 30])
+def test_colecole1D_batch(generate_mode, nlayer):
+    # res_0 は resistivity1D と同じ構造, m, tau, c は各層独立
+    thicks = [5.0] * (nlayer - 1)
+    dims = mtk.resistivity_dims(generate_mode)
+    u = np.random.rand(200, dims + mtk.colecole_dims(nlayer))
+    model = mtk.colecole1D(200, thicks, [1, 1000], generate_mode, u=u)
+    expected = [mtk.resistivity1D(thicks, [1, 1000], generate_mode, u=row[:dims])
+                for row in u]
+    np.testing.assert_allclose(model['res_0'], expected, rtol=1e-12)
+    for key in ['m', 'tau', 'c']:
+        assert model[key].shape == (200, nlayer)
+    np.testing.assert_allclose(
+        np.log10(model['tau']), -5 + 4 * u[:, dims + nlayer:dims + 2 * nlayer])
+
+
+def test_colecole1D_tau_is_independent():
+    model = mtk.colecole1D(4000, [5.0] * 9, [1, 1000], 'default')
+    logtau = np.log10(model['tau'])
+    assert logtau.min() >= -5 and logtau.max() <= -1
+    # 隣り合う層の tau は無相関 (構造生成では強く相関する)
+    assert abs(np.corrcoef(logtau[:, 3], logtau[:, 4])[0, 1]) < 0.1
+    assert abs(np.mean(logtau) + 3) < 0.1
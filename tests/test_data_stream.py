@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from script import GenerateDataset as gd
+from script import DataStream as ds
+
+FREQS = [380, 1500, 3000, 6000, 12000, 24000]
+SPANS = [7.86] * 6
+NOISE_AVE = [0] * 6
+NOISE_STD = [50, 40, 20, 10, 10, 10]
+
+
+def resolve():
+    return gd.Resolve1D(
+        4, [5.0] * 10, [1, 1000], [30, 60], FREQS, SPANS,
+        add_noise=True, noise_ave=NOISE_AVE, noise_std=NOISE_STD)
+
+
+@pytest.mark.parametrize('key', ['p', 'heights'])
+def test_noise_kwargs_rejects_reserved_keys(key):
+    # p は noisy_fraction, heights は x の height の列で与える
+    with pytest.raises(Exception, match=repr(key)):
+        ds.ResolveStream(resolve(), noise_kwargs={key: 0.5})
+
+
+def test_transform_uses_noisy_fraction_and_noise_kwargs():
+    r = resolve()
+    data = r.task(np.arange(4))
+    clean = data[:, :2 * len(FREQS)]
+    stream = ds.ResolveStream(r, noisy_fraction=0.0,
+                              noise_kwargs={'relative_std': 0.1})
+    x, y = stream.transform(data)
+    np.testing.assert_array_equal(x[:, :2 * len(FREQS)], clean)
+    stream = ds.ResolveStream(r, noisy_fraction=1.0,
+                              noise_kwargs={'relative_std': 0.1})
+    x, y = stream.transform(data)
+    assert np.all(x[:, :2 * len(FREQS)] != clean)
+    np.testing.assert_array_equal(x[:, 2 * len(FREQS)], data[:, 2 * len(FREQS)])
+    np.testing.assert_allclose(y, np.log10(data[:, 2 * len(FREQS) + 1:]))
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+import emulatte.forward as fwd
+
+FREQS = np.logspace(0, 5, 6)
+THICKS = [10.0, 20.0]
+RES = [2e14, 30, 300, 10]
+FIELDS = ['e_x', 'e_y', 'e_z', 'h_x', 'h_y', 'h_z']
+
+
+def emulate(name, sc, rc, hankel_filter='werthmuller201', **kwargs):
+    model = fwd.model(THICKS)
+    model.set_properties(res=RES)
+    model.locate(fwd.transmitter(name, FREQS, moment=1), sc, rc)
+    return model.emulate(hankel_filter, **kwargs)
+
+
+@pytest.mark.parametrize('name', ['VMD', 'HMDx', 'HMDy'])
+@pytest.mark.parametrize('hankel_filter', ['key201', 'kong241', 'mizunaga90'])
+def test_coplanar_direct_field(name, hankel_filter):
+    # 同じ高度の送受信点の直接波は解析解で加えるので、短いフィルタでも積分できる
+    sc, rc = [0, 0, -30], [7.86, 3, -30]
+    ans = emulate(name, sc, rc, hankel_filter, ignore_displacement_current=True)
+    ref = emulate(name, sc, rc, 'anderson801', ignore_displacement_current=True)
+    tol = 1e-3 if hankel_filter == 'mizunaga90' else 1e-5
+    for key in FIELDS:
+        scale = np.abs(ref[key]).max()
+        if scale > 0:
+            assert np.abs(ans[key] - ref[key]).max() < tol * scale
+
+
+@pytest.mark.parametrize('ignore_displacement_current', [True, False])
+@pytest.mark.parametrize('sc, rc', [
+    ([0, 0, -20], [30, 12, -35]),
+    ([0, 0, -30], [7.86, 3, -30]),
+    ([0, 0, 15], [40, -10, 22]),
+    ([0, 0, -10], [40, 25, 12]),
+    ([0, 0, 5], [20, -30, -10]),
+])
+def test_hmdy_is_rotated_hmdx(sc, rc, ignore_displacement_current):
+    # HMDy の応答は HMDx の応答を z 軸の周りに 90 度回転したもの
+    y = emulate('HMDy', sc, rc,
+                ignore_displacement_current=ignore_displacement_current)
+    x = emulate('HMDx', sc, [rc[1], -rc[0], rc[2]],
+                ignore_displacement_current=ignore_displacement_current)
+    rotated = {'e_x': -x['e_y'], 'e_y': x['e_x'], 'e_z': x['e_z'],
+               'h_x': -x['h_y'], 'h_y': x['h_x'], 'h_z': x['h_z']}
+    for key in FIELDS:
+        np.testing.assert_allclose(
+            y[key], rotated[key], rtol=0, atol=1e-10 * np.abs(rotated[key]).max())
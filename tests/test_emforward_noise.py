@@ -0,0 +1,26 @@
+import numpy as np
+from script import emforward as emf
+from script import NoiseModel as nm
+
+FREQS = [380, 1500, 3000, 6000, 12000, 24000]
+SPANS = [7.86] * 6
+NOISE_AVE = [0] * 6
+NOISE_STD = [50, 40, 20, 10, 10, 10]
+
+
+def resolve(add_noise):
+    return emf.emulatte_RESOLVE_heights(
+        [5.0] * 10, np.full(11, 100.0), FREQS, 6, SPANS, [30, 40, 50, 60],
+        vca_index=3, add_noise=add_noise,
+        noise_ave=NOISE_AVE, noise_std=NOISE_STD)
+
+
+def test_noise_matches_noise_model():
+    # ノイズは NoiseModel.add_noise と同じ (同じ乱数列で同じ値)
+    clean = resolve(False)
+    np.random.seed(0)
+    noisy = resolve(True)
+    np.random.seed(0)
+    expected = nm.add_noise(clean, NOISE_AVE, NOISE_STD)
+    np.testing.assert_array_equal(noisy, expected)
+    assert not np.array_equal(noisy, clean)
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from emulatte.core import validation, transform
+
+
+def loop_step(time_diff, **kwargs):
+    model = validation._setup('loop', validation.TIMES)
+    ans = model.emulate(
+        'werthmuller201', ignore_displacement_current=True, td_transform='FFT',
+        time_diff=time_diff, components=['h_z'], fft_filter='key_time_201',
+        **kwargs)
+    ref = validation._reference('loop', validation.TIMES, 'FFT', time_diff)['h_z']
+    return np.max(np.abs(np.real(ans['h_z']) - ref) / np.abs(ref))
+
+
+@pytest.mark.parametrize('time_diff', [False, True])
+@pytest.mark.parametrize('fft_freqs_per_decade', [5, 10])
+def test_log_magnitude_improves_accuracy(time_diff, fft_freqs_per_decade):
+    # 半無限大地上の円形ループ中心の解析解 (Im(F) の符号は一定)
+    linear = loop_step(time_diff, fft_freqs_per_decade=fft_freqs_per_decade)
+    log = loop_step(time_diff, fft_freqs_per_decade=fft_freqs_per_decade,
+                    fft_log_magnitude=True)
+    assert log < linear / 5
+    assert log < 2e-3
+
+
+def test_default_is_linear(monkeypatch):
+    assert loop_step(False) == loop_step(False, fft_log_magnitude=False)
+    # log|Im(F)| を補間する場合は線形補間の演算子を作らない
+    def fft_operator(*args):
+        raise AssertionError('linear interpolation is computed')
+
+    monkeypatch.setattr(transform.FourierTransform, 'fft_operator',
+                        staticmethod(fft_operator))
+    loop_step(False, fft_log_magnitude=True)
@@ -0,0 +1,131 @@
+import gc
+import mmap
+import pickle
+from multiprocessing import shared_memory
+import numpy as np
+import pytest
+from script import GenerateDataset as gd
+
+FREQS = [380, 1500, 3000, 6000, 12000, 24000]
+SPANS = [7.86] * 6
+
+
+def resolve(**kwargs):
+    return gd.Resolve1D(4, [5.0] * 10, [1, 1000], [30, 60], FREQS, SPANS, **kwargs)
+
+
+def test_proceed_outlives_instance():
+    data = resolve().proceed()
+    gc.collect()
+    assert data.shape == (4, 2 * len(FREQS) + 1 + 11)
+    assert np.isfinite(data.sum())
+
+
+def test_proceed_returns_shared_memory():
+    # 結果は共有メモリを直接参照する (親プロセスでコピーしない)
+    r = resolve()
+    data = r.proceed()
+    assert r.shm is None
+    assert not data.flags.owndata
+    # base は共有メモリの mmap
+    assert isinstance(data.base, mmap.mmap)
+    assert np.shares_memory(data, np.frombuffer(data.shm.buf))
+    name = data.shm.name
+    view = data[:, 2 * len(FREQS)]
+    del r, data
+    gc.collect()
+    # ビューが残っている間は解放しない
+    assert np.all(view >= 30)
+    shared_memory.SharedMemory(name=name).close()
+    del view
+    gc.collect()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_proceed_mmap_returns_memmap(tmp_path):
+    path = str(tmp_path / 'data.npy')
+    data = resolve().proceed(path)
+    assert isinstance(data, np.memmap)
+    assert isinstance(data.base, mmap.mmap)
+
+
+def test_proceed_mmap(tmp_path):
+    path = str(tmp_path / 'data.npy')
+    data = resolve(sampling='sobol', seed=1).proceed(path)
+    np.testing.assert_array_equal(np.load(path), data)
+
+
+def test_proceed_uses_parent_design(monkeypatch, tmp_path):
+    # 点列は親プロセスで1回だけ生成し、ワーカーでは再生成しない
+    # (ワーカーでの呼び出しはファイルに記録する)
+    r = gd.Resolve1D(
+        9, [5.0] * 10, [1, 1000], [30, 60], FREQS, SPANS,
+        heights_per_model=2, sampling='sobol', seed=3)
+    design = r.design().copy()
+    log = tmp_path / 'calls'
+    log.write_text('')
+    original = gd.mtk.unit_sample
+
+    def unit_sample(*args, **kwargs):
+        with open(log, 'a') as f:
+            f.write('{}\n'.format(args))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(gd.mtk, 'unit_sample', unit_sample)
+    data = r.proceed()
+    assert log.read_text() == ''
+    heights = 30 + 30 * design[:, :2].ravel()[:9]
+    np.testing.assert_allclose(data[:, 2 * len(FREQS)], heights)
+
+
+def test_task_to_buffer_with_block(tmp_path):
+    r = resolve(sampling='sobol', seed=1, heights_per_model=2)
+    expected = r.proceed()
+    path = str(tmp_path / 'data.npy')
+    np.save(path, np.zeros_like(expected))
+    rows = np.arange(2, 4)
+    block = r.design_block(rows)
+    r._design = None
+    r.design = None  # 点列全体は使わない
+    r.task_to_buffer(('mmap', path, expected.shape), rows, block)
+    np.testing.assert_array_equal(np.load(path)[rows], expected[rows])
+
+
+def test_workers():
+    assert resolve().workers == gd.cpu_count()
+    r = resolve(workers=2)
+    assert r.workers == 2 and 'workers' not in r.get_config()
+    data = r.proceed()
+    assert data.shape == (4, 2 * len(FREQS) + 1 + 11)
+
+
+def test_shared_array_pickle():
+    data = resolve().proceed()
+    loaded = pickle.loads(pickle.dumps(data))
+    assert type(loaded) is np.ndarray
+    np.testing.assert_array_equal(loaded, data)
+
+
+def test_ip_reaches_emforward():
+    # Resolve1D(ip=...) の m, tau, c は応答の計算に使われ、比抵抗の後の列に入る
+    r = resolve(ip={'mlim': (0.2, 0.6)}, sampling='sobol', seed=2)
+    data = r.proceed()
+    nlayer, nresp = 11, 2 * len(FREQS)
+    assert data.shape == (4, nresp + 1 + 4 * nlayer) == (4, r.ncol)
+    row = data[0]
+    res = row[nresp + 1:nresp + 1 + nlayer]
+    m, tau, c = np.split(row[nresp + 1 + nlayer:], 3)
+    assert np.all((m >= 0.2) & (m <= 0.6))
+    ip = {'m': m, 'tau': tau, 'c': c}
+    expected = gd.emf.emulatte_RESOLVE(
+        r.thicks, res, FREQS, len(FREQS), SPANS, row[nresp], vca_index=3, ip=ip)
+    np.testing.assert_allclose(row[:nresp], expected, rtol=1e-12)
+    without = gd.emf.emulatte_RESOLVE(
+        r.thicks, res, FREQS, len(FREQS), SPANS, row[nresp], vca_index=3)
+    assert np.max(np.abs(without - expected)) > 1e-3 * np.max(np.abs(expected))
+    assert gd.Resolve1D(**r.get_config()).ip == {'mlim': (0.2, 0.6)}
+    # proceed_models は ip の値をそのまま使う
+    again = r.proceed_models(res[None], row[nresp:nresp + 1],
+                             ip={key: val[None] for key, val in ip.items()})
+    np.testing.assert_allclose(again[0], row, rtol=1e-12)
@@ -0,0 +1,93 @@
+import warnings
+import numpy as np
+import pytest
+import scipy.constants as const
+import emulatte.forward as fwd
+from emulatte.core import analytic, filters
+from emulatte.filter_files import hankel_accuracy
+
+FREQS = np.logspace(2, 5, 7)
+SIGMA = 0.01
+
+
+def emulate(name, sc, rc, hankel_filter, **kwargs):
+    model = fwd.model([])
+    model.set_properties(res=[2e14, 1 / SIGMA])
+    model.locate(fwd.transmitter(name, FREQS, moment=1), sc, rc)
+    ans = model.emulate(
+        hankel_filter=hankel_filter, ignore_displacement_current=True, **kwargs)
+    return ans, model
+
+
+@pytest.mark.parametrize('h, r', [(30, 7.9), (1, 10), (0, 50)])
+def test_auto_meets_accuracy(h, r):
+    # 送受信点の高度 h (h_s + h_r = 2h) の VMD
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        ans, model = emulate('VMD', [0, 0, -h], [r, 0, -h], 'auto',
+                             hankel_accuracy=1e-4)
+    omega = 2 * np.pi * FREQS
+    if h == 0:
+        h_z, h_r = analytic.halfspace_vmd(r, omega, SIGMA)
+    else:
+        h_z, h_r = analytic.halfspace_vmd_airborne(r, 2 * h, omega, SIGMA)
+    error = np.maximum(np.abs(ans['h_z'] - h_z), np.abs(ans['h_x'] - h_r))
+    assert np.max(error / np.abs(h_z)) < 1e-4
+    assert model.auto_hankel_filter(1e-4) != 'key201'
+
+
+@pytest.mark.parametrize('name, sc, rc', [
+    ('HMDx', [0, 0, -30], [7.9, 0, -30]),
+    ('VMD', [0, 0, 10], [50, 0, 10]),
+    ('VMD', [0, 0, -30], [50, 0, 10]),
+])
+def test_auto_falls_back(name, sc, rc):
+    # 精度表のない送信源・地中の送受信点では werthmuller201
+    with pytest.warns(UserWarning, match='werthmuller201'):
+        auto, model = emulate(name, sc, rc, 'auto')
+    ref, _ = emulate(name, sc, rc, 'werthmuller201')
+    for key in ref:
+        np.testing.assert_array_equal(auto[key], ref[key])
+
+
+def test_airborne_reference():
+    # 低高度・低誘導数の参照解は地表の解析解に一致する
+    # (誘導数が大きいと h_r は高度 1e-3 m でも地表と異なる)
+    r = 100
+    omega = np.logspace(-2, 0, 5) ** 2 / (r ** 2 * const.mu_0 * SIGMA)
+    ref = analytic.halfspace_vmd(r, omega, SIGMA)
+    air = analytic.halfspace_vmd_airborne(r, 1e-3, omega, SIGMA)
+    for a, b in zip(air, ref):
+        assert np.max(np.abs(a - b) / np.abs(ref[0])) < 1e-4
+
+
+def test_table():
+    table = {name: np.asarray(error)
+             for name, error in hankel_accuracy.log10_error.items()}
+    shape = (len(hankel_accuracy.height_ratio), len(hankel_accuracy.r),
+             len(hankel_accuracy.induction_number))
+    for error in table.values():
+        assert error.shape == shape
+    # 空中の VMD では werthmuller201 は 1e-7 以下
+    airborne = hankel_accuracy.height_ratio.index(1)
+    assert table['werthmuller201'][airborne:].max() < -7
+    # key201 は同じ高度の送受信点の直接波を積分できない
+    assert table['key201'].min() > -1
+    name, error = filters.select_hankel_filter(
+        [10], [1e-2, 1e2], 1e-6, height_ratios=[1, 10])
+    assert name != 'key201' and error <= 1e-6
+
+
+
+def test_time_domain_excludes_mizunaga90():
+    # mizunaga90 は時間領域では使わない (auto の候補からも除く)
+    model = fwd.model([])
+    model.set_properties(res=[2e14, 1 / SIGMA])
+    model.locate(fwd.transmitter('VMD', np.logspace(-5, -2, 4), moment=1),
+                 [0, 0, -30], [7.9, 0, -30])
+    assert model.auto_hankel_filter(1e-2, 'Freq') == 'mizunaga90'
+    assert model.auto_hankel_filter(1e-2, 'Time') != 'mizunaga90'
+    with pytest.warns(UserWarning, match='werthmuller201'):
+        ans = model.emulate('mizunaga90', td_transform='EULER')
+    ref = model.emulate('werthmuller201', td_transform='EULER')
+    np.testing.assert_array_equal(ans['h_z'], ref['h_z'])
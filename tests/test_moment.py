@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from emulatte.core import analytic, emlayers, emsource, validation
+
+SIGMA = validation.SIGMA
+MOMENT = 5.0
+
+
+def emulate(src, rc, td_transform, time_diff):
+    model = emlayers.Subsurface1D([])
+    model.set_properties(res=[2e14, 1 / SIGMA])
+    model.locate(src, [0, 0, 0], rc)
+    options = validation.FFT_OPTIONS if td_transform == 'FFT' else {}
+    return model.emulate(
+        'werthmuller201', ignore_displacement_current=True,
+        td_transform=td_transform, time_diff=time_diff,
+        components=['h_z'], **options)
+
+
+@pytest.mark.parametrize('td_transform', [None, 'FFT', 'EULER'])
+@pytest.mark.parametrize('time_diff', [False, True])
+def test_vmd_moment(td_transform, time_diff):
+    # 各変換の応答は送信源のモーメントに比例する (解析解と比較)
+    freqtime = validation.FREQS if td_transform is None else validation.TIMES
+    src = emsource.VMD(freqtime, moment=MOMENT)
+    ans = emulate(src, [validation.OFFSET, 0, 0], td_transform, time_diff)
+    if td_transform is None:
+        ref, _ = analytic.halfspace_vmd(
+            validation.OFFSET, 2 * np.pi * freqtime, SIGMA, moment=MOMENT)
+        if time_diff:
+            ref = ref * 2j * np.pi * freqtime
+        tol = validation.ACCURACY['FD', None]
+    else:
+        h_z, dh_z, _, _ = analytic.halfspace_vmd_step(
+            validation.OFFSET, freqtime, SIGMA, moment=MOMENT)
+        ref = dh_z if time_diff else h_z
+        tol = validation.ACCURACY[td_transform, 'dhdt' if time_diff else 'h']
+    value = ans['h_z'] if td_transform is None else np.real(ans['h_z'])
+    assert np.max(np.abs(value - ref) / np.abs(ref)) < tol
+
+
+@pytest.mark.parametrize('td_transform', ['FFT', 'EULER'])
+def test_loop_moment(td_transform):
+    # CircularLoop のモーメントは current * turns
+    src = emsource.CircularLoop(
+        validation.TIMES, current=2.0, radius=validation.RADIUS, turns=3)
+    ans = emulate(src, [0, 0, 0], td_transform, False)
+    ref, _ = analytic.halfspace_loop_step(
+        validation.RADIUS, validation.TIMES, SIGMA, current=6.0)
+    error = np.abs(np.real(ans['h_z']) - ref) / np.abs(ref)
+    assert np.max(error) < validation.ACCURACY[td_transform, 'h']
+
+
+@pytest.mark.parametrize('time_diff', [False, True])
+def test_dlag_moment(time_diff):
+    # DLAG は非推奨 (解析解に一致しない) なのでモーメントとの比例のみ確認する
+    values = []
+    for moment in [1.0, MOMENT]:
+        src = emsource.VMD(validation.TIMES, moment=moment)
+        ans, _ = emulate(src, [validation.OFFSET, 0, 0], 'DLAG', time_diff)
+        values.append(ans['h_z'])
+    np.testing.assert_allclose(values[1], MOMENT * values[0], rtol=1e-12)
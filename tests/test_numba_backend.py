@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+import emulatte.forward as fwd
+from emulatte.core import recursion
+
+pytestmark = pytest.mark.skipif(not recursion.HAS_NUMBA, reason='numba is not installed')
+
+FREQS = [380, 1500, 3000, 6000, 12000, 24000]
+
+
+def emulate(sc, rc, backend, name='VMD', update=None):
+    model = fwd.model([5.0] * 20)
+    model.set_properties(res=[2e14, *np.logspace(0, 3, 21)])
+    if name in ('VED', 'HEDx'):
+        source = fwd.transmitter(name, FREQS, ds=1, current=1)
+    else:
+        source = fwd.transmitter(name, FREQS, moment=1)
+    model.locate(source, sc, rc)
+    ans = model.emulate('werthmuller201', backend=backend)
+    if update is not None:
+        model.update_layer(*update)
+        ans = model.emulate('werthmuller201', backend=backend)
+    return ans
+
+
+def count_calls(monkeypatch, name):
+    calls = []
+    kernel = getattr(recursion, name)
+
+    def counted(*args):
+        calls.append(1)
+        return kernel(*args)
+
+    monkeypatch.setattr(recursion, name, counted)
+    return calls
+
+
+@pytest.mark.parametrize('name', ['VMD', 'HMDx'])
+@pytest.mark.parametrize('update', [None, (7, 30.0)])
+def test_airborne_uses_surface_kernel(monkeypatch, name, update):
+    # RESOLVE の幾何 (送受信点がともに空気層)
+    expected = emulate([0, 0, -30], [7.86, 0, -30], 'numpy', name, update)
+    calls = count_calls(monkeypatch, 'surface_recursion')
+    ans = emulate([0, 0, -30], [7.86, 0, -30], 'numba', name, update)
+    assert len(calls) == len(FREQS) * (1 if update is None else 2)
+    for key in expected:
+        np.testing.assert_allclose(ans[key], expected[key], rtol=1e-12, atol=0)
+
+
+def test_buried_uses_layer_kernel(monkeypatch):
+    expected = emulate([0, 0, 12], [50, 0, 40], 'numpy')
+    calls = count_calls(monkeypatch, 'layer_recursion')
+    ans = emulate([0, 0, 12], [50, 0, 40], 'numba')
+    assert len(calls) == len(FREQS)
+    for key in expected:
+        np.testing.assert_allclose(ans[key], expected[key], rtol=1e-12,
+                                   atol=1e-12 * np.abs(expected[key]).max())
+
+
+# 空気層, 中間層, 最下層の送受信点 (送信点が受信点より深い場合を含む)
+NUM_LAYER = 5
+DEPTHS = [-20.0, 5.0, 25.0, 50.0, 80.0]
+SIGNS = {
+    'VMD': (1, 1, 0, 0),     # TE のみ
+    'VED': (0, 0, 1, 1),     # TM のみ
+    'HMDx': (-1, 1, 1, 1),
+    'HEDx': (1, 1, -1, 1),
+}
+
+
+def recursion_inputs(omega=2 * np.pi * 1000):
+    thicks = np.array([10.0, 20.0, 30.0])
+    depth = np.array([0.0, 10.0, 30.0, 60.0])
+    sigma = np.array([1e-13, 0.1, 0.01, 1.0, 0.05])
+    mu = np.full(NUM_LAYER, 4e-7 * np.pi)
+    epsln = np.full(NUM_LAYER, 8.85e-12)
+    ztilde = (1j * omega * mu).astype(complex)
+    ytilde = sigma + 1j * omega * epsln
+    k = (omega ** 2 * mu * epsln - 1j * omega * mu * sigma) ** 0.5
+    lambda_ = np.logspace(-4, 0, 61)
+    u = (lambda_[None, :] ** 2 - k[:, None] ** 2) ** 0.5
+    return u, ztilde, ytilde, thicks, depth
+
+
+@pytest.mark.parametrize('name', list(SIGNS))
+@pytest.mark.parametrize('si', range(1, NUM_LAYER + 1))
+@pytest.mark.parametrize('ri', range(1, NUM_LAYER + 1))
+def test_layer_recursion_backends(name, si, ri):
+    # numba と numpy は同じ _layer_column を実行する
+    u, ztilde, ytilde, thicks, depth = recursion_inputs()
+    args = (u, ztilde, ytilde, thicks, depth,
+            DEPTHS[si - 1], DEPTHS[ri - 1] + 1.0, si, ri, SIGNS[name])
+    expected = recursion.layer_recursion_numpy(*args)
+    coefficients = recursion.layer_recursion(*args)
+    # U_tm, D_tm は空気層の送信点で条件が悪く (ytilde[0] ~ 1e-13)
+    # 複素数の除算の丸め誤差の違いが 5e-11 程度まで増幅される
+    tols = [1e-13, 1e-10, 1e-13, 1e-10, 1e-13, 1e-13]
+    for a, b, tol in zip(coefficients, expected, tols):
+        np.testing.assert_allclose(a, b, rtol=0, atol=tol * np.abs(b).max())
+
+
+@pytest.mark.parametrize('start', range(1, NUM_LAYER))
+def test_surface_recursion_backends(start):
+    u, ztilde, ytilde, thicks, _ = recursion_inputs()
+    Y, Z = u / ztilde[:, None], u / ytilde[:, None]
+    tanhuh = np.ones_like(u)
+    tanhuh[1:-1] = np.tanh(u[1:-1] * thicks[:, None])
+
+    def run(surface_recursion):
+        Ytilde, Ztilde = Y.copy(), Z.copy()
+        return surface_recursion(Y, Z, tanhuh, Ytilde, Ztilde, start)
+
+    expected = run(recursion.surface_recursion_numpy)
+    for a, b in zip(run(recursion.surface_recursion), expected):
+        np.testing.assert_allclose(a, b, rtol=1e-12)
+
+
+@pytest.mark.parametrize('name', ['VMD', 'VED', 'HEDx'])
+@pytest.mark.parametrize('sc, rc, tol', [
+    ([0, 0, 40], [50, 0, 12], 1e-10),   # 送信点が受信点より深い
+    ([0, 0, 12], [50, 0, 12], 1e-10),
+    # 空気層の電場は TM の丸め誤差の違いが増幅される (emulate の backend)
+    ([0, 0, 120], [50, 0, -10], 1e-8),
+])
+def test_buried_sources_match(name, sc, rc, tol):
+    expected = emulate(sc, rc, 'numpy', name)
+    ans = emulate(sc, rc, 'numba', name)
+    for key in expected:
+        np.testing.assert_allclose(ans[key], expected[key], rtol=0,
+                                   atol=tol * np.abs(expected[key]).max())
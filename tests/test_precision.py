@@ -0,0 +1,46 @@
+import warnings
+import numpy as np
+import pytest
+import emulatte.forward as fwd
+
+FREQS = np.logspace(0, 5, 11)
+THICKS = [5.0] * 28
+RES = [2e14, *(10 ** np.random.RandomState(0).uniform(0, 3, 29))]
+
+
+def emulate(name, sc, rc, precision):
+    model = fwd.model(THICKS)
+    model.set_properties(res=RES)
+    model.locate(fwd.transmitter(name, FREQS, moment=1), sc, rc)
+    ans = model.emulate(hankel_filter='werthmuller201', precision=precision)
+    return np.array([ans[k] for k in ['h_x', 'h_z']]), model
+
+
+def peak_error(single, double):
+    return np.max(np.abs(single - double).max(axis=1) / np.abs(double).max(axis=1))
+
+
+@pytest.mark.parametrize('name', ['VMD', 'HMDx'])
+@pytest.mark.parametrize('h, r', [(30, 7.9), (1, 7.9), (5, 50), (30, 200)])
+def test_single_airborne(name, h, r):
+    double, _ = emulate(name, [0, 0, -h], [r, 0, -h], 'double')
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        single, model = emulate(name, [0, 0, -h], [r, 0, -h], 'single')
+    assert model.single_precision_safe()
+    assert not np.array_equal(single, double)
+    assert peak_error(single, double) < 2e-6
+
+
+@pytest.mark.parametrize('name, sc, rc', [
+    ('VMD', [0, 0, 0], [50, 0, 0]),
+    ('VMD', [0, 0, -1], [200, 0, -1]),
+    ('VMD', [0, 0, 12], [50, 0, 40]),
+    ('HMDx', [0, 0, 12], [50, 0, 40]),
+])
+def test_single_falls_back_to_double(name, sc, rc):
+    double, _ = emulate(name, sc, rc, 'double')
+    with pytest.warns(UserWarning, match='precision="double" is used'):
+        single, model = emulate(name, sc, rc, 'single')
+    assert not model.single_precision_safe()
+    np.testing.assert_array_equal(single, double)
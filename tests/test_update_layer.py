@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+import emulatte.forward as fwd
+
+FREQS = np.logspace(2, 5, 8)
+THICKS = [10.0] * 6
+RES = [2e14, *np.logspace(0, 3, 7)]
+# 変更する層 (最下層・第1層を含む) と新しい比抵抗
+UPDATES = [(4, 3.0), (7, 500.0), (1, 20.0), (4, 80.0)]
+
+
+def build(name, sc, rc, **props):
+    model = fwd.model(THICKS)
+    model.set_properties(**props)
+    model.locate(fwd.transmitter(name, FREQS, moment=1), sc, rc)
+    return model
+
+
+@pytest.mark.parametrize('name, sc, rc', [
+    ('VMD', [0, 0, -30], [7.86, 0, -30]),
+    ('HMDx', [0, 0, -30], [7.86, 0, -30]),
+    # 地中の送受信点 (キャッシュを使わず全層を計算し直す)
+    ('VMD', [0, 0, -30], [50, 0, 15]),
+    ('VMD', [0, 0, 5], [50, 0, 25]),
+])
+def test_update_layer_matches_new_model(name, sc, rc):
+    model = build(name, sc, rc, res=RES)
+    model.emulate('werthmuller201')
+    res = list(RES)
+    for i, value in UPDATES:
+        model.update_layer(i, value)
+        res[i] = value
+        ans = model.emulate('werthmuller201')
+        ref = build(name, sc, rc, res=res).emulate('werthmuller201')
+        for key in ref:
+            np.testing.assert_allclose(
+                ans[key], ref[key], rtol=0, atol=1e-12 * np.abs(ref[key]).max())
+
+
+def test_update_layer_colecole():
+    # Cole-Cole モデルでは res_0 を変更する
+    props = {'m': [0, *[0.3] * 7], 'tau': [0, *[1e-3] * 7], 'c': [0, *[0.5] * 7]}
+    sc, rc = [0, 0, -30], [7.86, 0, -30]
+    model = build('VMD', sc, rc, res_0=RES, **props)
+    model.emulate('werthmuller201')
+    model.update_layer(3, 7.0)
+    ans = model.emulate('werthmuller201')
+    res = list(RES)
+    res[3] = 7.0
+    ref = build('VMD', sc, rc, res_0=res, **props).emulate('werthmuller201')
+    for key in ref:
+        np.testing.assert_allclose(
+            ans[key], ref[key], rtol=0, atol=1e-12 * np.abs(ref[key]).max())
@@ -0,0 +1,66 @@
+import pytest
+from emulatte.core import validation
+
+# 全ケース (python -m emulatte.core.validation) は数分かかるので、
+# 周波数領域の全フィルタと werthmuller201 の時間領域変換を確認する
+CASES = validation.case_names(td_transforms=[]) + validation.case_names(
+    hankel_filters=['werthmuller201'], td_transforms=['FFT', 'EULER']) + [
+    validation.case_name('vmd', 'werthmuller201', 'DLAG'),
+]
+CASES = list(dict.fromkeys(CASES))
+
+
+def marked(name):
+    reason = validation.known_failure(name)
+    if reason is None:
+        return name
+    return pytest.param(name, marks=pytest.mark.xfail(reason=reason))
+
+
+@pytest.mark.parametrize('name', [marked(name) for name in CASES])
+def test_accuracy(name):
+    error, _ = validation.run_case(
+        *validation.parse_case(name), repeat=1, min_time=0)
+    assert error <= validation.accuracy(name)
+
+
+def test_baseline_is_known():
+    # 基準値の全ケースは要求精度を満たすか対象外 (DLAG)
+    baseline = validation.load_baseline()
+    assert set(baseline) == set(validation.case_names())
+    flagged = validation.failures(baseline)
+    assert set(flagged.values()) == {'known'}
+    assert all(name.split('/')[1] == 'DLAG' for name in flagged)
+
+
+def test_relative_speed():
+    # 計算機の速さ (全ケースの時間比の中央値) には依存しない
+    baseline = {'a': (0, 1.0), 'b': (0, 2.0), 'c': (0, 4.0)}
+    results = {'a': (0, 3.0), 'b': (0, 6.0), 'c': (0, 24.0)}
+    speed = validation.relative_speed(results, baseline)
+    assert speed['a'] == pytest.approx(1)
+    assert speed['c'] == pytest.approx(2)
+    assert validation.slow_cases(results, baseline) == ['c']
+
+
+def test_main_flags_regressions(monkeypatch, tmp_path, capsys):
+    # 計算時間・誤差の悪化は既定で失敗とする
+    names = ['vmd/FD/werthmuller201', 'hmd/FD/werthmuller201', 'loop/FD/werthmuller201']
+    baseline = {name: (1e-8, 1.0) for name in names}
+    path = str(tmp_path / 'baseline.py')
+    validation.write_baseline(baseline, path)
+    results = dict(baseline)
+    monkeypatch.setattr(validation, 'run', lambda *args: results)
+    # 遅いケースの測り直しも同じ結果を返す
+    monkeypatch.setattr(validation, 'run_case',
+                        lambda *args, **kwargs: results[validation.case_name(*args)])
+    args = ['--baseline', path]
+    assert validation.main(args) == 0
+    results['loop/FD/werthmuller201'] = (1e-8, 2.0)
+    assert validation.main(args) == 1
+    assert validation.main(args + ['--time-tolerance', '2.5']) == 0
+    assert validation.main(args + ['--no-check-time']) == 0
+    results['loop/FD/werthmuller201'] = (1e-6, 1.0)
+    assert validation.main(args) == 1
+    assert validation.main(args + ['--error-tolerance', '200']) == 0
+    capsys.readouterr()
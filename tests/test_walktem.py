@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+import emulatte.forward as fwd
+from emulatte.core import waveforms
+from emulatte.core.arbitraywave import ArbitraryWave
+
+empymod = pytest.importorskip('empymod')
+
+# (比抵抗, 変位電流を無視するか)
+# 高比抵抗の大地では MHz 帯の変位電流の寄与が1次の Butterworth で十分に
+# 減衰せず、最初期の HM ゲートは時間領域変換のフィルタに依存する
+# (empymod の key_601_CosSin_2009 と key_201_CosSin_2012 でも 3.7 % 異なる)
+# ため、参照解と同じく準静的近似で比較する
+MODELS = [
+    ((100, 10, 300), False),
+    ((30, 300, 3), False),
+    ((1000, 1000, 1000), True),
+]
+
+
+def model(res):
+    m = fwd.model([20, 30])
+    m.set_properties(res=[2e14, *res])
+    return m
+
+
+def empymod_walktem(off_time, waveform_time, waveform_current, m,
+                    ignore_displacement_current):
+    """
+    empymod の Fourier DLF (key_601_CosSin_2009, 密な時間) による参照解
+    (周波数領域の応答・Butterworth フィルタ・任意波形は walktem と同じ)
+    """
+    time = ArbitraryWave.get_time(off_time, waveform_time)
+    time = np.logspace(np.log10(time.min()), np.log10(time.max()), 30 * len(time))
+    time, freq, ft, ftarg = empymod.utils.check_time(
+        time=time, signal=1, ft='dlf',
+        ftarg={'dlf': 'key_601_CosSin_2009'}, verb=1)
+    cl = fwd.transmitter('CircularLoop', freq, current=1,
+                         radius=40 / np.sqrt(np.pi), turns=1)
+    m.locate(cl, [0, 0, 0], [0, 0, 0])
+    hz = m.emulate(hankel_filter='werthmuller201',
+                   ignore_displacement_current=ignore_displacement_current)['h_z']
+    h = ArbitraryWave.butterworth_type_filter(freq, 4.5e5, order=1)
+    dbdt = 2j * np.pi * freq * hz * 4e-7 * np.pi * h
+    dbdt_td, _ = empymod.model.tem(
+        dbdt[:, None], np.ones(1), freq, time, signal=1, ft=ft, ftarg=ftarg)
+    return ArbitraryWave.apply_waveform(
+        time, dbdt_td[:, 0], off_time, waveform_time, waveform_current)
+
+
+@pytest.mark.parametrize('moment_type', ['hm', 'lm'])
+@pytest.mark.parametrize('res, ignore_displacement_current', MODELS)
+def test_walktem_against_empymod(moment_type, res, ignore_displacement_current):
+    off_time, waveform_time, waveform_current = waveforms.load_waveform(
+        'walktem', moment_type)
+    ans = ArbitraryWave.walktem(
+        off_time, waveform_time, waveform_current, model(res),
+        ignore_displacement_current=ignore_displacement_current)
+    ref = empymod_walktem(
+        np.asarray(off_time), np.asarray(waveform_time),
+        np.asarray(waveform_current), model(res), ignore_displacement_current)
+    assert np.max(np.abs(ans - ref)) <= 2.3e-3 * np.max(np.abs(ref))
+
+
+def test_walktem_includes_displacement_current():
+    # 既定では変位電流を含む (Subsurface1D.emulate の既定と同じ)
+    off_time, waveform_time, waveform_current = waveforms.load_waveform('walktem', 'hm')
+    res = (1000, 1000, 1000)
+    default = ArbitraryWave.walktem(
+        off_time, waveform_time, waveform_current, model(res))
+    full = ArbitraryWave.walktem(
+        off_time, waveform_time, waveform_current, model(res),
+        ignore_displacement_current=False)
+    quasi = ArbitraryWave.walktem(
+        off_time, waveform_time, waveform_current, model(res),
+        ignore_displacement_current=True)
+    np.testing.assert_array_equal(default, full)
+    assert np.max(np.abs(default - quasi)) > 1e-3 * np.max(np.abs(quasi))
@@ -0,0 +1,99 @@
+from concurrent import futures
+import numpy as np
+import emulatte.forward as fwd
+from emulatte.core import emlayers
+
+FREQS = np.logspace(2, 5, 24)
+
+
+def resolve_model():
+    model = fwd.model([10.0] * 9)
+    model.set_properties(res=[2e14, *np.logspace(0, 3, 10)])
+    model.locate(fwd.transmitter('VMD', FREQS, moment=1), [0, 0, -30], [7.86, 0, -30])
+    return model
+
+
+def test_workers_match_serial_with_cache_updates():
+    serial, threaded = resolve_model(), resolve_model()
+    for model, workers in [(serial, None), (threaded, 4)]:
+        model.emulate('werthmuller201', workers=workers)
+        model.update_layer(5, 3.0)
+    expected = serial.emulate('werthmuller201')
+    ans = threaded.emulate('werthmuller201', workers=4)
+    for key in expected:
+        np.testing.assert_allclose(ans[key], expected[key], rtol=1e-12, atol=0)
+    # 各周波数の漸化計算の状態が model に戻されている
+    assert len(threaded.reflection_cache) == len(FREQS)
+    assert all(not state['changed'] for state in threaded.reflection_cache.values())
+
+
+def test_workers_share_caches():
+    # 作業変数はスレッド毎、キャッシュは model のものを共有する
+    model = resolve_model()
+    seen = []
+    hankel_transform = model.src.hankel_transform
+
+    def record(ws, omega, out, sigma=None):
+        seen.append((id(ws), id(ws.reflection_cache), id(ws.bessel_cache)))
+        return hankel_transform(ws, omega, out, sigma)
+
+    model.src.hankel_transform = record
+    model.emulate('werthmuller201', workers=4)
+    assert len({ids[0] for ids in seen}) == 4
+    assert {ids[1] for ids in seen} == {id(model.reflection_cache)}
+    assert {ids[2] for ids in seen} == {id(model.bessel_cache)}
+    assert len(model.reflection_cache) == len(FREQS)
+
+
+def test_workers_keep_cache_limit():
+    # 複数のスレッドから追加しても上限を超えない
+    freqs = np.logspace(2, 5, emlayers.REFLECTION_CACHE_SIZE + 40)
+    model = resolve_model()
+    model.locate(fwd.transmitter('VMD', freqs, moment=1), [0, 0, -30], [7.86, 0, -30])
+    model.emulate('werthmuller201', workers=4)
+    assert len(model.reflection_cache) == emlayers.REFLECTION_CACHE_SIZE
+    model.emulate('werthmuller201')
+    assert len(model.reflection_cache) == emlayers.REFLECTION_CACHE_SIZE
+
+
+OPTIONS = [
+    {'hankel_filter': 'werthmuller201'},
+    {'hankel_filter': 'key201', 'components': ['h_z']},
+    {'hankel_filter': 'anderson801'},
+    {'hankel_filter': 'werthmuller201', 'precision': 'single'},
+    {'hankel_filter': 'werthmuller201', 'ignore_displacement_current': True},
+    {'hankel_filter': 'werthmuller201', 'td_transform': 'FFT',
+     'fft_filter': 'key_time_201'},
+]
+
+
+def shared_model():
+    model = fwd.model([10.0] * 9)
+    model.set_properties(res=[2e14, *np.logspace(0, 3, 10)])
+    model.locate(fwd.transmitter('VMD', np.logspace(-5, -3, 6), moment=1),
+                 [0, 0, -30], [7.86, 0, -30])
+    return model
+
+
+def test_emulate_is_thread_safe():
+    # 1つの model の emulate() を異なる設定で同時に呼んでも逐次の結果と一致し、
+    # model の属性は変わらない
+    model = shared_model()
+    model.update_layer(5, 3.0)
+    before = dict(model.__dict__)
+    serial = [shared_model() for _ in OPTIONS]
+    for other in serial:
+        other.update_layer(5, 3.0)
+    expected = [other.emulate(**options)
+                for other, options in zip(serial, OPTIONS)]
+    jobs = OPTIONS * 4
+    with futures.ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda options: model.emulate(**options), jobs))
+    for i, ans in enumerate(results):
+        ref = expected[i % len(OPTIONS)]
+        for key in ref:
+            np.testing.assert_array_equal(ans[key], ref[key])
+    assert model.__dict__.keys() == before.keys()
+    for name in ['lambda_', 'kernel', 'u', 'ztilde', 'hankel_filter', 'precision']:
+        assert name not in model.__dict__
+    assert model.sz == before['sz'] and model.src is before['src']